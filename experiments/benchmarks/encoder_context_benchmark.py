@@ -0,0 +1,60 @@
+# Path: experiments/benchmarks/encoder_context_benchmark.py
+# Description: Compares the per-utterance latency of the padded (30 s) and the reduced-context Whisper encoder modes for several utterance lengths.
+
+# RUN: python experiments/benchmarks/encoder_context_benchmark.py [--audio experiments/audio/test2.wav] [--repeats 5]
+
+import argparse
+import sys
+import time
+sys.path.append('.')
+
+import numpy as np
+import soundfile as sf
+from ssi.utils.asr.whisper_transformers_asr import WhisperTransformersASR
+
+LENGTH_BUCKETS_SECONDS = [1, 2, 5, 10, 20, 30]
+
+def load_utterance(audio: np.ndarray, seconds: float, sample_rate: int) -> np.ndarray:
+    """Cut (or loop) the test audio to the requested length."""
+    n_samples = int(seconds * sample_rate)
+    repeats = int(np.ceil(n_samples / len(audio)))
+    return np.tile(audio, repeats)[:n_samples]
+
+def time_transcription(asr: WhisperTransformersASR, audio: np.ndarray, repeats: int):
+    transcription = asr.transcribe(audio)  # Warmup for this input shape
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        asr.transcribe(audio)
+        timings.append(time.perf_counter() - started_at)
+    return float(np.median(timings)), transcription
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare padded and reduced-context encoder latency.")
+    parser.add_argument("--audio", default="experiments/audio/test2.wav")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    asr = WhisperTransformersASR()
+    sample_rate = asr.settings.STREAM_SAMPLE_RATE
+    audio, file_sample_rate = sf.read(args.audio, dtype="int16")
+    if file_sample_rate != sample_rate:
+        raise ValueError(f"Expected a {sample_rate} Hz file, got {file_sample_rate} Hz")
+
+    print(f"Model: {asr.model_name}, device: {asr.model.device}, bucket: {asr.encoder_bucket_seconds}s")
+    print(f"{'length':>8} | {'padded ms':>10} | {'reduced ms':>10} | {'speedup':>7} | same text")
+    for seconds in LENGTH_BUCKETS_SECONDS:
+        utterance = load_utterance(audio, seconds, sample_rate)
+
+        asr.encoder_mode = "padded"
+        padded_latency, padded_text = time_transcription(asr, utterance, args.repeats)
+        asr.encoder_mode = "reduced"
+        reduced_latency, reduced_text = time_transcription(asr, utterance, args.repeats)
+
+        print(
+            f"{seconds:>7}s | {padded_latency * 1000:>10.1f} | {reduced_latency * 1000:>10.1f} | "
+            f"{padded_latency / reduced_latency:>6.2f}x | {padded_text.strip() == reduced_text.strip()}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# Path: experiments/benchmarks/preload_fork_benchmark.py
+# Description: Compares `ssi serve` with the models preloaded before forking the workers against each worker loading its own models. Reports the startup time, the resident and proportional memory of every worker, and the end-to-end throughput of N clients streaming over WebSockets, as JSON.
+
+# RUN: python experiments/benchmarks/preload_fork_benchmark.py [--workers 4] [--clients 16] [--no-pin-cores] [--output results.json]
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, List, Optional
+sys.path.append('.')
+
+import numpy as np
+import soundfile as sf
+import websockets
+from fastapi import FastAPI
+from ssi.cli.__main__ import serve
+from ssi.config import get_settings
+from ssi.fastapi.routers.streaming_ws import StreamingWSRouter
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.metrics.process_memory import memory_usage
+from ssi.utils.vad.vad_interface import VADInterface
+
+settings = get_settings()
+MIB = 2 ** 20
+
+def benchmark_app_factory(
+    events: multiprocessing.Queue,
+    vad_pipeline: Optional[VADInterface],
+    asr_pipeline: Optional[ASRInterface],
+) -> FastAPI:
+    """Built in each worker: reports its readiness and its final transcriptions to the benchmark process."""
+
+    def on_transcription(chunk) -> None:
+        if chunk.is_final:
+            events.put(("final", chunk.client_id))
+
+    app = FastAPI()
+    app.include_router(StreamingWSRouter(
+        on_transcription, lambda client: None, vad_pipeline=vad_pipeline, asr_pipeline=asr_pipeline,
+    ))
+    # Runs after the router's startup handler, which loads and warms up the models
+    app.router.on_startup.append(lambda: events.put(("ready", os.getpid())))
+    return app
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def build_stream(audio: np.ndarray, utterances: int, gap_seconds: float) -> np.ndarray:
+    gap = np.zeros(int(gap_seconds * settings.STREAM_SAMPLE_RATE), dtype=np.int16)
+    return np.concatenate([np.concatenate([audio, gap]) for _ in range(utterances)])
+
+async def stream_clients(url: str, stream: np.ndarray, args: argparse.Namespace, finals: List[float]) -> dict:
+    """Stream the audio from every client as fast as the server takes it, then wait until the transcriptions stop coming."""
+    chunk_samples = int(args.chunk_ms * settings.STREAM_SAMPLE_RATE / 1000)
+    sockets = [await websockets.connect(url, max_size=None) for _ in range(args.clients)]
+
+    async def send(ws) -> None:
+        for offset in range(0, len(stream), chunk_samples):
+            await ws.send(stream[offset:offset + chunk_samples].tobytes())
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(send(ws) for ws in sockets))
+    sent_at = time.perf_counter()
+
+    # Done when no transcription arrived for `drain_seconds`
+    while True:
+        last = finals[-1] if finals else sent_at
+        if time.perf_counter() - max(last, sent_at) > args.drain_seconds:
+            break
+        await asyncio.sleep(0.1)
+    for ws in sockets:
+        await ws.close()
+
+    audio_seconds = args.clients * len(stream) / settings.STREAM_SAMPLE_RATE
+    wall_seconds = (finals[-1] if finals else sent_at) - started_at
+    return {
+        "audio_seconds": round(audio_seconds, 2),
+        "send_seconds": round(sent_at - started_at, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "finals_received": len(finals),
+        "throughput_audio_seconds_per_second": round(audio_seconds / wall_seconds, 3) if wall_seconds > 0 else None,
+    }
+
+def run_mode(preload: bool, stream: np.ndarray, args: argparse.Namespace) -> dict:
+    context = multiprocessing.get_context("fork")
+    events = context.Queue()
+    port = free_port()
+    server = context.Process(target=serve, kwargs={
+        "host": "127.0.0.1",
+        "port": port,
+        "workers": args.workers,
+        "preload": preload,
+        "pin_cores": args.pin_cores,
+        "app_factory": partial(benchmark_app_factory, events),
+        "memory_report_interval": 0,
+        "log_level": "warning",
+    })
+    started_at = time.perf_counter()
+    server.start()
+
+    worker_pids: List[int] = []
+    finals: List[float] = []
+    try:
+        deadline = time.perf_counter() + args.startup_timeout
+        while len(worker_pids) < args.workers:
+            if not server.is_alive() or time.perf_counter() > deadline:
+                raise RuntimeError("The server failed to start its workers, see its log")
+            try:
+                kind, value = events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if kind == "ready":
+                worker_pids.append(value)
+        startup_seconds = time.perf_counter() - started_at
+        print(f"{'preload' if preload else 'independent'}: {args.workers} worker(s) ready in {startup_seconds:.1f}s", file=sys.stderr)
+
+        # Measured before the load, while every worker still shares what the parent loaded
+        workers = [{"pid": pid, **memory_usage(pid)} for pid in worker_pids]
+        parent = memory_usage(server.pid)
+
+        def collect() -> None:
+            while True:
+                try:
+                    kind, _ = events.get(timeout=0.5)
+                except queue.Empty:
+                    if not server.is_alive():
+                        return
+                    continue
+                if kind == "final":
+                    finals.append(time.perf_counter())
+
+        threading.Thread(target=collect, daemon=True).start()
+        load = asyncio.run(stream_clients(f"ws://127.0.0.1:{port}/ws/transcribe", stream, args, finals))
+        workers_after = {pid: memory_usage(pid) for pid in worker_pids}
+    finally:
+        server.terminate()
+        server.join(timeout=30)
+
+    total_pss = parent.get("pss", 0) + sum(worker.get("pss", 0) for worker in workers)
+    total_pss_after = parent.get("pss", 0) + sum(usage.get("pss", 0) for usage in workers_after.values())
+    return {
+        "startup_seconds": round(startup_seconds, 2),
+        "parent_pss_mib": round(parent.get("pss", 0) / MIB, 1),
+        "workers": [
+            {
+                "pid": worker["pid"],
+                "rss_mib": round(worker.get("rss", 0) / MIB, 1),
+                "pss_mib": round(worker.get("pss", 0) / MIB, 1),
+                "shared_mib": round((worker.get("shared_clean", 0) + worker.get("shared_dirty", 0)) / MIB, 1),
+                "pss_after_load_mib": round(workers_after[worker["pid"]].get("pss", 0) / MIB, 1),
+            }
+            for worker in workers
+        ],
+        "total_pss_mib": round(total_pss / MIB, 1),
+        "total_pss_after_load_mib": round(total_pss_after / MIB, 1),
+        **load,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare preloaded forked workers with independently loaded workers.")
+    parser.add_argument("--audio", default="experiments/audio/test2.wav")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients, spread over the workers by the kernel")
+    parser.add_argument("--utterances", type=int, default=2, help="How many times each client streams the audio file")
+    parser.add_argument("--gap-seconds", type=float, default=2.0, help="Silence streamed after each repetition")
+    parser.add_argument("--chunk-ms", type=float, default=100.0, help="Audio per WebSocket message")
+    parser.add_argument("--drain-seconds", type=float, default=10.0, help="The run ends once no transcription arrived for this long")
+    parser.add_argument("--startup-timeout", type=float, default=600.0, help="Seconds to wait for the workers to load")
+    parser.add_argument("--no-pin-cores", dest="pin_cores", action="store_false")
+    parser.add_argument("--output", default=None, help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    # The websockets client logs every frame at debug level
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+
+    audio, file_sample_rate = sf.read(args.audio, dtype="int16")
+    if file_sample_rate != settings.STREAM_SAMPLE_RATE:
+        raise ValueError(f"Expected a {settings.STREAM_SAMPLE_RATE} Hz file, got {file_sample_rate} Hz")
+    if audio.ndim > 1:
+        audio = audio[:, 0]
+    stream = build_stream(audio, args.utterances, args.gap_seconds)
+
+    preloaded = run_mode(True, stream, args)
+    independent = run_mode(False, stream, args)
+
+    def ratio(key: str) -> Optional[float]:
+        return round(preloaded[key] / independent[key], 3) if preloaded.get(key) and independent.get(key) else None
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": multiprocessing.cpu_count()},
+        "config": {
+            **{key: value for key, value in vars(args).items() if key != "output"},
+            "vad_model": settings.VAD_MODEL,
+            "asr_model": settings.ASR_MODEL,
+            "asr_model_name": settings.ASR_MODEL_NAME,
+            "inference_executor": settings.INFERENCE_EXECUTOR,
+        },
+        "preload": preloaded,
+        "independent": independent,
+        "preload_vs_independent": {
+            "total_pss": ratio("total_pss_mib"),
+            "throughput": ratio("throughput_audio_seconds_per_second"),
+            "startup_seconds": ratio("startup_seconds"),
+        },
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Path: experiments/benchmarks/quantization_parity.py
+# Description: Checks the accuracy and speed of the int8 dynamically quantized CPU ASR model against the float32 CPU model, reporting the word error rate difference against a reference transcript (or, without one, how much the int8 transcription disagrees with the float32 one), speedup and real-time factor.
+
+# RUN: python experiments/benchmarks/quantization_parity.py [--audio experiments/audio/test2.wav] [--reference "expected text"]
+
+import argparse
+import re
+import sys
+import time
+sys.path.append('.')
+
+import numpy as np
+import soundfile as sf
+from ssi.config import get_settings
+from ssi.utils.asr.whisper_transformers_asr import WhisperTransformersASR
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the number of reference words."""
+    ref = re.sub(r"[^\w' ]", "", reference.lower()).split()
+    hyp = re.sub(r"[^\w' ]", "", hypothesis.lower()).split()
+    distances = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        previous_diagonal, distances[0] = distances[0], i
+        for j, hyp_word in enumerate(hyp, start=1):
+            previous_diagonal, distances[j] = distances[j], min(
+                distances[j] + 1,
+                distances[j - 1] + 1,
+                previous_diagonal + (ref_word != hyp_word),
+            )
+    return distances[-1] / max(len(ref), 1)
+
+def load_asr(compute_type: str) -> WhisperTransformersASR:
+    settings = get_settings()
+    settings.ASR_DEVICE = "cpu"
+    settings.ASR_COMPUTE_TYPE = compute_type
+    return WhisperTransformersASR()
+
+def benchmark(asr: WhisperTransformersASR, audio: np.ndarray, repeats: int):
+    transcription = asr.transcribe(audio)  # Warmup
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        transcription = asr.transcribe(audio)
+        timings.append(time.perf_counter() - started_at)
+    return float(np.median(timings)), transcription
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the int8 quantized and the float32 ASR model on CPU.")
+    parser.add_argument("--audio", default="experiments/audio/test2.wav")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--reference",
+        default=None,
+        help="The reference transcript. Without it, only the word disagreement between int8 and float32 is reported, not a WER.",
+    )
+    args = parser.parse_args()
+
+    audio, _ = sf.read(args.audio, dtype="int16")
+    audio_seconds = len(audio) / get_settings().STREAM_SAMPLE_RATE
+
+    results = {}
+    for compute_type in ["float32", "int8"]:
+        asr = load_asr(compute_type)
+        results[compute_type] = benchmark(asr, audio, args.repeats)
+        del asr
+
+    print(f"Model: {get_settings().ASR_MODEL_NAME}, audio: {args.audio} ({audio_seconds:.1f}s)")
+    speedup = results["float32"][0] / results["int8"][0]
+    if args.reference is None:
+        for compute_type, (latency, transcription) in results.items():
+            print(f"{compute_type:>8}: {latency:.2f}s, RTF {latency / audio_seconds:.3f} | {transcription.strip()}")
+        # The same edit distance, but relative to float32 rather than to the truth: it says nothing about accuracy
+        disagreement = word_error_rate(results["float32"][1], results["int8"][1])
+        print(f"Speedup: {speedup:.2f}x, word disagreement of int8 with float32: {disagreement:.3f} (no --reference, so no WER)")
+        return
+
+    for compute_type, (latency, transcription) in results.items():
+        print(
+            f"{compute_type:>8}: {latency:.2f}s, RTF {latency / audio_seconds:.3f}, "
+            f"WER {word_error_rate(args.reference, transcription):.3f} | {transcription.strip()}"
+        )
+    wer_difference = word_error_rate(args.reference, results["int8"][1]) - word_error_rate(args.reference, results["float32"][1])
+    print(f"Speedup: {speedup:.2f}x, WER difference: {wer_difference:+.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# Path: experiments/benchmarks/ws_load_benchmark.py
+# Description: Load tests the streaming WebSocket endpoint. Serves a StreamingWSRouter in-process, streams the test audio in real time from N concurrent simulated clients, and reports end-of-speech-to-transcript latency, real-time factor, event-loop lag and late/dropped chunks for each N as JSON.
+
+# RUN: python experiments/benchmarks/ws_load_benchmark.py [--clients 1,4,16] [--asr mock|model] [--vad energy|model] [--output results.json]
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+sys.path.append('.')
+
+import numpy as np
+import soundfile as sf
+import uvicorn
+import websockets
+from fastapi import FastAPI
+from ssi.config import get_settings
+from ssi.fastapi.routers.streaming_ws import StreamingWSRouter
+from ssi.types.new_client_connected import NewClientConnected
+from ssi.types.streaming_data_chunk import StreamingDataChunk
+from ssi.utils.asr.asr_factory import ASRFactory
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.vad.vad_factory import VADFactory
+from ssi.utils.vad.vad_interface import VADInterface
+
+settings = get_settings()
+
+class MockASR(ASRInterface):
+    """
+    Stands in for Whisper with a fixed cost per batch plus a cost per second of
+    batched audio. The sleep blocks the inference thread like a real model does.
+    """
+
+    def __init__(self, latency_ms: float, ms_per_audio_second: float) -> None:
+        self.latency_ms = latency_ms
+        self.ms_per_audio_second = ms_per_audio_second
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        audio_seconds = sum(len(audio) for audio in audios) / settings.STREAM_SAMPLE_RATE
+        time.sleep((self.latency_ms + self.ms_per_audio_second * audio_seconds) / 1000)
+        return ["mock transcription"] * len(audios)
+
+class EnergyVAD(VADInterface):
+    """A stateless RMS threshold VAD, so the load test doesn't depend on downloading a VAD model."""
+
+    def __init__(self, threshold_db: float = -40.0) -> None:
+        self.threshold = 32768 * 10 ** (threshold_db / 20)
+
+    def detect_voice_activity(self, audio_data) -> float:
+        if isinstance(audio_data, bytes):
+            audio_data = np.frombuffer(audio_data, dtype=np.int16)
+        rms = np.sqrt(np.mean(audio_data.astype(np.float32) ** 2))
+        return 1.0 if rms >= self.threshold else 0.0
+
+class TimedASR(ASRInterface):
+    """Wraps an ASR pipeline and accumulates its compute time and the audio it transcribed, for the real-time factor."""
+
+    def __init__(self, pipeline: ASRInterface) -> None:
+        self.pipeline = pipeline
+        self.reset()
+
+    def reset(self) -> None:
+        self.compute_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.batches = 0
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        started_at = time.perf_counter()
+        transcriptions = self.pipeline.transcribe_batch(audios)
+        self.compute_seconds += time.perf_counter() - started_at
+        self.audio_seconds += sum(len(audio) for audio in audios) / settings.STREAM_SAMPLE_RATE
+        self.batches += 1
+        return transcriptions
+
+    def warmup(self) -> None:
+        self.pipeline.warmup()
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    array = np.asarray(values)
+    return {
+        "count": len(values),
+        "p50": round(float(np.percentile(array, 50)), 2),
+        "p90": round(float(np.percentile(array, 90)), 2),
+        "p99": round(float(np.percentile(array, 99)), 2),
+        "max": round(float(array.max()), 2),
+        "mean": round(float(array.mean()), 2),
+    }
+
+def build_stream(audio: np.ndarray, utterances: int, gap_seconds: float) -> np.ndarray:
+    """The audio each client streams: the test file `utterances` times, each followed by a silent gap."""
+    gap = np.zeros(int(gap_seconds * settings.STREAM_SAMPLE_RATE), dtype=np.int16)
+    return np.concatenate([np.concatenate([audio, gap]) for _ in range(utterances)])
+
+def find_speech_ends(vad: VADInterface, stream: np.ndarray) -> List[float]:
+    """
+    Offsets (in seconds) where a speech region of the stream ends, i.e. the last
+    voiced frame before at least BUFFER_SECONDS_AFTER of silence. A final
+    transcription's latency is measured from the closest speech end before it.
+    """
+    frame_samples = settings.VAD_FRAME_SAMPLES
+    frame_seconds = frame_samples / settings.STREAM_SAMPLE_RATE
+    hangover_frames = int(np.ceil(settings.BUFFER_SECONDS_AFTER / frame_seconds))
+
+    ends: List[float] = []
+    last_voiced: Optional[int] = None
+    for index in range(len(stream) // frame_samples):
+        frame = stream[index * frame_samples:(index + 1) * frame_samples]
+        if vad.detect_voice_activity(frame) >= settings.VAD_THRESHOLD:
+            last_voiced = index
+        elif last_voiced is not None and index - last_voiced >= hangover_frames:
+            ends.append((last_voiced + 1) * frame_seconds)
+            last_voiced = None
+    if last_voiced is not None:
+        ends.append((last_voiced + 1) * frame_seconds)
+    return ends
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task that sleeps for a fixed interval."""
+
+    def __init__(self, interval_seconds: float = 0.01) -> None:
+        self.interval_seconds = interval_seconds
+        self.lags_ms: List[float] = []
+
+    async def run(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            self.lags_ms.append(max(0.0, (time.perf_counter() - started_at - self.interval_seconds) * 1000))
+
+class SimulatedClient:
+    """One WebSocket client streaming its audio in real time on a fixed send schedule."""
+
+    def __init__(self, stream: np.ndarray, chunk_samples: int, late_ms: float, drop_ms: float) -> None:
+        self.stream = stream
+        self.chunk_samples = chunk_samples
+        self.late_seconds = late_ms / 1000
+        self.drop_seconds = drop_ms / 1000
+        self.client_id: Optional[str] = None
+        self.started_at: float = 0.0
+        self.chunks_sent = 0
+        self.chunks_late = 0
+        self.chunks_dropped = 0
+        self.send_delays_ms: List[float] = []
+
+    async def stream_audio(self, websocket) -> None:
+        chunk_seconds = self.chunk_samples / settings.STREAM_SAMPLE_RATE
+        self.started_at = time.perf_counter()
+        for index, offset in enumerate(range(0, len(self.stream), self.chunk_samples)):
+            scheduled_at = self.started_at + (index + 1) * chunk_seconds  # A chunk can be sent once it was "recorded"
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            lateness = time.perf_counter() - scheduled_at
+            self.send_delays_ms.append(max(0.0, lateness) * 1000)
+            if lateness > self.drop_seconds:
+                # A real-time source can't buffer forever: this chunk is lost
+                self.chunks_dropped += 1
+                continue
+            if lateness > self.late_seconds:
+                self.chunks_late += 1
+            await websocket.send(self.stream[offset:offset + self.chunk_samples].tobytes())
+            self.chunks_sent += 1
+
+async def run_step(
+    url: str,
+    n_clients: int,
+    stream: np.ndarray,
+    speech_ends: List[float],
+    connected: asyncio.Queue,
+    finals: Dict[str, List[float]],
+    asr: TimedASR,
+    router: StreamingWSRouter,
+    args: argparse.Namespace,
+) -> dict:
+    finals.clear()
+    asr.reset()
+    monitor = LoopLagMonitor()
+    monitor_task = asyncio.create_task(monitor.run())
+    chunk_samples = int(args.chunk_ms * settings.STREAM_SAMPLE_RATE / 1000)
+    clients = [SimulatedClient(stream, chunk_samples, args.late_ms, args.drop_ms) for _ in range(n_clients)]
+
+    # Connect one by one, so each socket can be paired with the client ID the server reports
+    websockets_ = []
+    for client in clients:
+        websockets_.append(await websockets.connect(url, max_size=None))
+        client.client_id = (await connected.get()).client_id
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client.stream_audio(ws) for client, ws in zip(clients, websockets_)))
+    stream_seconds = time.perf_counter() - started_at
+
+    # Let the outstanding utterances finish
+    expected = len(speech_ends)
+    deadline = time.perf_counter() + args.drain_seconds
+    while time.perf_counter() < deadline and any(len(finals.get(c.client_id, [])) < expected for c in clients):
+        await asyncio.sleep(0.05)
+
+    for ws in websockets_:
+        await ws.close()
+    monitor_task.cancel()
+
+    latencies_ms: List[float] = []
+    for client in clients:
+        for arrived_at in finals.get(client.client_id, []):
+            offset = arrived_at - client.started_at
+            previous_ends = [end for end in speech_ends if end <= offset]
+            if previous_ends:
+                latencies_ms.append((offset - previous_ends[-1]) * 1000)
+
+    scheduler_stats = router.connection_manager.asr_scheduler.get_stats()
+    return {
+        "clients": n_clients,
+        "stream_seconds": round(stream_seconds, 3),
+        "finals_expected": expected * n_clients,
+        "finals_received": sum(len(finals.get(client.client_id, [])) for client in clients),
+        "end_of_speech_to_transcript_ms": percentiles(latencies_ms),
+        "real_time_factor": round(asr.compute_seconds / asr.audio_seconds, 4) if asr.audio_seconds else None,
+        "asr_compute_seconds": round(asr.compute_seconds, 3),
+        "asr_audio_seconds": round(asr.audio_seconds, 3),
+        "asr_batches": asr.batches,
+        "event_loop_lag_ms": percentiles(monitor.lags_ms),
+        "send_delay_ms": percentiles([delay for client in clients for delay in client.send_delays_ms]),
+        "chunks_sent": sum(client.chunks_sent for client in clients),
+        "chunks_late": sum(client.chunks_late for client in clients),
+        "chunks_dropped": sum(client.chunks_dropped for client in clients),
+        "scheduler": scheduler_stats.model_dump(),
+    }
+
+async def main_async(args: argparse.Namespace) -> dict:
+    audio, file_sample_rate = sf.read(args.audio, dtype="int16")
+    if file_sample_rate != settings.STREAM_SAMPLE_RATE:
+        raise ValueError(f"Expected a {settings.STREAM_SAMPLE_RATE} Hz file, got {file_sample_rate} Hz")
+    if audio.ndim > 1:
+        audio = audio[:, 0]
+
+    vad = EnergyVAD() if args.vad == "energy" else VADFactory.create_vad_pipeline(settings.VAD_MODEL)
+    pipeline = (
+        MockASR(args.asr_latency_ms, args.asr_ms_per_audio_second) if args.asr == "mock"
+        else ASRFactory.create_asr_pipeline(settings.ASR_MODEL)
+    )
+    asr = TimedASR(pipeline)
+
+    stream = build_stream(audio, args.utterances, args.gap_seconds)
+    speech_ends = find_speech_ends(vad, stream)
+
+    connected: asyncio.Queue = asyncio.Queue()
+    finals: Dict[str, List[float]] = {}
+
+    # Coroutine callbacks run on the event loop, where the queue and the results live
+    async def on_transcription(chunk: StreamingDataChunk) -> None:
+        if chunk.is_final:
+            finals.setdefault(chunk.client_id, []).append(time.perf_counter())
+
+    async def on_new_client(client: NewClientConnected) -> None:
+        connected.put_nowait(client)
+
+    router = StreamingWSRouter(on_transcription, on_new_client, vad_pipeline=vad, asr_pipeline=asr)
+    app = FastAPI()
+    app.include_router(router)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", ws_max_size=2 ** 24))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    url = f"ws://127.0.0.1:{port}/ws/transcribe"
+
+    runs = []
+    try:
+        for n_clients in args.clients:
+            result = await run_step(url, n_clients, stream, speech_ends, connected, finals, asr, router, args)
+            runs.append(result)
+            latency = result["end_of_speech_to_transcript_ms"]
+            print(
+                f"clients={n_clients:>4} | latency p50={latency['p50']} p99={latency['p99']} ms | "
+                f"rtf={result['real_time_factor']} | loop lag p99={result['event_loop_lag_ms']['p99']} ms | "
+                f"late={result['chunks_late']} dropped={result['chunks_dropped']}",
+                file=sys.stderr,
+            )
+    finally:
+        server.should_exit = True
+        await server_task
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {"platform": platform.platform(), "python": platform.python_version()},
+        "config": {
+            **{key: value for key, value in vars(args).items() if key != "output"},
+            "vad_model": type(vad).__name__,
+            "asr_model": type(pipeline).__name__,
+            "buffering_strategy": settings.BUFFERING_STRATEGY,
+            "buffer_seconds_after": settings.BUFFER_SECONDS_AFTER,
+            "asr_batch_max_size": settings.ASR_BATCH_MAX_SIZE,
+            "asr_batch_max_wait_ms": settings.ASR_BATCH_MAX_WAIT_MS,
+            "inference_executor": settings.INFERENCE_EXECUTOR,
+            "speech_ends_per_client": len(speech_ends),
+        },
+        "runs": runs,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the streaming WebSocket endpoint with N concurrent real-time clients.")
+    parser.add_argument("--audio", default="experiments/audio/test2.wav")
+    parser.add_argument("--clients", type=lambda value: [int(n) for n in value.split(",")], default=[1, 4, 16, 64],
+                        help="Comma separated numbers of concurrent clients, one run each")
+    parser.add_argument("--asr", choices=["mock", "model"], default="mock",
+                        help="A mock ASR with configurable latency, or the model from the settings")
+    parser.add_argument("--asr-latency-ms", type=float, default=150.0, help="Mock ASR cost per batch")
+    parser.add_argument("--asr-ms-per-audio-second", type=float, default=20.0, help="Mock ASR cost per second of audio")
+    parser.add_argument("--vad", choices=["energy", "model"], default="energy",
+                        help="A stateless energy VAD, or the VAD model from the settings")
+    parser.add_argument("--utterances", type=int, default=2, help="How many times each client streams the audio file")
+    parser.add_argument("--gap-seconds", type=float, default=2.0, help="Silence streamed after each repetition")
+    parser.add_argument("--chunk-ms", type=float, default=100.0, help="Audio per WebSocket message")
+    parser.add_argument("--late-ms", type=float, default=100.0, help="A chunk sent later than this after it was due is late")
+    parser.add_argument("--drop-ms", type=float, default=1000.0, help="A chunk later than this is dropped instead of sent")
+    parser.add_argument("--drain-seconds", type=float, default=10.0, help="How long to wait for the last transcriptions")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--output", default=None, help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    # The model from the settings can only be wrapped for timing when inference runs in threads
+    if settings.INFERENCE_EXECUTOR != "thread":
+        raise SystemExit("Set INFERENCE_EXECUTOR=thread for the load benchmark")
+
+    # The websockets client logs every frame at debug level
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    results = asyncio.run(main_async(args))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
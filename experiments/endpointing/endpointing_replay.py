@@ -0,0 +1,117 @@
+# Path: experiments/endpointing/endpointing_replay.py
+# Description: Replays recorded VAD probability traces through the fixed and the adaptive endpointers, and reports the end-of-utterance latency the adaptive one saves and the utterances it cuts too early, for several accepted cut risks.
+
+# RUN: python experiments/endpointing/endpointing_replay.py TRACE... [--save-traces DIR] [--cut-risk 0 0.05 0.1 0.2 0.5]
+#      TRACE is a .npy file with one voice probability per VAD frame, or a WAV file whose trace is computed with VAD_MODEL.
+#      python experiments/endpointing/endpointing_replay.py --synthetic 20  (generated conversational traces, no model needed)
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Tuple
+sys.path.append('.')
+
+import numpy as np
+from ssi.config import get_settings
+from ssi.utils.endpointing.adaptive_endpointer import AdaptiveEndpointer
+from ssi.utils.endpointing.endpointer_interface import EndpointerInterface
+from ssi.utils.endpointing.fixed_endpointer import FixedEndpointer
+
+settings = get_settings()
+FRAME_SECONDS = settings.VAD_FRAME_SAMPLES / settings.STREAM_SAMPLE_RATE
+
+def load_traces(paths: List[str], save_dir: str = None) -> Dict[str, np.ndarray]:
+    """Load .npy traces, and compute the traces of WAV files with the configured VAD."""
+    traces, vad = {}, None
+    for path in paths:
+        if path.endswith(".npy"):
+            traces[path] = np.load(path)
+            continue
+        if vad is None:
+            from ssi.utils.vad.vad_factory import VADFactory
+            vad = VADFactory.create_vad_pipeline(settings.VAD_MODEL)
+        from ssi.utils.offline.wav_reader import load_wav
+        traces[path] = vad.speech_probabilities(load_wav(path))
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+            np.save(os.path.join(save_dir, os.path.basename(path) + ".npy"), traces[path])
+    return traces
+
+def synthetic_trace(rng: np.random.Generator, utterances: int) -> np.ndarray:
+    """A conversation: bursts of speech with short, sometimes breathy, pauses between them, and long silences between utterances."""
+    frames: List[np.ndarray] = []
+    def add(seconds: float, low: float, high: float) -> None:
+        frames.append(rng.uniform(low, high, max(1, int(seconds / FRAME_SECONDS))))
+    add(1.0, 0.0, 0.1)
+    for _ in range(utterances):
+        for burst in range(rng.integers(1, 6)):
+            if burst:
+                breathy = rng.random() < 0.3
+                add(min(rng.exponential(0.25), 0.9), *((0.2, 0.45) if breathy else (0.0, 0.15)))
+            add(rng.uniform(0.2, 1.2), 0.6, 1.0)
+        add(rng.uniform(1.5, 4.0), 0.0, 0.1)
+    return np.concatenate(frames)
+
+def replay(trace: np.ndarray, endpointer: EndpointerInterface) -> List[Tuple[int, float]]:
+    """Run a trace through an endpointer like `SilenceAtEndOfChunk` does, returning the frame and the hangover of each endpoint."""
+    endpoints, recording = [], False
+    for index, prob in enumerate(trace.tolist()):
+        if not recording:
+            if prob < settings.VAD_THRESHOLD:
+                continue
+            recording = True
+            endpointer.start_utterance()
+        if endpointer.update(prob, FRAME_SECONDS):
+            endpoints.append((index, endpointer.silence_seconds))
+            recording = False
+    return endpoints
+
+def evaluate(traces: Dict[str, np.ndarray], cut_risk: float) -> Dict[str, float]:
+    # The fixed endpointer counts whole frames, so it waits for its hangover rounded up to a frame
+    lookahead = int(np.ceil(settings.BUFFER_SECONDS_AFTER / FRAME_SECONDS - 1e-9))
+    fixed_hangover = lookahead * FRAME_SECONDS
+    ends, false_cuts, saved = 0, 0, []
+    for trace in traces.values():
+        endpointer = AdaptiveEndpointer(cut_risk=cut_risk, max_hangover=settings.BUFFER_SECONDS_AFTER)
+        for index, hangover in replay(trace, endpointer):
+            ends += 1
+            silence_start = index + 1 - int(round(hangover / FRAME_SECONDS))
+            # The fixed endpointer would have kept recording if the speech comes back within its hangover
+            if np.any(trace[index + 1:silence_start + lookahead] >= settings.VAD_THRESHOLD):
+                false_cuts += 1
+            else:
+                saved.append(fixed_hangover - hangover)
+    return {
+        "endpoints": ends,
+        "false_cuts": false_cuts,
+        "false_cut_rate": false_cuts / max(ends, 1),
+        "mean_saved_ms": round(1000 * float(np.mean(saved)), 1) + 0.0 if saved else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay VAD probability traces through the endpointers.")
+    parser.add_argument("traces", nargs="*", help=".npy probability traces or WAV files")
+    parser.add_argument("--save-traces", default=None, help="Save the traces computed from WAV files to this directory")
+    parser.add_argument("--synthetic", type=int, default=0, help="Add this many generated traces of 20 utterances each")
+    parser.add_argument("--cut-risk", type=float, nargs="+", default=[0.0, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    traces = load_traces(args.traces, args.save_traces)
+    rng = np.random.default_rng(args.seed)
+    for index in range(args.synthetic):
+        traces[f"synthetic-{index}"] = synthetic_trace(rng, 20)
+    if not traces:
+        parser.error("Give traces or --synthetic")
+
+    fixed_ends = sum(len(replay(trace, FixedEndpointer())) for trace in traces.values())
+    print(f"{len(traces)} trace(s), {sum(map(len, traces.values())) * FRAME_SECONDS:.0f}s, "
+          f"{fixed_ends} utterances with the fixed {settings.BUFFER_SECONDS_AFTER}s hangover")
+    print(f"{'cut risk':>8} | {'endpoints':>9} | {'false cuts':>10} | {'saved ms (mean)':>15}")
+    for cut_risk in args.cut_risk:
+        result = evaluate(traces, cut_risk)
+        print(f"{cut_risk:>8.2f} | {result['endpoints']:>9} | "
+              f"{result['false_cuts']:>4} ({result['false_cut_rate']:>4.0%}) | {result['mean_saved_ms']:>15.0f}")
+
+if __name__ == "__main__":
+    main()
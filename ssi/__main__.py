@@ -1,5 +1,7 @@
 # Path: ssi/__main__.py
 # Description: This script will contain the main entry point for the package.
 
-def main():
-    print("Hello, World!")
+from ssi.cli.__main__ import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+# Path: ssi/cli/__main__.py
+# Description: This script is the command line entry point of the package. `serve` loads the VAD and ASR models once in a parent process and forks the serving workers, which share the model weights copy-on-write. `transcribe` transcribes recordings offline.
+
+import argparse
+import asyncio
+import gc
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import torch
+from fastapi import FastAPI
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.asr.asr_factory import ASRFactory
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.metrics.process_memory import memory_usage
+from ssi.utils.vad.vad_factory import VADFactory
+from ssi.utils.vad.vad_interface import VADInterface
+
+settings = get_settings()
+logger = get_logger()
+
+RESTART_BACKOFF_SECONDS = 0.5  # Delay before forking again a worker which failed at startup, doubled at each failure in a row
+RESTART_BACKOFF_MAX_SECONDS = 30.0
+WORKER_STARTUP_SECONDS = 10.0  # A worker which exits sooner than this after being forked failed at startup
+
+# Builds the application a worker serves, from the pipelines the parent preloaded (None when it didn't)
+AppFactory = Callable[[Optional[VADInterface], Optional[ASRInterface]], FastAPI]
+
+def default_app_factory(vad_pipeline: Optional[VADInterface], asr_pipeline: Optional[ASRInterface]) -> FastAPI:
+    """
+    An application with the streaming router, which logs the transcriptions, and the `/metrics` route.
+    """
+    # Imported here, so that loading the models doesn't wait for the web framework
+    from ssi.fastapi.routers.streaming_ws import StreamingWSRouter
+
+    def asr_callback(chunk) -> None:
+        logger.info(f"[{chunk.client_id}] {chunk.transcription}")
+
+    def new_client_callback(client) -> None:
+        logger.info(f"Client connected: {client.client_id}")
+
+    app = FastAPI()
+    app.include_router(StreamingWSRouter(
+        asr_callback=asr_callback,
+        new_client_callback=new_client_callback,
+        vad_pipeline=vad_pipeline,
+        asr_pipeline=asr_pipeline,
+        metrics_endpoint="/metrics",
+    ))
+    return app
+
+def load_app_factory(path: str) -> AppFactory:
+    """
+    Import an app factory given as "module:function".
+    """
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise ValueError(f"The app factory must be given as 'module:function', not '{path}'")
+    return getattr(importlib.import_module(module_name), attribute)
+
+def preload_pipelines() -> Tuple[VADInterface, ASRInterface]:
+    """
+    Load the VAD and ASR models in this process, without warming them up.
+
+    The warmup runs in each worker instead: running the models here would start
+    the intra-op thread pool, which the forked workers couldn't use.
+    """
+    started_at = time.perf_counter()
+    vad_pipeline = VADFactory.create_vad_pipeline(settings.VAD_MODEL)
+    asr_pipeline = ASRFactory.create_asr_pipeline(settings.ASR_MODEL)
+    logger.info(f"Preloaded the VAD and ASR models in {time.perf_counter() - started_at:.2f}s")
+    return vad_pipeline, asr_pipeline
+
+def worker_cpu_slices(workers: int) -> List[List[int]]:
+    """
+    Split the CPUs this process may run on into one contiguous slice per worker.
+
+    With more workers than CPUs, the workers get one CPU each, round robin.
+    """
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    if workers >= len(cpus):
+        return [[cpus[index % len(cpus)]] for index in range(workers)]
+    size, extra = divmod(len(cpus), workers)
+    slices, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        slices.append(cpus[start:end])
+        start = end
+    return slices
+
+def _uses_cuda() -> bool:
+    device = settings.ASR_DEVICE
+    return device.startswith("cuda") or (device == "auto" and torch.cuda.is_available())
+
+def _run_worker(
+    index: int,
+    sock: socket.socket,
+    cpus: Optional[List[int]],
+    torch_threads: int,
+    vad_pipeline: Optional[VADInterface],
+    asr_pipeline: Optional[ASRInterface],
+    app_factory: AppFactory,
+    log_level: str,
+) -> None:
+    """
+    Serve on the shared socket in a forked worker process. Never returns.
+
+    A worker pinned to `cpus` runs as many torch threads as it has CPUs, an
+    unpinned one the `torch_threads` the parent had before preloading.
+    """
+    import uvicorn
+
+    # The parent's handlers would stop all workers; uvicorn installs its own
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    if cpus is not None:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        torch.set_num_threads(len(cpus))
+    else:
+        # The parent may have dropped to one thread for preloading
+        torch.set_num_threads(torch_threads)
+    logger.info(f"Worker {index} (pid {os.getpid()}) serving with {torch.get_num_threads()} torch thread(s) on CPUs {cpus or 'any'}")
+
+    exit_code = 0
+    try:
+        app = app_factory(vad_pipeline, asr_pipeline)
+        server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, ws_max_size=2 ** 24))
+        server.run(sockets=[sock])
+    except BaseException as e:
+        logger.error(f"Worker {index} failed: {e}")
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+def _log_memory(workers: Dict[int, int]) -> None:
+    parent = memory_usage()
+    usages = {index: memory_usage(pid) for index, pid in sorted(workers.items())}
+    lines = [
+        f"worker {index} (pid {workers[index]}): rss {usage.get('rss', 0) / 2 ** 20:.0f} MiB, "
+        f"pss {usage.get('pss', 0) / 2 ** 20:.0f} MiB, "
+        f"shared {(usage.get('shared_clean', 0) + usage.get('shared_dirty', 0)) / 2 ** 20:.0f} MiB"
+        for index, usage in usages.items()
+    ]
+    total_pss = parent.get("pss", 0) + sum(usage.get("pss", 0) for usage in usages.values())
+    logger.info(
+        f"Memory: parent pss {parent.get('pss', 0) / 2 ** 20:.0f} MiB, total pss {total_pss / 2 ** 20:.0f} MiB\n  "
+        + "\n  ".join(lines)
+    )
+
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: int = 1,
+    preload: bool = True,
+    pin_cores: bool = True,
+    app_factory: AppFactory = default_app_factory,
+    memory_report_interval: float = 60.0,
+    log_level: str = "info",
+    max_startup_failures: int = 5,
+) -> None:
+    """
+    Serve the application from `workers` forked processes sharing one listening socket.
+
+    With `preload`, the models are loaded once here before forking, so the
+    workers share the weights copy-on-write: the weights stay in memory once,
+    however many workers there are, as long as nothing writes to them.
+    Without it, each worker loads its own models, which is the baseline the
+    preloaded mode is compared against.
+
+    With `pin_cores`, each worker runs on its own slice of the CPUs, with as
+    many torch intra-op threads as it has CPUs, so the workers don't compete
+    for the same cores. Workers which exit are forked again, after a delay
+    which doubles each time a worker fails at startup in a row, and serving
+    stops once a worker failed at startup `max_startup_failures` times in a
+    row. SIGINT or SIGTERM stops all workers.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        workers (int): The number of worker processes.
+        preload (bool): Load the models before forking, instead of in each worker.
+        pin_cores (bool): Pin each worker to its slice of the CPUs.
+        app_factory (AppFactory): Builds the application in each worker.
+        memory_report_interval (float): Seconds between the memory reports of the workers. 0 disables them.
+        log_level (str): The uvicorn log level.
+        max_startup_failures (int): Stop after a worker failed at startup this many times in a row. 0 never stops.
+    """
+    if settings.INFERENCE_EXECUTOR == "process":
+        logger.warning("INFERENCE_EXECUTOR=process loads the models again in each executor process, so they aren't shared")
+    if preload and _uses_cuda():
+        # A CUDA context can't be used across fork
+        logger.warning("The ASR model runs on CUDA, which can't be shared by forked workers; loading the models per worker")
+        preload = False
+
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    logger.info(f"Listening on {host}:{sock.getsockname()[1]} with {workers} worker(s)")
+
+    vad_pipeline, asr_pipeline = None, None
+    torch_threads = torch.get_num_threads()
+    if preload:
+        # Load on one thread, so no intra-op thread pool exists when the workers are forked
+        torch.set_num_threads(1)
+        vad_pipeline, asr_pipeline = preload_pipelines()
+        # Keep the loaded objects out of the garbage collector, which would write to their pages in the workers
+        gc.collect()
+        gc.freeze()
+
+    cpu_slices = worker_cpu_slices(workers) if pin_cores else [None] * workers
+    running: Dict[int, int] = {}  # worker index -> pid
+    started_at: Dict[int, float] = {}  # worker index -> when it was forked
+    restart_at: Dict[int, float] = {}  # worker index -> when to fork it again
+    startup_failures: Dict[int, int] = {index: 0 for index in range(workers)}  # worker index -> failures in a row
+    stopping = False
+    failed = False
+
+    def fork_worker(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(index, sock, cpu_slices[index], torch_threads, vad_pipeline, asr_pipeline, app_factory, log_level)
+        running[index] = pid
+        started_at[index] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for index in range(workers):
+        fork_worker(index)
+
+    next_report = time.monotonic() + memory_report_interval
+    while not stopping:
+        time.sleep(0.2)
+        now = time.monotonic()
+        for index, pid in list(running.items()):
+            if os.waitpid(pid, os.WNOHANG)[0] != pid:
+                continue
+            del running[index]
+            if now - started_at[index] >= WORKER_STARTUP_SECONDS:
+                startup_failures[index] = 0
+                logger.error(f"Worker {index} (pid {pid}) exited, forking it again")
+                restart_at[index] = now
+                continue
+            startup_failures[index] += 1
+            if max_startup_failures > 0 and startup_failures[index] >= max_startup_failures:
+                logger.error(f"Worker {index} (pid {pid}) failed at startup {startup_failures[index]} times in a row, stopping")
+                stopping = failed = True
+                break
+            delay = min(RESTART_BACKOFF_SECONDS * 2 ** (startup_failures[index] - 1), RESTART_BACKOFF_MAX_SECONDS)
+            logger.error(f"Worker {index} (pid {pid}) failed at startup, forking it again in {delay:.1f}s")
+            restart_at[index] = now + delay
+        for index, at in list(restart_at.items()):
+            if not stopping and now >= at:
+                del restart_at[index]
+                fork_worker(index)
+        if memory_report_interval > 0 and time.monotonic() >= next_report:
+            _log_memory(running)
+            next_report = time.monotonic() + memory_report_interval
+
+    logger.info("Stopping the workers")
+    for pid in running.values():
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in running.values():
+        os.waitpid(pid, 0)
+    sock.close()
+    if failed:
+        sys.exit(1)
+
+def _log_to_stderr() -> None:
+    """
+    Move the console log handlers from stdout to stderr, so stdout carries only the output.
+    """
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and getattr(handler, "stream", None) is sys.stdout:
+            handler.setStream(sys.stderr)
+
+def transcribe(
+    paths: Sequence[str],
+    output: str = "-",
+    batch_size: int = settings.ASR_BATCH_MAX_SIZE,
+    workers: int = settings.ASR_INFERENCE_WORKERS,
+    block_seconds: float = 30.0,
+) -> None:
+    """
+    Transcribe WAV recordings offline, much faster than real-time.
+
+    Each segment is written as one JSON line (see `TranscribedSegment`) as
+    soon as its batch is transcribed, so the segments of a recording are in
+    the order they finish, not in the order they were spoken.
+
+    Args:
+        paths (Sequence[str]): The 16-bit PCM WAV files, transcribed one after another.
+        output (str): The JSON lines file. "-" writes to stdout, and the logs then go to stderr.
+        batch_size (int): The most segments per ASR call.
+        workers (int): The most ASR calls running at once.
+        block_seconds (float): The length of the blocks the VAD runs side by side.
+    """
+    # Imported here, so that `serve` doesn't import the offline modules
+    from ssi.utils.offline.file_transcriber import FileTranscriber
+    from ssi.utils.offline.wav_reader import load_wav
+
+    if output == "-":
+        _log_to_stderr()
+    # The ASR executor is created on first use, so its size can still be set here
+    settings.ASR_INFERENCE_WORKERS = max(settings.ASR_INFERENCE_WORKERS, workers)
+
+    vad_pipeline, asr_pipeline = preload_pipelines()
+    transcriber = FileTranscriber(vad_pipeline, asr_pipeline, batch_size=batch_size, workers=workers, block_seconds=block_seconds)
+
+    async def run(file) -> None:
+        for path in paths:
+            async for segment in transcriber.transcribe(load_wav(path), source=path):
+                file.write(segment.model_dump_json() + "\n")
+                file.flush()
+
+    if output == "-":
+        asyncio.run(run(sys.stdout))
+    else:
+        with open(output, "w", encoding="utf-8") as file:
+            asyncio.run(run(file))
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="ssi", description="SSI (Speech Super Intelligence) command line interface.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Serve the streaming transcription WebSocket from forked workers.")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=1)
+    serve_parser.add_argument(
+        "--no-preload", dest="preload", action="store_false",
+        help="Load the models in each worker instead of once before forking",
+    )
+    serve_parser.add_argument(
+        "--no-pin-cores", dest="pin_cores", action="store_false",
+        help="Don't pin the workers and their torch threads to separate CPUs",
+    )
+    serve_parser.add_argument(
+        "--app-factory", default=None,
+        help="'module:function' called with the preloaded VAD and ASR pipelines in each worker, returning the FastAPI app",
+    )
+    serve_parser.add_argument("--memory-report-interval", type=float, default=60.0, help="Seconds, 0 disables")
+    serve_parser.add_argument("--log-level", default="info")
+    serve_parser.add_argument(
+        "--max-startup-failures", type=int, default=5,
+        help="Stop after a worker failed at startup this many times in a row, 0 never stops",
+    )
+
+    transcribe_parser = commands.add_parser("transcribe", help="Transcribe WAV recordings offline, as JSON lines.")
+    transcribe_parser.add_argument("paths", nargs="+", metavar="FILE", help="16-bit PCM WAV files")
+    transcribe_parser.add_argument("-o", "--output", default="-", help="The JSON lines file, '-' for stdout")
+    transcribe_parser.add_argument("--batch-size", type=int, default=settings.ASR_BATCH_MAX_SIZE)
+    transcribe_parser.add_argument("--workers", type=int, default=settings.ASR_INFERENCE_WORKERS, help="ASR batches running at once")
+    transcribe_parser.add_argument("--block-seconds", type=float, default=30.0, help="Length of the VAD blocks run side by side")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            preload=args.preload,
+            pin_cores=args.pin_cores,
+            app_factory=load_app_factory(args.app_factory) if args.app_factory else default_app_factory,
+            memory_report_interval=args.memory_report_interval,
+            log_level=args.log_level,
+            max_startup_failures=args.max_startup_failures,
+        )
+    elif args.command == "transcribe":
+        transcribe(
+            paths=args.paths,
+            output=args.output,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            block_seconds=args.block_seconds,
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# Path: ssi/clients/__init__.py
+
+from ssi.clients.client_interface import ClientInterface
+from ssi.clients.streaming_client import ClientStream, StreamingClient
+
+__all__ = ['ClientInterface', 'ClientStream', 'StreamingClient']
@@ -0,0 +1,49 @@
+# Path: ssi/clients/client_interface.py
+# Description: This module contains the interface for the clients which stream audio to SSI servers. We'll implement the interface for the different transports in the respective files.
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Optional, Union
+from ssi.types.streaming_data_chunk import StreamingDataChunk
+
+ResultCallback = Callable[[StreamingDataChunk], Union[None, Awaitable[None]]]
+
+class ClientInterface(ABC):
+    """
+    An interface for the clients which stream audio to SSI servers.
+
+    A client carries any number of logical audio streams, e.g. one per end
+    user, and delivers their transcriptions to a callback.
+
+    Methods:
+        start: Connect to the servers.
+        stop: Close every stream and connection.
+        open_stream: Open a logical audio stream.
+    """
+
+    @abstractmethod
+    async def start(self) -> None:
+        """
+        Connect to the servers. Opening a stream before calling it starts the client.
+        """
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """
+        Close every stream and connection.
+        """
+        pass
+
+    @abstractmethod
+    async def open_stream(self, stream_key: Optional[str] = None, on_result: Optional[ResultCallback] = None) -> Any:
+        """
+        Open a logical audio stream.
+
+        Args:
+            stream_key (Optional[str]): Identifies the stream on the server, also across reconnects. A random key by default.
+            on_result (Optional[ResultCallback]): Called with the stream's transcriptions, instead of the client's `asr_callback`.
+
+        Returns:
+            The stream, to send audio to and close.
+        """
+        pass
@@ -0,0 +1,424 @@
+# Path: ssi/clients/streaming_client.py
+# Description: This module contains the StreamingClient class, which multiplexes many logical audio streams over a small pool of persistent WebSocket connections to one or more SSI servers, with reconnect and resume, and a FastAPI router to proxy end-user WebSockets through it.
+
+import asyncio
+import inspect
+import itertools
+import logging
+import random
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import websockets
+from fastapi import APIRouter, WebSocket
+from fastapi.websockets import WebSocketDisconnect
+from ssi.clients.client_interface import ClientInterface, ResultCallback
+from ssi.types.new_client_connected import NewClientConnected
+from ssi.types.streaming_data_chunk import StreamingDataChunk
+from ssi.utils.ws.multistream_protocol import (
+    MAX_STREAM_ID,
+    FrameType,
+    ProtocolError,
+    decode_control,
+    decode_frame,
+    decode_offset,
+    encode_control,
+    encode_frame,
+)
+
+# The client is installed without the server's dependencies (`ssi[client]`), so it logs with the standard library
+logger = logging.getLogger(__name__)
+
+class ClientStream:
+    """
+    One logical audio stream of a `StreamingClient`.
+
+    The audio sent on the stream is kept in a replay buffer until the server
+    acknowledged it. If the connection drops, the stream is opened again on
+    the next connection with "resume", and the audio the server doesn't have
+    yet is sent again from the buffer. Audio older than the buffer can't be
+    sent again; it is counted in `lost_bytes`.
+
+    Attributes:
+        key (str): Identifies the stream on the server, also across connections. The server uses it as the client ID.
+        offset (int): Bytes of audio sent on the stream so far.
+        lost_bytes (int): Bytes of audio the server never received because they were no longer in the replay buffer.
+    """
+
+    def __init__(self, client: "StreamingClient", key: str, on_result: Optional[ResultCallback], max_replay_bytes: int) -> None:
+        self.client: "StreamingClient" = client
+        self.key: str = key
+        self.on_result: Optional[ResultCallback] = on_result
+        self.max_replay_bytes: int = max_replay_bytes
+        self.offset: int = 0
+        self.lost_bytes: int = 0
+        self.connection: Optional["_PooledConnection"] = None
+        self.stream_id: Optional[int] = None
+
+        self._replay = bytearray()
+        self._replay_start: int = 0  # The offset of the first byte in the replay buffer
+        # How far the current connection got the audio; None until the server confirmed the stream is open on it
+        self._wire_offset: Optional[int] = None
+        self._closing: bool = False
+        self._closed = asyncio.Event()
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed.is_set()
+
+    async def send_audio(self, data: bytes) -> None:
+        """
+        Send raw int16 audio. While the stream is being (re)opened, the audio is only buffered.
+        """
+        if self._closing:
+            raise RuntimeError(f"Stream {self.key} is closed")
+        self._replay += data
+        self.offset += len(data)
+        overflow = len(self._replay) - self.max_replay_bytes
+        if overflow > 0:
+            del self._replay[:overflow]
+            self._replay_start += overflow
+        await self._flush()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        End the stream and wait (at most `timeout` seconds) until the server delivered its last results and closed it.
+        """
+        if not self._closing:
+            self._closing = True
+            if self._wire_offset is not None:
+                await self._send_close()
+        try:
+            await asyncio.wait_for(self._closed.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stream {self.key} wasn't confirmed closed by the server within {timeout}s")
+            self._on_closed()
+
+    async def _flush(self) -> None:
+        """
+        Send the audio the current connection doesn't have yet.
+        """
+        connection = self.connection
+        while connection is not None and connection is self.connection and self._wire_offset is not None and self._wire_offset < self.offset:
+            start = self._wire_offset
+            if start < self._replay_start:
+                self.lost_bytes += self._replay_start - start
+                logger.warning(f"Stream {self.key} lost {self._replay_start - start} bytes of audio older than its replay buffer")
+                start = self._replay_start
+            chunk = bytes(self._replay[start - self._replay_start:])
+            # Advanced before sending, so a concurrent flush doesn't send the same audio again
+            self._wire_offset = start + len(chunk)
+            if not await connection.send(encode_frame(FrameType.AUDIO, self.stream_id, chunk)):
+                return  # The connection dropped; the stream resumes on the next one
+
+    async def _send_close(self) -> None:
+        if self.connection is not None:
+            await self.connection.send(encode_frame(FrameType.CLOSE, self.stream_id))
+
+    async def _on_opened(self, server_offset: int) -> None:
+        self._wire_offset = min(server_offset, self.offset)
+        self._on_ack(self._wire_offset)
+        await self._flush()
+        if self._closing:
+            await self._send_close()
+
+    def _on_ack(self, offset: int) -> None:
+        drop = min(offset - self._replay_start, len(self._replay))
+        if drop > 0:
+            del self._replay[:drop]
+            self._replay_start += drop
+
+    def _on_closed(self) -> None:
+        if self.connection is not None:
+            self.connection.streams.pop(self.stream_id, None)
+        self.client.streams.pop(self.key, None)
+        self._closing = True
+        self._closed.set()
+
+class _PooledConnection:
+    """
+    One persistent WebSocket connection of the pool, carrying the streams attached to it.
+
+    It reconnects with exponential backoff when the connection drops, and
+    reopens its streams with "resume" on the new connection.
+    """
+
+    def __init__(self, client: "StreamingClient", url: str) -> None:
+        self.client: "StreamingClient" = client
+        self.url: str = url
+        self.websocket = None
+        self.streams: Dict[int, ClientStream] = {}
+        self.failures: int = 0
+        self._stream_ids = itertools.count(1)
+        self._send_lock = asyncio.Lock()  # Keeps the frames in the order they were sent
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return self.websocket is not None
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._deliver_results())]
+
+    async def stop(self) -> None:
+        if self.websocket is not None:
+            await self.websocket.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def attach(self, stream: ClientStream, resume: bool) -> None:
+        """
+        Carry `stream` on this connection, opening it on the server if connected.
+        """
+        stream_id = next(self._stream_ids) % MAX_STREAM_ID or next(self._stream_ids)
+        self.streams[stream_id] = stream
+        stream.connection = self
+        stream.stream_id = stream_id
+        stream._wire_offset = None
+        if self.is_connected:
+            await self._send_open(stream_id, stream, resume)
+
+    async def _send_open(self, stream_id: int, stream: ClientStream, resume: bool) -> None:
+        message = {"key": stream.key, "resume": resume, "offset": stream._replay_start}
+        await self.send(encode_control(FrameType.OPEN, stream_id, message))
+
+    async def send(self, frame: bytes) -> bool:
+        """
+        Send a frame. Returns False if there is no connection, the frame is then dropped.
+        """
+        websocket = self.websocket
+        if websocket is None:
+            return False
+        try:
+            async with self._send_lock:
+                await websocket.send(frame)
+        except websockets.ConnectionClosed:
+            return False
+        return True
+
+    async def _run(self) -> None:
+        delay = self.client.reconnect_min_seconds
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as websocket:
+                    self.websocket = websocket
+                    self.failures = 0
+                    delay = self.client.reconnect_min_seconds
+                    logger.info(f"Connected to {self.url}, opening {len(self.streams)} stream(s)")
+                    for stream_id, stream in list(self.streams.items()):
+                        await self._send_open(stream_id, stream, resume=True)
+                    async for message in websocket:
+                        await self._handle(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Connection to {self.url} failed: {e}")
+            finally:
+                self.websocket = None
+                for stream in self.streams.values():
+                    stream._wire_offset = None
+
+            self.failures += 1
+            if self.failures >= self.client.failover_after_failures:
+                await self.client._failover(self)
+            # Jitter, so the connections to a restarted server don't all come back at once
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.client.reconnect_max_seconds)
+
+    async def _handle(self, message: Any) -> None:
+        if isinstance(message, str):
+            logger.warning(f"Ignoring a text message from {self.url}")
+            return
+        try:
+            frame_type, stream_id, payload = decode_frame(message)
+            stream = self.streams.get(stream_id)
+            if stream is None:
+                return  # A frame for a stream which was closed or moved meanwhile
+            if frame_type == FrameType.OPENED:
+                await stream._on_opened(decode_offset(payload))
+            elif frame_type == FrameType.ACK:
+                stream._on_ack(decode_offset(payload))
+            elif frame_type == FrameType.RESULT:
+                self._results.put_nowait((stream, self.client._decode_result(payload)))
+            elif frame_type == FrameType.CLOSED:
+                message = decode_control(payload)
+                if not stream._closing:
+                    logger.warning(f"Server closed stream {stream.key}: {message.get('code')} {message.get('reason', '')}")
+                # Delivered after the results which arrived before it
+                self._results.put_nowait((stream, None))
+            else:
+                logger.warning(f"Ignoring a {frame_type.name} frame from {self.url}")
+        except (ProtocolError, ValueError) as e:
+            logger.error(f"Invalid frame from {self.url}: {e}")
+
+    async def _deliver_results(self) -> None:
+        """
+        Call the result callbacks off the reader task, so a slow callback doesn't hold up the acknowledgements.
+        """
+        while True:
+            item: Tuple[ClientStream, Optional[StreamingDataChunk]] = await self._results.get()
+            stream, chunk = item
+            if chunk is None:
+                stream._on_closed()
+                continue
+            try:
+                await self.client._call(stream.on_result or self.client.asr_callback, chunk)
+            except Exception as e:
+                logger.error(f"Result callback failed for stream {stream.key}: {e}")
+
+class StreamingClient(ClientInterface):
+    """
+    A client which multiplexes many logical audio streams over a small pool of
+    persistent WebSocket connections to the multi-stream endpoint of one or
+    more SSI servers.
+
+    Each stream is tagged with a 4 byte stream ID in a 5 byte binary frame
+    header (see `ssi.utils.ws.multistream_protocol`), so thousands of streams
+    share a few sockets. The pool holds `connections_per_endpoint` connections
+    to every endpoint, and a new stream goes to the connected connection
+    carrying the fewest streams.
+
+    When a connection drops, it reconnects with exponential backoff, and its
+    streams resume where the server left off, the missing audio being sent
+    again from their replay buffers. After `failover_after_failures` failed
+    attempts, the streams move to a connection to another endpoint instead.
+
+    Attributes:
+        endpoints (List[str]): The WebSocket URLs of the servers' multi-stream endpoints.
+        streams (Dict[str, ClientStream]): The open streams, by key.
+    """
+
+    def __init__(
+        self,
+        server_host: str = "localhost",
+        server_port: int = 8000,
+        asr_callback: Optional[ResultCallback] = None,
+        new_client_callback: Optional[Any] = None,
+        endpoints: Optional[Sequence[str]] = None,
+        endpoint: str = "/ws/multistream",
+        connections_per_endpoint: int = 2,
+        replay_buffer_seconds: float = 10.0,
+        sample_rate: int = 16000,
+        sample_width: int = 2,
+        reconnect_min_seconds: float = 0.5,
+        reconnect_max_seconds: float = 10.0,
+        failover_after_failures: int = 3,
+        proxy_endpoint: str = "/ws/transcribe",
+    ) -> None:
+        """
+        Args:
+            server_host: The host of the SSI server, unless `endpoints` are given.
+            server_port: The port of the SSI server, unless `endpoints` are given.
+            asr_callback: Called with the transcriptions of every stream. Can be a function or a coroutine function.
+            new_client_callback: Called when an end user connects to the proxy router.
+            endpoints: The WebSocket URLs of several servers to balance the streams over, e.g. "ws://ssi-1:8000/ws/multistream".
+            endpoint: The path of the multi-stream endpoint on `server_host`.
+            connections_per_endpoint: The pooled connections to each endpoint.
+            replay_buffer_seconds: The most audio per stream kept to send again after a reconnect.
+            sample_rate: The sample rate of the audio, to size the replay buffer.
+            sample_width: The bytes per sample of the audio, to size the replay buffer.
+            reconnect_min_seconds: The first reconnect delay, doubled after every failed attempt.
+            reconnect_max_seconds: The longest reconnect delay.
+            failover_after_failures: Failed connection attempts after which the streams move to another endpoint.
+            proxy_endpoint: The path of the WebSocket endpoint of `fastapi_proxy_router`.
+        """
+        self.endpoints: List[str] = list(endpoints) if endpoints else [f"ws://{server_host}:{server_port}{endpoint}"]
+        self.asr_callback: Optional[ResultCallback] = asr_callback
+        self.new_client_callback = new_client_callback
+        self.max_replay_bytes: int = int(replay_buffer_seconds * sample_rate * sample_width)
+        self.reconnect_min_seconds: float = reconnect_min_seconds
+        self.reconnect_max_seconds: float = reconnect_max_seconds
+        self.failover_after_failures: int = failover_after_failures
+        self.proxy_endpoint: str = proxy_endpoint
+        self.streams: Dict[str, ClientStream] = {}
+        self.connections: List[_PooledConnection] = [
+            _PooledConnection(self, url) for url in self.endpoints for _ in range(connections_per_endpoint)
+        ]
+        self._started: bool = False
+        self._router: Optional[APIRouter] = None
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        for connection in self.connections:
+            connection.start()
+
+    async def stop(self) -> None:
+        for stream in list(self.streams.values()):
+            stream._on_closed()
+        await asyncio.gather(*(connection.stop() for connection in self.connections))
+        self._started = False
+
+    async def open_stream(self, stream_key: Optional[str] = None, on_result: Optional[ResultCallback] = None) -> ClientStream:
+        await self.start()
+        key = stream_key or uuid.uuid4().hex
+        if key in self.streams:
+            raise ValueError(f"Stream {key} is already open")
+        stream = ClientStream(self, key, on_result, self.max_replay_bytes)
+        self.streams[key] = stream
+        await self._least_loaded(self.connections).attach(stream, resume=False)
+        return stream
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.connections),
+            "connected": sum(connection.is_connected for connection in self.connections),
+            "streams": len(self.streams),
+            "streams_per_connection": [len(connection.streams) for connection in self.connections],
+            "lost_bytes": sum(stream.lost_bytes for stream in self.streams.values()),
+        }
+
+    @property
+    def fastapi_proxy_router(self) -> APIRouter:
+        """
+        A router with a WebSocket endpoint which forwards each end user's audio as one stream of this client.
+
+        The end users' transcriptions are delivered to `asr_callback`.
+        """
+        if self._router is None:
+            self._router = APIRouter()
+            self._router.add_websocket_route(self.proxy_endpoint, self._proxy)
+            self._router.add_event_handler("startup", self.start)
+            self._router.add_event_handler("shutdown", self.stop)
+        return self._router
+
+    async def _proxy(self, websocket: WebSocket) -> None:
+        await websocket.accept()
+        stream = await self.open_stream()
+        try:
+            await self._call(self.new_client_callback, NewClientConnected(client_id=stream.key))
+            while True:
+                await stream.send_audio(await websocket.receive_bytes())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await stream.close()
+
+    def _least_loaded(self, connections: List[_PooledConnection]) -> _PooledConnection:
+        connected = [connection for connection in connections if connection.is_connected]
+        return min(connected or connections, key=lambda connection: len(connection.streams))
+
+    async def _failover(self, failed: _PooledConnection) -> None:
+        """
+        Move the streams of a connection which keeps failing to the connections to other endpoints.
+        """
+        targets = [c for c in self.connections if c.is_connected and c.url != failed.url]
+        if not targets or not failed.streams:
+            return
+        logger.warning(f"Moving {len(failed.streams)} stream(s) from {failed.url} to other endpoints")
+        streams, failed.streams = list(failed.streams.values()), {}
+        for stream in streams:
+            await self._least_loaded(targets).attach(stream, resume=True)
+
+    def _decode_result(self, payload: memoryview) -> StreamingDataChunk:
+        return StreamingDataChunk.model_validate_json(bytes(payload))
+
+    async def _call(self, callback: Optional[Any], payload: Any) -> None:
+        if callback is None:
+            return
+        result = callback(payload)
+        if inspect.isawaitable(result):
+            await result
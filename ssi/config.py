@@ -4,7 +4,7 @@
 from functools import lru_cache
 from typing import Union
 from pydantic_settings import BaseSettings
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from ssi.utils.whisper_language_codes import WHISPER_LANGUAGE_CODES
 
 class Settings(BaseSettings):
@@ -44,14 +44,44 @@ class Settings(BaseSettings):
     
     # VAD
     VAD_MODEL: str = Field(
-        default="silero",
+        default="silero_batched",
         env="VAD_MODEL",
-        description="The Voice Activity Detection (VAD) model to use for detecting voice activity.",
+        description=(
+            "The Voice Activity Detection (VAD) model to use for detecting voice activity. "
+            "'silero_batched' keeps a separate model state per client and runs the frames of all clients in one batched forward pass. "
+            "'silero' shares one model state between all clients, so it is only right for a single client at a time. "
+            "'cascaded' decides the frames of clear silence with a cheap energy gate and runs VAD_CASCADE_NEURAL_MODEL on the rest."
+        ),
     )
     @field_validator("VAD_MODEL")
     def validate_vad_model(cls, value):
-        if value not in ["silero"]:
-            raise ValueError("Only 'silero' VAD model is supported.")
+        if value not in ["silero", "silero_batched", "cascaded"]:
+            raise ValueError("VAD_MODEL must be 'silero', 'silero_batched' or 'cascaded'.")
+        return value
+
+    VAD_CASCADE_NEURAL_MODEL: str = Field(
+        default="silero_batched",
+        env="VAD_CASCADE_NEURAL_MODEL",
+        description="The VAD model which decides the frames the energy gate can't ('cascaded' only).",
+    )
+    @field_validator("VAD_CASCADE_NEURAL_MODEL")
+    def validate_vad_cascade_neural_model(cls, value):
+        if value not in ["silero", "silero_batched"]:
+            raise ValueError("VAD_CASCADE_NEURAL_MODEL must be 'silero' or 'silero_batched'.")
+        return value
+
+    VAD_CASCADE_MARGIN_DB: float = Field(
+        default=6.0,
+        env="VAD_CASCADE_MARGIN_DB",
+        description=(
+            "Frames less than this many dB above the session's noise floor are decided as silence without the neural VAD "
+            "('cascaded' only). Higher skips more neural calls, at the risk of missing soft speech."
+        ),
+    )
+    @field_validator("VAD_CASCADE_MARGIN_DB")
+    def validate_vad_cascade_margin_db(cls, value):
+        if value < 0:
+            raise ValueError("VAD_CASCADE_MARGIN_DB can't be negative.")
         return value
     
     VAD_MODEL_DOWNLOAD_DIR: Union[str, None] = Field(
@@ -64,6 +94,39 @@ class Settings(BaseSettings):
         env="VAD_THRESHOLD",
         description="The threshold value for voice activity detection.",
     )
+    VAD_FRAME_SAMPLES: int = Field(
+        default=512,
+        env="VAD_FRAME_SAMPLES",
+        description=(
+            "The number of samples in each frame passed to the VAD model. Incoming audio of any chunk size is split "
+            "and joined into frames of this size. Silero expects 512 samples at 16 kHz."
+        ),
+    )
+    @field_validator("VAD_FRAME_SAMPLES")
+    def validate_vad_frame_samples(cls, value):
+        if value < 1:
+            raise ValueError("VAD_FRAME_SAMPLES must be at least 1.")
+        return value
+    @model_validator(mode="after")
+    def validate_silero_frame_samples(self):
+        silero_models = ["silero", "silero_batched"]
+        uses_silero = self.VAD_MODEL in silero_models or (
+            self.VAD_MODEL == "cascaded" and self.VAD_CASCADE_NEURAL_MODEL in silero_models
+        )
+        if uses_silero and self.VAD_FRAME_SAMPLES != 512:
+            raise ValueError("VAD_FRAME_SAMPLES must be 512 for the Silero VAD models.")
+        return self
+    
+    VAD_BATCH_MAX_SIZE: int = Field(
+        default=256,
+        env="VAD_BATCH_MAX_SIZE",
+        description="The maximum number of client frames run through one batched VAD forward pass ('silero_batched' only).",
+    )
+    VAD_BATCH_TICK_MS: float = Field(
+        default=5.0,
+        env="VAD_BATCH_TICK_MS",
+        description="How long (in milliseconds) the batched VAD waits for frames from other clients before running a batch ('silero_batched' only).",
+    )
     
     # in the final clip which will be sent to the ASR model, we need to include some audio before and after the detected speech to ensure that the ASR model can transcribe the speech accurately.
     BUFFER_SECONDS_BEFORE: float = Field(
@@ -77,6 +140,107 @@ class Settings(BaseSettings):
         description="The number of seconds of audio after the detected speech to include in the final clip.",
     )
 
+    # Conditioning of the utterances before the ASR
+    CONDITIONING_MAX_SILENCE_SECONDS: float = Field(
+        default=0.6,
+        env="CONDITIONING_MAX_SILENCE_SECONDS",
+        description=(
+            "Silences within and after an utterance are squeezed to this many seconds before it is transcribed, "
+            "keeping their start and their end. 0 keeps the silences, and appends BUFFER_SECONDS_AFTER of the post-buffer."
+        ),
+    )
+    CONDITIONING_MIN_SPEECH_SECONDS: float = Field(
+        default=0.2,
+        env="CONDITIONING_MIN_SPEECH_SECONDS",
+        description="Utterances with less speech than this (e.g. clicks or coughs) are dropped instead of transcribed. 0 transcribes all.",
+    )
+    @field_validator("CONDITIONING_MAX_SILENCE_SECONDS", "CONDITIONING_MIN_SPEECH_SECONDS")
+    def validate_conditioning_seconds(cls, value):
+        if value < 0:
+            raise ValueError("The conditioning durations can't be negative.")
+        return value
+
+    # Endpointing: when the silence after speech ends an utterance
+    ENDPOINTING: str = Field(
+        default="fixed",
+        env="ENDPOINTING",
+        description=(
+            "'fixed' ends an utterance after BUFFER_SECONDS_AFTER of silence. 'adaptive' ends it as soon as the silence "
+            "is unlikely to be a pause within it, judging from the voice probabilities and the speaker's pauses and speech rate."
+        ),
+    )
+    @field_validator("ENDPOINTING")
+    def validate_endpointing(cls, value):
+        if value not in ["fixed", "adaptive"]:
+            raise ValueError("ENDPOINTING must be 'fixed' or 'adaptive'.")
+        return value
+
+    ENDPOINTING_MIN_HANGOVER_SECONDS: float = Field(
+        default=0.25,
+        env="ENDPOINTING_MIN_HANGOVER_SECONDS",
+        description="The seconds of silence always waited for before ending an utterance ('adaptive' endpointing only).",
+    )
+    ENDPOINTING_MAX_HANGOVER_SECONDS: float = Field(
+        default=1.0,
+        env="ENDPOINTING_MAX_HANGOVER_SECONDS",
+        description="The seconds of silence which always end an utterance ('adaptive' endpointing only).",
+    )
+    @field_validator("ENDPOINTING_MIN_HANGOVER_SECONDS", "ENDPOINTING_MAX_HANGOVER_SECONDS")
+    def validate_endpointing_hangover_seconds(cls, value):
+        if value <= 0:
+            raise ValueError("The endpointing hangovers must be positive.")
+        return value
+
+    ENDPOINTING_CUT_RISK: float = Field(
+        default=0.1,
+        env="ENDPOINTING_CUT_RISK",
+        description=(
+            "Trades latency for false cuts ('adaptive' endpointing only): the estimated risk of cutting an utterance at a pause "
+            "which is accepted to end it sooner. 0 always waits for ENDPOINTING_MAX_HANGOVER_SECONDS, 1 always ends after "
+            "ENDPOINTING_MIN_HANGOVER_SECONDS."
+        ),
+    )
+    @field_validator("ENDPOINTING_CUT_RISK")
+    def validate_endpointing_cut_risk(cls, value):
+        if not 0 <= value <= 1:
+            raise ValueError("ENDPOINTING_CUT_RISK must be between 0 and 1.")
+        return value
+    @model_validator(mode="after")
+    def validate_endpointing_hangovers(self):
+        if self.ENDPOINTING_MIN_HANGOVER_SECONDS > self.ENDPOINTING_MAX_HANGOVER_SECONDS:
+            raise ValueError("ENDPOINTING_MIN_HANGOVER_SECONDS must not be greater than ENDPOINTING_MAX_HANGOVER_SECONDS.")
+        return self
+
+    # Buffering strategy
+    BUFFERING_STRATEGY: str = Field(
+        default="silence_at_end_of_chunk",
+        env="BUFFERING_STRATEGY",
+        description=(
+            "How audio is buffered before transcription. 'silence_at_end_of_chunk' transcribes each utterance once it is "
+            "followed by silence. 'local_agreement' additionally re-transcribes the utterance while it is spoken and sends "
+            "the stable words as partial transcriptions."
+        ),
+    )
+    @field_validator("BUFFERING_STRATEGY")
+    def validate_buffering_strategy(cls, value):
+        if value not in ["silence_at_end_of_chunk", "local_agreement"]:
+            raise ValueError("BUFFERING_STRATEGY must be 'silence_at_end_of_chunk' or 'local_agreement'.")
+        return value
+    
+    LOCAL_AGREEMENT_INTERVAL_SECONDS: float = Field(
+        default=0.3,
+        env="LOCAL_AGREEMENT_INTERVAL_SECONDS",
+        description="How often (in seconds of audio) the utterance is re-transcribed ('local_agreement' only).",
+    )
+    LOCAL_AGREEMENT_MAX_WINDOW_SECONDS: float = Field(
+        default=15.0,
+        env="LOCAL_AGREEMENT_MAX_WINDOW_SECONDS",
+        description=(
+            "The longest uncommitted audio window which is re-transcribed. A longer window is committed as it is, "
+            "even without a pause ('local_agreement' only)."
+        ),
+    )
+
     # ASR
     ASR_MODEL: str = Field(
         default="whisper_transformers",
@@ -85,8 +249,8 @@ class Settings(BaseSettings):
     )
     @field_validator("ASR_MODEL")
     def validate_asr_model(cls, value):
-        if value not in ["whisper_transformers"]:
-            raise ValueError("ASR_MODEL must be 'whisper_transformers''.")
+        if value not in ["whisper_transformers", "remote"]:
+            raise ValueError("ASR_MODEL must be 'whisper_transformers' or 'remote'.")
         return value
     
     ASR_MODEL_NAME: str = Field(
@@ -111,6 +275,386 @@ class Settings(BaseSettings):
         ),
     )
     
+    ASR_DEVICE: str = Field(
+        default="auto",
+        env="ASR_DEVICE",
+        description="The device to run the ASR model on: 'auto' (CUDA if available, else CPU), 'cpu', 'cuda' or 'cuda:<index>'.",
+    )
+    @field_validator("ASR_DEVICE")
+    def validate_asr_device(cls, value):
+        if value not in ["auto", "cpu"] and not value.startswith("cuda"):
+            raise ValueError("ASR_DEVICE must be 'auto', 'cpu', 'cuda' or 'cuda:<index>'.")
+        return value
+    
+    ASR_COMPUTE_TYPE: str = Field(
+        default="auto",
+        env="ASR_COMPUTE_TYPE",
+        description=(
+            "The precision of the ASR model: 'auto' (float16 on CUDA, float32 on CPU), 'float32', 'float16', 'bfloat16', "
+            "or 'int8' for dynamic int8 quantization of the encoder and decoder Linear layers (CPU only)."
+        ),
+    )
+    @field_validator("ASR_COMPUTE_TYPE")
+    def validate_asr_compute_type(cls, value):
+        if value not in ["auto", "float32", "float16", "bfloat16", "int8"]:
+            raise ValueError("ASR_COMPUTE_TYPE must be 'auto', 'float32', 'float16', 'bfloat16' or 'int8'.")
+        return value
+    
+    ASR_ENCODER_MODE: str = Field(
+        default="padded",
+        env="ASR_ENCODER_MODE",
+        description=(
+            "'padded' pads every utterance to 30 seconds before encoding, as Whisper was trained. "
+            "'reduced' only encodes as much audio as the utterance needs (rounded up to ASR_ENCODER_BUCKET_SECONDS), "
+            "which makes short utterances much cheaper to transcribe."
+        ),
+    )
+    @field_validator("ASR_ENCODER_MODE")
+    def validate_asr_encoder_mode(cls, value):
+        if value not in ["padded", "reduced"]:
+            raise ValueError("ASR_ENCODER_MODE must be 'padded' or 'reduced'.")
+        return value
+    
+    ASR_ENCODER_BUCKET_SECONDS: float = Field(
+        default=5.0,
+        env="ASR_ENCODER_BUCKET_SECONDS",
+        description="The encoder input length is rounded up to a multiple of this many seconds ('reduced' encoder mode only).",
+    )
+    @field_validator("ASR_ENCODER_BUCKET_SECONDS")
+    def validate_asr_encoder_bucket_seconds(cls, value):
+        if not 0 < value <= 30:
+            raise ValueError("ASR_ENCODER_BUCKET_SECONDS must be between 0 and 30.")
+        return value
+    
+    ASR_LONGFORM_OVERLAP_SECONDS: float = Field(
+        default=5.0,
+        env="ASR_LONGFORM_OVERLAP_SECONDS",
+        description=(
+            "Utterances longer than 30 seconds are transcribed as overlapping 30-second windows in one batch, "
+            "overlapping by at least this many seconds. The transcriptions are joined where their overlaps agree."
+        ),
+    )
+    @field_validator("ASR_LONGFORM_OVERLAP_SECONDS")
+    def validate_asr_longform_overlap_seconds(cls, value):
+        if not 0 < value <= 15:
+            raise ValueError("ASR_LONGFORM_OVERLAP_SECONDS must be between 0 and 15.")
+        return value
+    
+    ASR_BATCH_MAX_SIZE: int = Field(
+        default=8,
+        env="ASR_BATCH_MAX_SIZE",
+        description="The maximum number of utterances (from all clients) transcribed together in one batched ASR call.",
+    )
+    @field_validator("ASR_BATCH_MAX_SIZE")
+    def validate_asr_batch_max_size(cls, value):
+        if value < 1:
+            raise ValueError("ASR_BATCH_MAX_SIZE must be at least 1.")
+        return value
+    
+    ASR_BATCH_MAX_WAIT_MS: float = Field(
+        default=20.0,
+        env="ASR_BATCH_MAX_WAIT_MS",
+        description=(
+            "The maximum time (in milliseconds) the ASR scheduler waits for more utterances to fill a batch "
+            "after the first utterance of the batch has arrived."
+        ),
+    )
+    @field_validator("ASR_BATCH_MAX_WAIT_MS")
+    def validate_asr_batch_max_wait_ms(cls, value):
+        if value < 0:
+            raise ValueError("ASR_BATCH_MAX_WAIT_MS must not be negative.")
+        return value
+    
+    # Model loading
+    MODELS_OFFLINE: bool = Field(
+        default=False,
+        env="MODELS_OFFLINE",
+        description=(
+            "Only load the VAD and ASR models from the local cache (VAD_MODEL_DOWNLOAD_DIR / ASR_MODEL_DOWNLOAD_DIR), "
+            "without any network access."
+        ),
+    )
+    MODELS_WARMUP: bool = Field(
+        default=True,
+        env="MODELS_WARMUP",
+        description="Run warmup inferences on synthetic audio at startup, before any connection is accepted.",
+    )
+    
+    # Inference execution
+    INFERENCE_EXECUTOR: str = Field(
+        default="thread",
+        env="INFERENCE_EXECUTOR",
+        description=(
+            "Where blocking VAD and ASR model calls run, so they never block the event loop. "
+            "'thread' uses a thread pool sharing the loaded models, 'process' uses a process pool where each worker loads its own models."
+        ),
+    )
+    @field_validator("INFERENCE_EXECUTOR")
+    def validate_inference_executor(cls, value):
+        if value not in ["thread", "process"]:
+            raise ValueError("INFERENCE_EXECUTOR must be 'thread' or 'process'.")
+        return value
+    
+    VAD_INFERENCE_WORKERS: int = Field(
+        default=1,
+        env="VAD_INFERENCE_WORKERS",
+        description="The number of workers in the VAD inference executor.",
+    )
+    ASR_INFERENCE_WORKERS: int = Field(
+        default=1,
+        env="ASR_INFERENCE_WORKERS",
+        description="The number of workers in the ASR inference executor.",
+    )
+    @field_validator("VAD_INFERENCE_WORKERS", "ASR_INFERENCE_WORKERS")
+    def validate_inference_workers(cls, value):
+        if value < 1:
+            raise ValueError("The number of inference workers must be at least 1.")
+        return value
+    
+    # Backpressure
+    AUDIO_QUEUE_POLICY: str = Field(
+        default="block",
+        env="AUDIO_QUEUE_POLICY",
+        description=(
+            "What happens when a client's received but unprocessed audio exceeds AUDIO_QUEUE_MAX_SECONDS or all clients' "
+            "audio exceeds AUDIO_BUFFER_GLOBAL_MAX_SECONDS. 'block' stops reading from the socket (TCP backpressure), "
+            "'drop_oldest_silence' drops the oldest silent messages, 'summarize_silence' shortens runs of silent messages "
+            "to BUFFER_SECONDS_AFTER, and 'disconnect' closes the connection with code 1013 (Try Again Later). "
+            "When there is no silence to drop or shorten, the silence policies block."
+        ),
+    )
+    @field_validator("AUDIO_QUEUE_POLICY")
+    def validate_audio_queue_policy(cls, value):
+        if value not in ["block", "drop_oldest_silence", "summarize_silence", "disconnect"]:
+            raise ValueError("AUDIO_QUEUE_POLICY must be 'block', 'drop_oldest_silence', 'summarize_silence' or 'disconnect'.")
+        return value
+    
+    AUDIO_QUEUE_MAX_SECONDS: float = Field(
+        default=10.0,
+        env="AUDIO_QUEUE_MAX_SECONDS",
+        description="The most audio (in seconds) one client may have waiting for processing.",
+    )
+    AUDIO_BUFFER_GLOBAL_MAX_SECONDS: float = Field(
+        default=0.0,
+        env="AUDIO_BUFFER_GLOBAL_MAX_SECONDS",
+        description="The most audio (in seconds) all clients together may have waiting for processing. 0 disables the global cap.",
+    )
+    @field_validator("AUDIO_QUEUE_MAX_SECONDS", "AUDIO_BUFFER_GLOBAL_MAX_SECONDS")
+    def validate_audio_buffer_seconds(cls, value):
+        if value < 0:
+            raise ValueError("Audio buffer caps can't be negative.")
+        return value
+    
+    AUDIO_QUEUE_SILENCE_THRESHOLD_DB: float = Field(
+        default=-45.0,
+        env="AUDIO_QUEUE_SILENCE_THRESHOLD_DB",
+        description="Queued messages quieter than this RMS level (in dBFS) count as silence for the silence overload policies.",
+    )
+    
+    # Admission control
+    ADMISSION_POLICY: str = Field(
+        default="reject",
+        env="ADMISSION_POLICY",
+        description=(
+            "What happens to a new connection when the server is at capacity. 'reject' closes it with code 1013 "
+            "(Try Again Later), 'queue' holds it until capacity frees up or ADMISSION_QUEUE_TIMEOUT_SECONDS pass, "
+            "'disabled' accepts every connection."
+        ),
+    )
+    @field_validator("ADMISSION_POLICY")
+    def validate_admission_policy(cls, value):
+        if value not in ["reject", "queue", "disabled"]:
+            raise ValueError("ADMISSION_POLICY must be 'reject', 'queue' or 'disabled'.")
+        return value
+    
+    ADMISSION_TARGET_UTILIZATION: float = Field(
+        default=0.8,
+        env="ADMISSION_TARGET_UTILIZATION",
+        description="The fraction of the ASR workers' time the admitted speaking sessions may use, leaving headroom for bursts.",
+    )
+    @field_validator("ADMISSION_TARGET_UTILIZATION")
+    def validate_admission_target_utilization(cls, value):
+        if not 0 < value <= 1:
+            raise ValueError("ADMISSION_TARGET_UTILIZATION must be in (0, 1].")
+        return value
+    
+    ADMISSION_MIN_SPEAKING_FRACTION: float = Field(
+        default=0.25,
+        env="ADMISSION_MIN_SPEAKING_FRACTION",
+        description="The lowest fraction of connected sessions assumed to be speaking at once when estimating capacity.",
+    )
+    ADMISSION_MAX_SESSIONS: int = Field(
+        default=0,
+        env="ADMISSION_MAX_SESSIONS",
+        description="A hard cap on the connected sessions, on top of the measured capacity. 0 disables the cap.",
+    )
+    ADMISSION_QUEUE_MAX_SIZE: int = Field(
+        default=64,
+        env="ADMISSION_QUEUE_MAX_SIZE",
+        description="The most connections waiting for admission at once ('queue' only). Further connections are rejected.",
+    )
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(
+        default=10.0,
+        env="ADMISSION_QUEUE_TIMEOUT_SECONDS",
+        description="How long a connection waits for admission before it is rejected ('queue' only).",
+    )
+    IDLE_TIMEOUT_SECONDS: float = Field(
+        default=60.0,
+        env="IDLE_TIMEOUT_SECONDS",
+        description="Connections which sent no audio for this many seconds are closed. 0 disables the idle reaper.",
+    )
+    
+    # Callbacks
+    CALLBACK_WORKERS: int = Field(
+        default=4,
+        env="CALLBACK_WORKERS",
+        description="The number of tasks delivering asr_callback and new_client_callback calls. Calls for one client always go to the same task, in order.",
+    )
+    CALLBACK_QUEUE_MAX_SIZE: int = Field(
+        default=1024,
+        env="CALLBACK_QUEUE_MAX_SIZE",
+        description="The most callback calls waiting for delivery. Further calls are dropped and counted.",
+    )
+    @field_validator("CALLBACK_WORKERS", "CALLBACK_QUEUE_MAX_SIZE")
+    def validate_callback_dispatch(cls, value):
+        if value < 1:
+            raise ValueError("CALLBACK_WORKERS and CALLBACK_QUEUE_MAX_SIZE must be at least 1.")
+        return value
+    
+    CALLBACK_RUN_SYNC_IN_THREAD: bool = Field(
+        default=False,
+        env="CALLBACK_RUN_SYNC_IN_THREAD",
+        description=(
+            "Run plain function callbacks in a thread, so blocking callbacks don't block the event loop. Off by default, "
+            "so they keep running on the event loop and may use it, e.g. to create tasks. Coroutine callbacks always run on the event loop."
+        ),
+    )
+    
+    # Results sent back to the WebSocket clients
+    RESULT_ENCODING: str = Field(
+        default="json",
+        env="RESULT_ENCODING",
+        description=(
+            "How the transcriptions are sent back to the client of a /ws/transcribe connection: 'json' as text "
+            "messages, 'msgpack' as binary messages, or 'none' to only deliver them to the asr_callback."
+        ),
+    )
+    @field_validator("RESULT_ENCODING")
+    def validate_result_encoding(cls, value):
+        if value not in ["none", "json", "msgpack"]:
+            raise ValueError("RESULT_ENCODING must be 'none', 'json' or 'msgpack'.")
+        return value
+    
+    RESULT_PARTIAL_FLUSH_INTERVAL_MS: float = Field(
+        default=200.0,
+        env="RESULT_PARTIAL_FLUSH_INTERVAL_MS",
+        description="Partial transcriptions are joined into one message for this long. A final transcription replaces the partials still waiting. 0 sends every partial.",
+    )
+    @field_validator("RESULT_PARTIAL_FLUSH_INTERVAL_MS")
+    def validate_result_partial_flush_interval(cls, value):
+        if value < 0:
+            raise ValueError("RESULT_PARTIAL_FLUSH_INTERVAL_MS must be at least 0.")
+        return value
+    
+    RESULT_SEND_QUEUE_MAX_SIZE: int = Field(
+        default=256,
+        env="RESULT_SEND_QUEUE_MAX_SIZE",
+        description="The most results waiting to be sent to a client which reads slowly. Further results drop the oldest waiting one.",
+    )
+    @field_validator("RESULT_SEND_QUEUE_MAX_SIZE")
+    def validate_result_send_queue_max_size(cls, value):
+        if value < 1:
+            raise ValueError("RESULT_SEND_QUEUE_MAX_SIZE must be at least 1.")
+        return value
+    
+    # Model server
+    MODEL_SERVER_ASR_MODEL: str = Field(
+        default="whisper_transformers",
+        env="MODEL_SERVER_ASR_MODEL",
+        description="The ASR model the model server loads. The frontends use it with `ASR_MODEL=remote`.",
+    )
+    @field_validator("MODEL_SERVER_ASR_MODEL")
+    def validate_model_server_asr_model(cls, value):
+        if value not in ["whisper_transformers"]:
+            raise ValueError("MODEL_SERVER_ASR_MODEL must be 'whisper_transformers'.")
+        return value
+    
+    MODEL_SERVER_ADDRESS: str = Field(
+        default="/tmp/ssi-model-server.sock",
+        env="MODEL_SERVER_ADDRESS",
+        description=(
+            "Where the model server listens: a Unix socket path, or 'host:port'. "
+            "The audio goes through shared memory, so the frontends must run on the same host either way."
+        ),
+    )
+    
+    MODEL_SERVER_AUTHKEY: str = Field(
+        default="",
+        env="MODEL_SERVER_AUTHKEY",
+        description=(
+            "The shared secret the frontends authenticate to the model server with. Required to listen on 'host:port', since "
+            "the server unpickles what it receives. A Unix socket is only accessible to the server's user, so it's optional there."
+        ),
+    )
+    
+    MODEL_SERVER_CONNECT_TIMEOUT_SECONDS: float = Field(
+        default=300.0,
+        env="MODEL_SERVER_CONNECT_TIMEOUT_SECONDS",
+        description="How long a frontend waits for the model server to come up, e.g. while it loads its model.",
+    )
+    
+    MODEL_SERVER_REQUEST_TIMEOUT_SECONDS: float = Field(
+        default=60.0,
+        env="MODEL_SERVER_REQUEST_TIMEOUT_SECONDS",
+        description="How long a frontend waits for the model server to transcribe a batch.",
+    )
+    @field_validator("MODEL_SERVER_CONNECT_TIMEOUT_SECONDS", "MODEL_SERVER_REQUEST_TIMEOUT_SECONDS")
+    def validate_model_server_timeouts(cls, value):
+        if value <= 0:
+            raise ValueError("The model server timeouts must be greater than 0.")
+        return value
+    
+    # Multi-stream connections
+    MULTISTREAM_MAX_STREAMS_PER_CONNECTION: int = Field(
+        default=1000,
+        env="MULTISTREAM_MAX_STREAMS_PER_CONNECTION",
+        description="The most logical streams one multi-stream connection can have open. Further OPENs are closed with code 1013.",
+    )
+    @field_validator("MULTISTREAM_MAX_STREAMS_PER_CONNECTION")
+    def validate_multistream_max_streams(cls, value):
+        if value < 1:
+            raise ValueError("MULTISTREAM_MAX_STREAMS_PER_CONNECTION must be at least 1.")
+        return value
+    
+    MULTISTREAM_RESUME_GRACE_SECONDS: float = Field(
+        default=30.0,
+        env="MULTISTREAM_RESUME_GRACE_SECONDS",
+        description="How long the streams of a dropped multi-stream connection are kept, to be resumed on a new connection. 0 ends them with the connection.",
+    )
+    
+    MULTISTREAM_ACK_INTERVAL_SECONDS: float = Field(
+        default=0.5,
+        env="MULTISTREAM_ACK_INTERVAL_SECONDS",
+        description="Seconds of a stream's audio received between two acknowledgements, which let the client drop the audio from its replay buffer.",
+    )
+    @field_validator("MULTISTREAM_RESUME_GRACE_SECONDS", "MULTISTREAM_ACK_INTERVAL_SECONDS")
+    def validate_multistream_seconds(cls, value):
+        if value < 0:
+            raise ValueError("MULTISTREAM_RESUME_GRACE_SECONDS and MULTISTREAM_ACK_INTERVAL_SECONDS must be at least 0.")
+        return value
+    
+    # Offline transcription
+    BATCH_TRANSCRIPTION_MAX_UPLOAD_MB: float = Field(
+        default=1024.0,
+        env="BATCH_TRANSCRIPTION_MAX_UPLOAD_MB",
+        description="The largest recording the batch transcription route accepts, about 9 hours of 16 kHz mono audio by default. 0 means no limit.",
+    )
+    @field_validator("BATCH_TRANSCRIPTION_MAX_UPLOAD_MB")
+    def validate_batch_transcription_max_upload_mb(cls, value):
+        if value < 0:
+            raise ValueError("BATCH_TRANSCRIPTION_MAX_UPLOAD_MB must be at least 0.")
+        return value
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,5 +1,6 @@
 # Path: ssi/fastapi/__init__.py
 
 from ssi.fastapi.routers.streaming_ws import StreamingWSRouter
+from ssi.fastapi.routers.batch_transcription import BatchTranscriptionRouter
 
-__all__ = ['StreamingWSRouter']
\ No newline at end of file
+__all__ = ['StreamingWSRouter', 'BatchTranscriptionRouter']
\ No newline at end of file
@@ -0,0 +1,91 @@
+# Path: ssi/fastapi/routers/batch_transcription.py
+# Description: This file contains the HTTP endpoint for the offline transcription of uploaded recordings, which streams the transcribed segments back as JSON lines.
+
+import asyncio
+import logging
+import os
+import tempfile
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.asr.asr_factory import ASRFactory
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.offline.file_transcriber import FileTranscriber
+from ssi.utils.offline.wav_reader import load_wav
+from ssi.utils.vad.vad_factory import VADFactory
+from ssi.utils.vad.vad_interface import VADInterface
+
+class BatchTranscriptionRouter(APIRouter):
+    def __init__(
+        self,
+        endpoint: str = "/transcribe/file",
+        *args,
+        vad_pipeline: Optional[VADInterface] = None,
+        asr_pipeline: Optional[ASRInterface] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            endpoint: The path of the POST route. The request body is a 16-bit PCM WAV file,
+                the response is one JSON `TranscribedSegment` per line, in the order the segments finish.
+            vad_pipeline: An already loaded VAD pipeline, e.g. the one of a `StreamingWSRouter`. Loaded from the settings at startup if not given.
+            asr_pipeline: An already loaded ASR pipeline. Loaded from the settings at startup if not given.
+        """
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger(logging.INFO)
+        self.settings = get_settings()
+        self.vad_pipeline: Optional[VADInterface] = vad_pipeline
+        self.asr_pipeline: Optional[ASRInterface] = asr_pipeline
+        self.transcriber: Optional[FileTranscriber] = None
+        self._startup_lock = asyncio.Lock()
+        self.add_api_route(endpoint, self.transcribe_file, methods=["POST"], response_class=StreamingResponse)
+        self.add_event_handler("startup", self.startup)
+        self.logger.info(f"BatchTranscriptionRouter initialized with endpoint: {endpoint}")
+
+    async def startup(self) -> None:
+        """
+        Load the models which weren't given. Calling it again once they are loaded is a no-op.
+        """
+        async with self._startup_lock:
+            if self.transcriber is not None:
+                return
+            if self.vad_pipeline is None:
+                self.vad_pipeline = await asyncio.to_thread(VADFactory.create_vad_pipeline, self.settings.VAD_MODEL)
+            if self.asr_pipeline is None:
+                self.asr_pipeline = await asyncio.to_thread(ASRFactory.create_asr_pipeline, self.settings.ASR_MODEL)
+            self.transcriber = FileTranscriber(self.vad_pipeline, self.asr_pipeline)
+
+    async def transcribe_file(self, request: Request, name: Optional[str] = None) -> StreamingResponse:
+        await self.startup()
+
+        max_bytes = int(self.settings.BATCH_TRANSCRIPTION_MAX_UPLOAD_MB * 2 ** 20)
+        content_length = request.headers.get("content-length", "")
+        if max_bytes and content_length.isdigit() and int(content_length) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Recordings are limited to {self.settings.BATCH_TRANSCRIPTION_MAX_UPLOAD_MB:g} MB")
+
+        # Spooled to a file, so the recording is memory-mapped rather than held in memory
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as file:
+            try:
+                size = 0
+                async for data in request.stream():
+                    size += len(data)
+                    if max_bytes and size > max_bytes:
+                        raise HTTPException(
+                            status_code=413, detail=f"Recordings are limited to {self.settings.BATCH_TRANSCRIPTION_MAX_UPLOAD_MB:g} MB"
+                        )
+                    await asyncio.to_thread(file.write, data)
+                file.flush()
+                audio = load_wav(file.name)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                # The memory map keeps the data readable, so nothing is left behind whatever happens to the response
+                os.unlink(file.name)
+
+        async def lines() -> AsyncIterator[str]:
+            async for segment in self.transcriber.transcribe(audio, source=name):
+                yield segment.model_dump_json() + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
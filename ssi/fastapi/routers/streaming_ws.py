@@ -2,11 +2,14 @@
 # Description: This file will contain the WebSocket endpoint for streaming ASR.
 
 import logging
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, Response, WebSocket
 from fastapi.websockets import WebSocketDisconnect
-from typing import Callable
+from typing import Awaitable, Callable, Optional, Union
 from ssi.utils.ws.connection_manager import ConnectionManager
 from ssi.utils.ws.stream_client import StreamClient
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.vad.vad_interface import VADInterface
+from ssi.utils.metrics.server_metrics import get_server_metrics
 from ssi.logger import get_logger
 from ssi.types.streaming_data_chunk import StreamingDataChunk
 from ssi.types.new_client_connected import NewClientConnected
@@ -14,22 +17,51 @@ from ssi.types.new_client_connected import NewClientConnected
 class StreamingWSRouter(APIRouter):
     def __init__(
         self,
-        asr_callback: Callable[[StreamingDataChunk], None],
-        new_client_callback: Callable[[NewClientConnected], None],
+        asr_callback: Callable[[StreamingDataChunk], Union[None, Awaitable[None]]],
+        new_client_callback: Callable[[NewClientConnected], Union[None, Awaitable[None]]],
         endpoint: str = "/ws/transcribe",
-        *args, **kwargs
+        *args,
+        vad_pipeline: Optional[VADInterface] = None,
+        asr_pipeline: Optional[ASRInterface] = None,
+        metrics_endpoint: Optional[str] = None,
+        multistream_endpoint: Optional[str] = "/ws/multistream",
+        **kwargs
     ):
+        """
+        Args:
+            asr_callback: Called with every transcription. Can be a function or a coroutine function.
+            new_client_callback: Called when a client connects. Can be a function or a coroutine function.
+            endpoint: The path of the WebSocket endpoint.
+            vad_pipeline: An already loaded VAD pipeline. Loaded from the settings at startup if not given.
+            asr_pipeline: An already loaded ASR pipeline. Loaded from the settings at startup if not given.
+            metrics_endpoint: If given, the path of a GET route serving the server metrics in the Prometheus text format.
+            multistream_endpoint: The path of the WebSocket endpoint carrying many streams per connection
+                (see `ssi.utils.ws.multistream_protocol`), e.g. for `ssi.clients.StreamingClient`. None disables it.
+        """
         super().__init__(*args, **kwargs)
         self.logger = get_logger(logging.INFO)
-        self.connection_manager = ConnectionManager(asr_callback)
+        self.connection_manager = ConnectionManager(asr_callback, vad_pipeline=vad_pipeline, asr_pipeline=asr_pipeline)
         self.new_client_callback = new_client_callback
+        self.metrics = get_server_metrics()
         self.add_websocket_route(endpoint, self.websocket_endpoint)
+        if multistream_endpoint is not None:
+            self.add_websocket_route(multistream_endpoint, self.multistream_websocket_endpoint)
+        if metrics_endpoint is not None:
+            self.add_api_route(metrics_endpoint, self.serve_metrics, methods=["GET"], include_in_schema=False)
+
+        # Load and warm up the models before the server starts accepting connections
+        self.add_event_handler("startup", self.connection_manager.startup)
+        self.add_event_handler("shutdown", self.connection_manager.shutdown)
         self.logger.info(f"StreamingWSRouter initialized with endpoint: {endpoint}")
 
     async def websocket_endpoint(self, websocket: WebSocket):
-        client: StreamClient = await self.connection_manager.connect(websocket)
+        client: Optional[StreamClient] = await self.connection_manager.connect(websocket)
+        if client is None:
+            return  # Rejected by admission control
         self.logger.info(f"New WebSocket connection established: {client.client_id}")
-        self.new_client_callback(NewClientConnected(client_id=client.client_id))
+        self.connection_manager.callback_dispatcher.dispatch(
+            "new_client", self.new_client_callback, NewClientConnected(client_id=client.client_id), key=client.client_id
+        )
 
         try:
             self.logger.info(f"Starting StreamClient run for {client.client_id}")
@@ -41,3 +73,17 @@ class StreamingWSRouter(APIRouter):
         finally:
             self.logger.info(f"Disconnecting client {client.client_id}")
             await self.connection_manager.disconnect(client.client_id)
+
+    async def multistream_websocket_endpoint(self, websocket: WebSocket):
+        connection = await self.connection_manager.connect_multistream(websocket, self.new_client_callback)
+        try:
+            await connection.run()
+        except WebSocketDisconnect:
+            self.logger.info("Multi-stream WebSocket disconnected, its streams can be resumed")
+        except Exception as e:
+            self.logger.error(f"An error occurred while processing a multi-stream WebSocket: {e}")
+        finally:
+            self.connection_manager.disconnect_multistream()
+
+    async def serve_metrics(self) -> Response:
+        return Response(self.metrics.render(), media_type=self.metrics.registry.CONTENT_TYPE)
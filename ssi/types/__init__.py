@@ -2,5 +2,7 @@
 
 from ssi.types.streaming_data_chunk import StreamingDataChunk
 from ssi.types.new_client_connected import NewClientConnected
+from ssi.types.processing_timings import ProcessingTimings
+from ssi.types.transcribed_segment import TranscribedSegment
 
-__all__ = ['StreamingDataChunk', 'NewClientConnected']
\ No newline at end of file
+__all__ = ['StreamingDataChunk', 'NewClientConnected', 'ProcessingTimings', 'TranscribedSegment']
\ No newline at end of file
@@ -0,0 +1,20 @@
+# Path: ssi/types/processing_timings.py
+# Description: This module contains the ProcessingTimings pydantic model, which breaks down where the server spent time on a transcription.
+
+from typing import Optional
+from pydantic import BaseModel
+
+class ProcessingTimings(BaseModel):
+    """The time in seconds each server stage spent on one transcription."""
+    vad_seconds: float = 0.0
+    """Total VAD time of the utterance's frames, from the first voiced frame on."""
+    vad_frames: int = 0
+    queue_wait_seconds: float = 0.0
+    """Time the utterance waited in the ASR scheduler queue."""
+    asr_seconds: float = 0.0
+    """Time to transcribe the whole batch the utterance was part of."""
+    # The stages of `asr_seconds`, only set by the ASR models which report them
+    asr_features_seconds: Optional[float] = None
+    asr_encode_seconds: Optional[float] = None
+    asr_decode_seconds: Optional[float] = None
+    batch_size: int = 1
@@ -1,10 +1,20 @@
 # Path: ssi/types/streaming_data_chunk.py
 # Description: This module contains the StreamingDataChunk pydantic model, which represents a chunk of streaming data.
 
+from typing import Optional
 from pydantic import BaseModel
+from ssi.types.processing_timings import ProcessingTimings
 
 class StreamingDataChunk(BaseModel):
     """This data chunk wil be sent in the ASR callback."""
+    client_id: Optional[str] = None
+    """The ID of the client whose audio was transcribed, as reported in `NewClientConnected`."""
     language: str
     transcription: str
     server_process_time: float
+    """Seconds from the end of the utterance (or of the audio decoded for a partial) to this chunk being delivered."""
+    timings: Optional[ProcessingTimings] = None
+    """Where the server spent time on this transcription."""
+    is_final: bool = True
+    """False for partial transcriptions of an utterance which is still being spoken. A partial contains only the
+    words which became stable since the previous partial, the final chunk contains the whole utterance."""
@@ -0,0 +1,17 @@
+# Path: ssi/types/transcribed_segment.py
+# Description: This module contains the TranscribedSegment pydantic model, which represents one utterance of a recording transcribed offline.
+
+from typing import Optional
+from pydantic import BaseModel
+
+class TranscribedSegment(BaseModel):
+    """One line of the JSONL output of the offline transcription."""
+    source: Optional[str] = None
+    """The file the segment was cut from."""
+    segment: int
+    """The index of the segment in the recording. Segments are output as soon as they are transcribed, not in this order."""
+    start: float
+    """Seconds from the start of the recording."""
+    end: float
+    language: str
+    transcription: str
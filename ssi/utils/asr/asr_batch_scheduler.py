@@ -0,0 +1,289 @@
+# Path: ssi/utils/asr/asr_batch_scheduler.py
+# Description: This module contains the ASRBatchScheduler class, which collects finished utterances from all connected clients and transcribes them together in dynamically sized batches.
+
+import asyncio
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+import numpy as np
+from pydantic import BaseModel
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.metrics.server_metrics import get_server_metrics
+from ssi.types.processing_timings import ProcessingTimings
+from ssi.config import get_settings
+from ssi.logger import get_logger
+
+RTF_SMOOTHING = 0.2  # Weight of the latest batch in the real-time factor estimate
+
+class ASRBatchSchedulerStats(BaseModel):
+    """A snapshot of the ASR batch scheduler's queue and batching statistics."""
+    queue_depth: int
+    batches_processed: int
+    utterances_processed: int
+    last_batch_size: int
+    max_batch_size_seen: int
+    average_batch_size: float
+    average_queue_wait_ms: float
+    batch_size_histogram: Dict[int, int]
+    real_time_factor: Optional[float]
+    """Recent ASR compute seconds per second of transcribed audio, None until the first batch."""
+
+class TranscriptionResult(NamedTuple):
+    """The result of an utterance submitted to the ASR batch scheduler."""
+    transcription: str
+    timings: ProcessingTimings
+    submitted_at: float  # `time.perf_counter()` when the utterance was submitted
+
+class _PendingUtterance:
+    """An utterance waiting in the scheduler queue together with the future its result is delivered to."""
+
+    __slots__ = ("audio", "future", "timings", "enqueued_at")
+
+    def __init__(self, audio: np.ndarray, future: asyncio.Future, timings: ProcessingTimings) -> None:
+        self.audio: np.ndarray = audio
+        self.future: asyncio.Future = future
+        self.timings: ProcessingTimings = timings
+        self.enqueued_at: float = time.perf_counter()
+
+class ASRBatchScheduler:
+    """
+    A central scheduler which batches transcription requests across clients.
+
+    Every client submits its finished utterances to the same scheduler. A single
+    worker task takes the first queued utterance, keeps collecting more until
+    either `max_batch_size` utterances are gathered or `max_wait_ms` has passed,
+    and then transcribes the whole batch with one `transcribe_batch` call. Up to
+    `max_concurrent_batches` batches are transcribed at once, one per worker of
+    the ASR inference executor; while all of them are busy, the next batch keeps
+    filling up in the queue. Each
+    result is delivered through the future returned by `submit`, so it is routed
+    back to the client which submitted the audio, together with the time the
+    utterance spent in the queue and in the ASR model.
+
+    Attributes:
+        asr_pipeline (ASRInterface): The ASR model used to transcribe the batches.
+        max_batch_size (int): The maximum number of utterances in one batch.
+        max_wait_seconds (float): How long to wait for a batch to fill up.
+        max_concurrent_batches (int): The maximum number of batches transcribed at once.
+    """
+
+    def __init__(
+        self,
+        asr_pipeline: ASRInterface,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_concurrent_batches: Optional[int] = None,
+    ) -> None:
+        self.logger = get_logger()
+        self.settings = get_settings()
+        self.asr_pipeline: ASRInterface = asr_pipeline
+        self.metrics = get_server_metrics()
+        self.max_batch_size: int = max_batch_size or self.settings.ASR_BATCH_MAX_SIZE
+        self.max_wait_seconds: float = (
+            max_wait_ms if max_wait_ms is not None else self.settings.ASR_BATCH_MAX_WAIT_MS
+        ) / 1000
+        self.max_concurrent_batches: int = max_concurrent_batches or self.settings.ASR_INFERENCE_WORKERS
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+        # Statistics
+        self._batches_processed: int = 0
+        self._utterances_processed: int = 0
+        self._last_batch_size: int = 0
+        self._max_batch_size_seen: int = 0
+        self._total_queue_wait: float = 0.0
+        self._batch_size_histogram: Dict[int, int] = {}
+        self._real_time_factor: Optional[float] = None
+
+    def start(self) -> None:
+        """
+        Start the batching worker. Must be called from within a running event loop.
+        Calling it again while the worker is running is a no-op.
+        """
+        if self._worker_task is not None and not self._worker_task.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker_task = asyncio.create_task(self._run())
+        self.logger.info(
+            f"ASRBatchScheduler started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait_seconds * 1000:.1f}, "
+            f"max_concurrent_batches={self.max_concurrent_batches})"
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop the batching worker and cancel every utterance still waiting in the queue or being transcribed.
+        """
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+        for task in list(self._batch_tasks):
+            task.cancel()
+        await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            pending: _PendingUtterance = self._queue.get_nowait()
+            pending.future.cancel()
+        self.logger.info("ASRBatchScheduler stopped")
+
+    def submit(self, audio: np.ndarray, timings: Optional[ProcessingTimings] = None) -> asyncio.Future:
+        """
+        Queue an utterance for transcription.
+
+        Args:
+            audio (np.ndarray): The int16 audio of the finished utterance.
+            timings (Optional[ProcessingTimings]): The time already spent on the utterance
+                before it was submitted. The scheduler adds the queue and ASR times to it.
+
+        Returns:
+            asyncio.Future: A future which resolves to the `TranscriptionResult` of `audio`.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingUtterance(audio, future, timings or ProcessingTimings()))
+        return future
+
+    async def transcribe(self, audio: np.ndarray) -> str:
+        """
+        Queue an utterance for transcription and wait for the result.
+        """
+        return (await self.submit(audio)).transcription
+
+    def get_stats(self) -> ASRBatchSchedulerStats:
+        """
+        Get the current queue depth and batching statistics.
+        """
+        return ASRBatchSchedulerStats(
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            batches_processed=self._batches_processed,
+            utterances_processed=self._utterances_processed,
+            last_batch_size=self._last_batch_size,
+            max_batch_size_seen=self._max_batch_size_seen,
+            average_batch_size=(
+                self._utterances_processed / self._batches_processed if self._batches_processed else 0.0
+            ),
+            average_queue_wait_ms=(
+                self._total_queue_wait / self._utterances_processed * 1000 if self._utterances_processed else 0.0
+            ),
+            batch_size_histogram=dict(self._batch_size_histogram),
+            real_time_factor=self._real_time_factor,
+        )
+
+    async def _collect_batch(self) -> List[_PendingUtterance]:
+        """
+        Wait for the first utterance, then gather more until the batch is full or the wait window closes.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[_PendingUtterance] = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_seconds
+
+        while len(batch) < self.max_batch_size:
+            # Whatever is already queued joins the batch without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            # Collecting only once a slot is free lets the next batch grow while all slots are busy
+            await self._batch_slots.acquire()
+            try:
+                batch = [pending for pending in await self._collect_batch() if not pending.future.done()]
+            except BaseException:
+                self._batch_slots.release()
+                raise
+            if not batch:
+                self._batch_slots.release()
+                continue
+
+            task = asyncio.create_task(self._transcribe_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _transcribe_batch(self, batch: List[_PendingUtterance]) -> None:
+        started_at = time.perf_counter()
+        try:
+            transcriptions, stage_timings = await self.asr_pipeline.transcribe_batch_timed_async(
+                [pending.audio for pending in batch]
+            )
+        except asyncio.CancelledError:
+            for pending in batch:
+                pending.future.cancel()
+            raise
+        except Exception as e:
+            self.logger.error(f"Batched transcription of {len(batch)} utterances failed: {e}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        finally:
+            self._batch_slots.release()
+
+        asr_seconds = time.perf_counter() - started_at
+        for pending, transcription in zip(batch, transcriptions):
+            timings = pending.timings.model_copy(update={
+                "queue_wait_seconds": started_at - pending.enqueued_at,
+                "asr_seconds": asr_seconds,
+                "asr_features_seconds": stage_timings.get("features"),
+                "asr_encode_seconds": stage_timings.get("encode"),
+                "asr_decode_seconds": stage_timings.get("decode"),
+                "batch_size": len(batch),
+            })
+            if not pending.future.done():
+                pending.future.set_result(TranscriptionResult(transcription, timings, pending.enqueued_at))
+
+        self._record_batch(batch, started_at, asr_seconds, stage_timings)
+
+    def _record_batch(
+        self,
+        batch: List[_PendingUtterance],
+        started_at: float,
+        asr_seconds: float,
+        stage_timings: Dict[str, float],
+    ) -> None:
+        self.metrics.asr_batch_size.observe(len(batch))
+        self.metrics.asr_batch_seconds.labels("total").observe(asr_seconds)
+        for stage, seconds in stage_timings.items():
+            self.metrics.asr_batch_seconds.labels(stage).observe(seconds)
+        for pending in batch:
+            self.metrics.asr_queue_wait_seconds.observe(started_at - pending.enqueued_at)
+
+        audio_seconds = sum(len(pending.audio) for pending in batch) / self.settings.STREAM_SAMPLE_RATE
+        self.metrics.asr_audio_seconds.inc(audio_seconds)
+        if audio_seconds > 0:
+            # Exponential moving average, so the estimate follows changes in load and batch sizes
+            real_time_factor = asr_seconds / audio_seconds
+            self._real_time_factor = (
+                real_time_factor if self._real_time_factor is None
+                else RTF_SMOOTHING * real_time_factor + (1 - RTF_SMOOTHING) * self._real_time_factor
+            )
+
+        batch_size = len(batch)
+        self._batches_processed += 1
+        self._utterances_processed += batch_size
+        self._last_batch_size = batch_size
+        self._max_batch_size_seen = max(self._max_batch_size_seen, batch_size)
+        self._batch_size_histogram[batch_size] = self._batch_size_histogram.get(batch_size, 0) + 1
+        self._total_queue_wait += sum(started_at - pending.enqueued_at for pending in batch)
+        self.logger.debug(
+            f"Transcribed batch of {batch_size} utterances in {asr_seconds:.3f}s "
+            f"(queue depth: {self._queue.qsize()})"
+        )
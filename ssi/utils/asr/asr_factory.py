@@ -2,6 +2,7 @@
 # Description: This file will contain the factory class for the ASR models. We'll use this factory to create instances of different ASR models.
 
 from ssi.utils.asr.whisper_transformers_asr import WhisperTransformersASR
+from ssi.utils.asr.remote_asr import RemoteASR
 
 class ASRFactory:
     """
@@ -25,7 +26,8 @@ class ASRFactory:
         If the type is not recognized, it raises a ValueError.
 
         Args:
-            type (str): The type of ASR model to create. Currently supports 'whisper'.
+            type (str): The type of ASR model to create. Currently supports 'whisper_transformers',
+                and 'remote' for the model server's model.
 
         Returns:
             An instance of the specified ASR model.
@@ -38,5 +40,7 @@ class ASRFactory:
         """
         if type == "whisper_transformers":
             return WhisperTransformersASR()
+        elif type == "remote":
+            return RemoteASR()
         else:
             raise ValueError(f"Unknown ASR model type: {type}")
@@ -2,7 +2,10 @@
 # Description: This file will contain the interface for the ASR models. We'll impliment the interface for the different ASR models in the respective files.
 
 from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
 import numpy as np
+from ssi.utils.inference.inference_executor import get_inference_executor
+from ssi.config import get_settings
 
 class ASRInterface(ABC):
     """
@@ -14,6 +17,10 @@ class ASRInterface(ABC):
     
     Methods:
         - transcribe: Transcribes the given audio data into text.
+        - transcribe_batch: Transcribes a batch of audio clips in a single call.
+        - transcribe_batch_timed: Transcribes a batch and reports how long each stage of the model took.
+        - transcribe_async / transcribe_batch_async / transcribe_batch_timed_async: Run the above on the ASR inference executor.
+        - warmup: Transcribes synthetic audio so the first real utterance doesn't pay for initialization.
     """
     
     @abstractmethod
@@ -22,3 +29,58 @@ class ASRInterface(ABC):
         Transcribe the given audio data.
         """
         pass
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        """
+        Transcribe a batch of audio clips.
+
+        Models which can run several inputs through a single forward pass should
+        override this method. The default implementation transcribes the clips
+        one after another.
+
+        Args:
+            audios (List[np.ndarray]): The int16 audio clips to transcribe.
+
+        Returns:
+            List[str]: The transcriptions, in the same order as `audios`.
+        """
+        return [self.transcribe(audio) for audio in audios]
+
+    def transcribe_batch_timed(self, audios: List[np.ndarray]) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Transcribe a batch of audio clips and report the time spent in each stage.
+
+        Models which can measure their stages separately should override this
+        method. The default implementation reports no stages.
+
+        Returns:
+            Tuple[List[str], Dict[str, float]]: The transcriptions, and the seconds
+            spent per stage ("features", "encode", "decode").
+        """
+        return self.transcribe_batch(audios), {}
+
+    async def transcribe_async(self, audio: np.ndarray) -> str:
+        """
+        Transcribe the given audio data on the ASR inference executor without blocking the event loop.
+        """
+        return await get_inference_executor("asr").run(self, "transcribe", audio)
+
+    async def transcribe_batch_async(self, audios: List[np.ndarray]) -> List[str]:
+        """
+        Transcribe a batch of audio clips on the ASR inference executor without blocking the event loop.
+        """
+        return await get_inference_executor("asr").run(self, "transcribe_batch", audios)
+
+    async def transcribe_batch_timed_async(self, audios: List[np.ndarray]) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Run `transcribe_batch_timed` on the ASR inference executor without blocking the event loop.
+        """
+        return await get_inference_executor("asr").run(self, "transcribe_batch_timed", audios)
+
+    def warmup(self) -> None:
+        """
+        Transcribe a second of synthetic low-level noise, so that kernel and graph
+        initialization happens at startup rather than on the first real utterance.
+        """
+        noise = np.random.default_rng(0).normal(0, 100, get_settings().STREAM_SAMPLE_RATE).astype(np.int16)
+        self.transcribe(noise)
@@ -0,0 +1,157 @@
+# Path: ssi/utils/asr/remote_asr.py
+# Description: This module contains the RemoteASR class, which transcribes audio on a separate model server process, handing it the audio through shared memory.
+
+import atexit
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.model_server.protocol import TRANSCRIBE, parse_address
+from ssi.utils.model_server.shared_audio import SharedAudioPool
+
+settings = get_settings()
+logger = get_logger()
+
+class RemoteASR(ASRInterface):
+    """
+    An ASR pipeline which sends the audio to the model server (`ASR_MODEL=remote`).
+
+    The audio of each request is written into shared memory segments, and only
+    their names and lengths go over the control connection, so the model
+    server reads the audio without it being pickled or copied through a pipe.
+
+    Calls may come from several executor threads at once. Each request gets an
+    ID, and a reader thread resolves the waiting call when its reply arrives.
+    The segments of a request are only reused after its reply, even if the
+    call timed out, since the model server may still be reading them. If the
+    connection drops, the pending calls fail and the next call reconnects.
+    """
+
+    def __init__(self, address: Optional[str] = None, authkey: Optional[str] = None) -> None:
+        self.address = parse_address(address or settings.MODEL_SERVER_ADDRESS)
+        self.authkey: Optional[bytes] = (authkey or settings.MODEL_SERVER_AUTHKEY).encode() or None
+        self._pool = SharedAudioPool()
+        self._pending: Dict[int, Tuple[Future, List[SharedMemory], Connection]] = {}
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._connection: Optional[Connection] = None
+
+        with self._lock:
+            self._connect()
+        atexit.register(self.close)
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        return self.transcribe_batch_timed(audios)[0]
+
+    def transcribe_batch_timed(self, audios: List[np.ndarray]) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Transcribe a batch on the model server.
+
+        Returns:
+            Tuple[List[str], Dict[str, float]]: The transcriptions, and the seconds
+            the model server's ASR model spent per stage.
+        """
+        if not audios:
+            return [], {}
+
+        segments, refs = [], []
+        for audio in audios:
+            segment, ref = self._pool.write(audio)
+            segments.append(segment)
+            refs.append(ref)
+
+        future: Future = Future()
+        request_id = next(self._request_ids)
+        with self._lock:
+            try:
+                if self._connection is None:
+                    self._connect()
+                self._pending[request_id] = (future, segments, self._connection)
+                self._connection.send((TRANSCRIBE, request_id, refs))
+            except Exception as e:
+                self._pending.pop(request_id, None)
+                for segment in segments:
+                    self._pool.release(segment)
+                if isinstance(e, OSError):
+                    # The server went away; the next call reconnects
+                    self._connection = None
+                    raise ConnectionError(f"Lost the connection to the model server: {e}") from e
+                raise
+
+        return future.result(timeout=settings.MODEL_SERVER_REQUEST_TIMEOUT_SECONDS)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        self._pool.close()
+
+    def _connect(self) -> None:
+        """
+        Connect to the model server, waiting for it while it is still loading its model. Called with the lock held.
+        """
+        deadline = time.monotonic() + settings.MODEL_SERVER_CONNECT_TIMEOUT_SECONDS
+        while True:
+            try:
+                connection = Client(self.address, authkey=self.authkey)
+                break
+            except (ConnectionRefusedError, FileNotFoundError) as e:
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f"Model server at {self.address} is not reachable: {e}") from e
+                time.sleep(0.5)
+
+        self._connection = connection
+        threading.Thread(
+            target=self._read_replies, args=(connection,), name="ssi-remote-asr", daemon=True
+        ).start()
+        logger.info(f"RemoteASR connected to the model server at {self.address}")
+
+    def _read_replies(self, connection: Connection) -> None:
+        try:
+            while True:
+                request_id, transcriptions, stage_timings, error = connection.recv()
+                self._resolve(request_id, transcriptions, stage_timings, error)
+        except (EOFError, OSError):
+            pass
+
+        with self._lock:
+            if self._connection is connection:
+                logger.error(f"RemoteASR lost the connection to the model server at {self.address}")
+                self._connection = None
+            pending = [
+                self._pending.pop(request_id)
+                for request_id, (_, _, sent_on) in list(self._pending.items())
+                if sent_on is connection
+            ]
+        for future, segments, _ in pending:
+            # The server can't read these segments any more, so they can be reused
+            for segment in segments:
+                self._pool.release(segment)
+            if not future.done():
+                future.set_exception(ConnectionError("Lost the connection to the model server"))
+
+    def _resolve(self, request_id: int, transcriptions, stage_timings, error: Optional[str]) -> None:
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+        if entry is None:
+            return
+        future, segments, _ = entry
+        for segment in segments:
+            self._pool.release(segment)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(RuntimeError(f"Model server failed to transcribe: {error}"))
+        else:
+            future.set_result((transcriptions, stage_timings))
@@ -0,0 +1,61 @@
+# Path: ssi/utils/asr/whisper_feature_frontend.py
+# Description: This module contains the WhisperLogMelFrontend class, which computes Whisper's log-mel input features for a whole batch of int16 utterances in one vectorized pass, with the mel filterbank and STFT window cached.
+
+from typing import List
+import numpy as np
+import torch
+from transformers import WhisperFeatureExtractor
+
+class WhisperLogMelFrontend:
+    """
+    A batched replacement for the Hugging Face `WhisperFeatureExtractor` call.
+
+    The feature extractor converts every call's input to float, rebuilds the STFT
+    window and mel filterbank, and processes the utterances one by one. This
+    frontend keeps the filterbank and window as tensors on the model's device,
+    copies the int16 utterances straight into one padded batch, and computes the
+    log-mel spectrogram of the whole batch with a single STFT and matmul. The
+    output matches the feature extractor's (up to float rounding).
+
+    Attributes:
+        n_fft (int): The STFT window size.
+        hop_length (int): The STFT hop size, one feature frame per hop.
+        device (torch.device): The device the features are computed on.
+    """
+
+    def __init__(self, feature_extractor: WhisperFeatureExtractor, device: torch.device) -> None:
+        self.n_fft: int = feature_extractor.n_fft
+        self.hop_length: int = feature_extractor.hop_length
+        self.device = torch.device(device)
+        self.window: torch.Tensor = torch.hann_window(self.n_fft, device=self.device)
+        # Shaped (n_mels, n_freqs) so it can be applied with a single matmul
+        self.mel_filters: torch.Tensor = torch.from_numpy(
+            np.asarray(feature_extractor.mel_filters, dtype=np.float32).T.copy()
+        ).to(self.device)
+
+    def __call__(self, audios: List[np.ndarray], length: int) -> torch.Tensor:
+        """
+        Compute the log-mel features of a batch of utterances.
+
+        Args:
+            audios (List[np.ndarray]): The int16 utterances.
+            length (int): The number of samples every utterance is padded or trimmed to.
+
+        Returns:
+            torch.Tensor: The features, shaped (batch, n_mels, length // hop_length).
+        """
+        # Pad/trim by copying each utterance into a zeroed int16 batch, then convert and scale in one go
+        batch = np.zeros((len(audios), length), dtype=np.int16)
+        for row, audio in zip(batch, audios):
+            n = min(len(audio), length)
+            row[:n] = audio[:n]
+        waveform = torch.from_numpy(batch).to(self.device).float().mul_(1 / 32768)
+
+        stft = torch.stft(waveform, self.n_fft, self.hop_length, window=self.window, return_complex=True)
+        magnitudes = stft[..., :-1].abs() ** 2
+        mel_spec = self.mel_filters @ magnitudes
+
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        max_val = log_spec.amax(dim=(1, 2), keepdim=True)
+        log_spec = torch.maximum(log_spec, max_val - 8.0)
+        return (log_spec + 4.0) / 4.0
@@ -1,20 +1,79 @@
 # Path: ssi/utils/asr/whisper_transformers_asr.py
 # Description: This module contains the WhisperTransformersASR class, which is an implementation of the ASRInterface using the Hugging Face Transformers library.
 
+import difflib
+import inspect
+import math
+import re
+import time
+from typing import Dict, List, Tuple
 import numpy as np
 import torch
 import torch.nn.functional as F
 from transformers import (
     WhisperForConditionalGeneration,
     WhisperProcessor,
-    WhisperConfig,
 )
+from transformers.modeling_outputs import BaseModelOutput
 import soundfile as sf
 from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.asr.whisper_feature_frontend import WhisperLogMelFrontend
 from ssi.utils.whisper_language_codes import WHISPER_LANGUAGE_CODES
 from ssi.logger import get_logger
 from ssi.config import get_settings
 
+CHUNK_LENGTH = 30  # Whisper is trained on 30-second chunks
+WORDS_PER_SECOND = 4  # A generous speech rate, to bound how many words of two windows can overlap
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def window_starts(length: int, window: int, overlap: int) -> List[int]:
+    """
+    Compute where the overlapping windows of a clip start.
+
+    The windows advance by a fixed stride of `window - overlap` samples, and the
+    last one is aligned to the end of the clip. Consecutive windows thus overlap
+    by exactly `overlap` samples, except the last two, which overlap by more.
+
+    Args:
+        length (int): The length of the clip, in samples.
+        window (int): The length of a window, in samples.
+        overlap (int): The minimum overlap of consecutive windows, in samples.
+    """
+    if length <= window:
+        return [0]
+    return list(range(0, length - window, window - overlap)) + [length - window]
+
+def merge_overlapping_transcriptions(transcriptions: List[str], overlaps_seconds: List[float]) -> str:
+    """
+    Join the transcriptions of consecutive overlapping windows of one utterance.
+
+    The end of each transcription so far and the start of the next one are
+    aligned word by word (ignoring case and punctuation), and the joint is
+    placed in the middle of their longest common run of words, away from the
+    window edges where words are cut off. Without a common run, the
+    transcriptions are just concatenated.
+
+    Args:
+        transcriptions (List[str]): The transcriptions of the windows, in order.
+        overlaps_seconds (List[float]): How long each window overlaps the next one.
+    """
+    merged: List[str] = transcriptions[0].split() if transcriptions else []
+    for transcription, overlap_seconds in zip(transcriptions[1:], overlaps_seconds):
+        words = transcription.split()
+        max_words = max(1, math.ceil(overlap_seconds * WORDS_PER_SECOND))
+        tail, head = merged[-max_words:], words[:max_words]
+        match = difflib.SequenceMatcher(
+            None, [_normalize_word(word) for word in tail], [_normalize_word(word) for word in head], autojunk=False
+        ).find_longest_match(0, len(tail), 0, len(head))
+        if match.size == 0:
+            merged.extend(words)
+            continue
+        middle = match.size // 2
+        merged = merged[:len(merged) - len(tail) + match.a + middle] + words[match.b + middle:]
+    return " ".join(merged)
+
 class WhisperTransformersASR(ASRInterface):
     """
     An ASR model implementation using the Hugging Face Transformers library.
@@ -22,77 +81,218 @@ class WhisperTransformersASR(ASRInterface):
     This class provides an implementation of the ASRInterface using the
     Hugging Face Transformers library. It transcribes audio data into text
     using a pre-trained transformer model.
+
+    In the "padded" encoder mode, every input is padded to 30 seconds as Whisper
+    expects. In the "reduced" mode, a batch is only padded to its longest
+    utterance rounded up to `ASR_ENCODER_BUCKET_SECONDS`, and the encoder is run
+    on the shorter input with its positional embeddings truncated to match. A
+    2-second utterance then costs a fraction of the encoder compute of a
+    30-second one.
+
+    Utterances longer than 30 seconds are split into 30-second windows,
+    overlapping by at least `ASR_LONGFORM_OVERLAP_SECONDS`, which are
+    transcribed in the same batch as the other utterances. The transcriptions
+    of the windows are then joined where their overlaps agree (see
+    `merge_overlapping_transcriptions`). A long utterance thus costs one
+    `generate` call, like a short one, only with a larger batch.
     """
     
     def __init__(self):
         self.logger = get_logger()
         self.settings = get_settings()
-        self.model_name = self.settings.ASR_MODEL
+        self.model_name = self.settings.ASR_MODEL_NAME
         self.model_download_dir = self.settings.ASR_MODEL_DOWNLOAD_DIR
-        self.processor = WhisperProcessor.from_pretrained(self.model_name, cache_dir=self.model_download_dir)
-        self.model = (
-            WhisperForConditionalGeneration(
-                config=WhisperConfig.from_pretrained(self.model_name, cache_dir=self.model_download_dir)
-            )
-            .from_pretrained(
-                self.model_name,
-                torch_dtype=torch.float16,
-                cache_dir=self.model_download_dir,
-                low_cpu_mem_usage=True, 
-            )
-        ).eval()
+        self.device, self.compute_type = self._resolve_device_and_compute_type()
+        # `local_files_only` loads straight from the cache, without checking the hub for updates
+        self.processor = WhisperProcessor.from_pretrained(
+            self.model_name,
+            cache_dir=self.model_download_dir,
+            local_files_only=self.settings.MODELS_OFFLINE,
+        )
+        self.model = WhisperForConditionalGeneration.from_pretrained(
+            self.model_name,
+            torch_dtype=torch.float32 if self.compute_type == "int8" else getattr(torch, self.compute_type),
+            cache_dir=self.model_download_dir,
+            low_cpu_mem_usage=True, 
+            local_files_only=self.settings.MODELS_OFFLINE,
+        ).to(self.device).eval()
+
+        if self.compute_type == "int8":
+            # Dynamic quantization: int8 weights, activations quantized on the fly. The output
+            # projection shares its weights with the token embeddings, so it stays in float32.
+            torch.ao.quantization.quantize_dynamic(self.model.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+        # Computes the log-mel features of a whole batch in one pass, straight from int16 audio
+        self.frontend = WhisperLogMelFrontend(self.processor.feature_extractor, self.model.device)
+
+        self.logger.info(f"Loaded ASR model {self.model_name} on {self.device} with compute type {self.compute_type}")
 
-    def _pad_or_trim(self, array: np.ndarray, axis: int = -1):
+        self.encoder_mode: str = self.settings.ASR_ENCODER_MODE
+        self.encoder_bucket_seconds: float = self.settings.ASR_ENCODER_BUCKET_SECONDS
+        self.longform_overlap_seconds: float = self.settings.ASR_LONGFORM_OVERLAP_SECONDS
+
+        # Older versions of transformers require the `layer_head_mask` argument of the encoder layers
+        encoder_layer = self.model.get_encoder().layers[0]
+        self._encoder_layer_kwargs = (
+            {"layer_head_mask": None}
+            if "layer_head_mask" in inspect.signature(encoder_layer.forward).parameters
+            else {}
+        )
+
+    def _resolve_device_and_compute_type(self):
         """
-        Pad or trim the audio array to N_SAMPLES, as expected by the encoder.
+        Resolve "auto" in ASR_DEVICE and ASR_COMPUTE_TYPE.
+
+        The device defaults to CUDA when it is available. The compute type
+        defaults to float16 on CUDA and float32 on CPU, where float16 matmuls are
+        slow or get upcast anyway.
         """
-        CHUNK_LENGTH = 30  # 30-second chunks
-        length: int = CHUNK_LENGTH * self.settings.STREAM_SAMPLE_RATE
-        if torch.is_tensor(array):
-            if array.shape[axis] > length:
-                array = array.index_select(dim=axis, index=torch.arange(length, device=array.device))
-
-            if array.shape[axis] < length:
-                pad_widths = [(0, 0)] * array.ndim
-                pad_widths[axis] = (0, length - array.shape[axis])
-                array = F.pad(array, [pad for sizes in pad_widths[::-1] for pad in sizes])
-        else:
-            if array.shape[axis] > length:
-                array = array.take(indices=range(length), axis=axis)
+        device = self.settings.ASR_DEVICE
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
 
-            if array.shape[axis] < length:
-                pad_widths = [(0, 0)] * array.ndim
-                pad_widths[axis] = (0, length - array.shape[axis])
-                array = np.pad(array, pad_widths)
+        compute_type = self.settings.ASR_COMPUTE_TYPE
+        if compute_type == "auto":
+            compute_type = "float32" if device == "cpu" else "float16"
+        if compute_type == "int8" and device != "cpu":
+            raise ValueError("ASR_COMPUTE_TYPE 'int8' (dynamic quantization) is only supported on CPU.")
+
+        return device, compute_type
+
+    def _input_length(self, audios: List[np.ndarray]) -> int:
+        """
+        Get the number of samples the audio clips of a batch are padded or trimmed to,
+        as expected by the encoder (N_SAMPLES in the "padded" encoder mode).
+        """
+        max_length = CHUNK_LENGTH * self.settings.STREAM_SAMPLE_RATE
+        if self.encoder_mode == "padded":
+            return max_length
+
+        bucket = int(self.encoder_bucket_seconds * self.settings.STREAM_SAMPLE_RATE)
+        longest = max(len(audio) for audio in audios)
+        return min(max(math.ceil(longest / bucket), 1) * bucket, max_length)
+
+    def _split_windows(self, audios: List[np.ndarray]) -> Tuple[List[np.ndarray], List[int], List[List[float]]]:
+        """
+        Split the audio clips longer than 30 seconds into overlapping 30-second windows.
+
+        The windows of a clip overlap by at least `longform_overlap_seconds` (see
+        `window_starts`), so they all have the full length.
+
+        Returns:
+            Tuple[List[np.ndarray], List[int], List[List[float]]]: The windows and short clips, in order, the index of
+                the clip each one belongs to, and for each clip how many seconds each of its windows overlaps the next.
+        """
+        sample_rate = self.settings.STREAM_SAMPLE_RATE
+        window = CHUNK_LENGTH * sample_rate
+        overlap = int(self.longform_overlap_seconds * sample_rate)
+        windows: List[np.ndarray] = []
+        owners: List[int] = []
+        overlaps: List[List[float]] = []
+        for index, audio in enumerate(audios):
+            starts = window_starts(len(audio), window, overlap)
+            for start in starts:
+                windows.append(audio[start:start + window])
+                owners.append(index)
+            overlaps.append([(start + window - next_start) / sample_rate for start, next_start in zip(starts, starts[1:])])
+        return windows, owners, overlaps
+
+    def _encode_reduced(self, input_features: torch.Tensor) -> BaseModelOutput:
+        """
+        Run the Whisper encoder on input features shorter than 30 seconds.
+
+        This does the same as the model's encoder, except that the positional
+        embeddings are truncated to the number of encoder frames of the input.
+        """
+        encoder = self.model.get_encoder()
+        with torch.no_grad():
+            hidden_states = F.gelu(encoder.conv1(input_features))
+            hidden_states = F.gelu(encoder.conv2(hidden_states))
+            hidden_states = hidden_states.permute(0, 2, 1)
+            hidden_states = hidden_states + encoder.embed_positions.weight[:hidden_states.shape[1]]
+
+            for layer in encoder.layers:
+                outputs = layer(hidden_states, None, **self._encoder_layer_kwargs)
+                hidden_states = outputs[0] if isinstance(outputs, tuple) else outputs
+
+            hidden_states = encoder.layer_norm(hidden_states)
+
+        return BaseModelOutput(last_hidden_state=hidden_states)
 
-        return array
-    
-    def _int2float(self, sound: np.ndarray) -> np.ndarray:
-        abs_max = np.abs(sound).max()
-        sound = sound.astype('float32')
-        if abs_max > 0:
-            sound *= 1/32768
-        sound = sound.squeeze()  # depends on the use case
-        return sound
-        
     def transcribe(self, audio: np.ndarray) -> str:
-        audio = self._pad_or_trim(audio)
-        audio = self._int2float(audio)
-        input_features = self.processor(
-            audio, 
-            sampling_rate=self.settings.STREAM_SAMPLE_RATE, 
-            return_tensors="pt"
-        ).input_features.to(device=self.model.device, dtype=self.model.dtype)
-        
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        """
+        Transcribe a batch of audio clips with one `generate` call per `ASR_BATCH_MAX_SIZE` windows.
+        """
+        return self.transcribe_batch_timed(audios)[0]
+
+    def transcribe_batch_timed(self, audios: List[np.ndarray]) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Transcribe a batch of audio clips, timing the feature extraction, the encoder and the decoder.
+
+        Long clips are split into several windows, so the batch can hold more
+        windows than clips. They go through the model `ASR_BATCH_MAX_SIZE` at a
+        time, and the timings are summed over these chunks.
+        """
+        timings: Dict[str, float] = {}
+        windows, owners, overlaps = self._split_windows(audios)
+        max_windows = self.settings.ASR_BATCH_MAX_SIZE
+        transcriptions: List[str] = []
+        for chunk_start in range(0, len(windows), max_windows):
+            transcriptions.extend(self._transcribe_windows(windows[chunk_start:chunk_start + max_windows], timings))
+
+        if len(windows) > len(audios):
+            grouped: List[List[str]] = [[] for _ in audios]
+            for text, owner in zip(transcriptions, owners):
+                grouped[owner].append(text)
+            transcriptions = [
+                texts[0] if len(texts) == 1 else merge_overlapping_transcriptions(texts, clip_overlaps)
+                for texts, clip_overlaps in zip(grouped, overlaps)
+            ]
+
+        return transcriptions, timings
+
+    def _transcribe_windows(self, windows: List[np.ndarray], timings: Dict[str, float]) -> List[str]:
+        """
+        Transcribe windows of at most 30 seconds with a single `generate` call, adding the time of each stage to `timings`.
+
+        The encoder is run explicitly and its output passed to `generate`, which is
+        what `generate` does internally, so the two stages can be timed apart.
+        """
+        started_at = time.perf_counter()
+        length = self._input_length(windows)
+        input_features = self.frontend(windows, length).to(dtype=self.model.dtype)
+        started_at = self._record_stage(timings, "features", started_at)
+
+        # The model's own encoder only accepts 30 seconds of input
+        if length < CHUNK_LENGTH * self.settings.STREAM_SAMPLE_RATE:
+            encoder_outputs = self._encode_reduced(input_features)
+        else:
+            with torch.no_grad():
+                encoder_outputs = BaseModelOutput(
+                    last_hidden_state=self.model.get_encoder()(input_features).last_hidden_state
+                )
+        started_at = self._record_stage(timings, "encode", started_at)
+
         with torch.no_grad():
             logits = self.model.generate(
-                input_features=input_features,
+                encoder_outputs=encoder_outputs,
                 language=WHISPER_LANGUAGE_CODES[self.settings.ASR_TARGET_LANG],
                 forced_decoder_ids=None,
                 use_cache=True,
                 return_timestamps=False,
             )
         
-        transcription = self.processor.batch_decode(logits, skip_special_tokens=True)[0]
+        transcriptions = self.processor.batch_decode(logits, skip_special_tokens=True)
+        self._record_stage(timings, "decode", started_at)
+        return transcriptions
 
-        return transcription
+    def _record_stage(self, timings: Dict[str, float], stage: str, started_at: float) -> float:
+        # CUDA kernels run asynchronously, wait for them so the time is attributed to the right stage
+        if self.model.device.type == "cuda":
+            torch.cuda.synchronize(self.model.device)
+        now = time.perf_counter()
+        timings[stage] = timings.get(stage, 0.0) + now - started_at
+        return now
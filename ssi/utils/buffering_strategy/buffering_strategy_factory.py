@@ -1,8 +1,12 @@
 # Path: ssi/utils/buffering_strategy/buffering_strategy_factory.py
 # Description: This module contains a factory class for creating instances of different buffering strategies.
 
-from ssi.utils.ws.stream_client import StreamClient
+from typing import TYPE_CHECKING
 from .silence_at_end_of_chunk import SilenceAtEndOfChunk
+from .local_agreement import LocalAgreement
+
+if TYPE_CHECKING:
+    from ssi.utils.ws.stream_client import StreamClient
 
 class BufferingStrategyFactory:
     """
@@ -18,7 +22,7 @@ class BufferingStrategyFactory:
     """
 
     @staticmethod
-    def create_buffering_strategy(type: str, client: StreamClient):
+    def create_buffering_strategy(type: str, client: "StreamClient"):
         """
         Creates an instance of a buffering strategy based on
         the specified type.
@@ -29,7 +33,7 @@ class BufferingStrategyFactory:
 
         Args:
             type (str): The type of buffering strategy to create. Currently
-                        supports 'silence_at_end_of_chunk'.
+                        supports 'silence_at_end_of_chunk' and 'local_agreement'.
             client (StreamClient): The client instance to be associated with the
                              buffering strategy.
 
@@ -46,5 +50,7 @@ class BufferingStrategyFactory:
         """
         if type == "silence_at_end_of_chunk":
             return SilenceAtEndOfChunk(client)
+        elif type == "local_agreement":
+            return LocalAgreement(client)
         else:
             raise ValueError(f"Unknown buffering strategy type: {type}")
@@ -2,9 +2,7 @@
 # Description: This module contains the interface for the buffering strategy used in the real-time audio transcription system. We'll implement the interface for the different buffering strategies in the respective files.
 
 from abc import ABC, abstractmethod
-from fastapi import WebSocket
-from ssi.utils.vad.vad_interface import VADInterface
-from ssi.utils.asr.asr_interface import ASRInterface
+import numpy as np
 
 class BufferingStrategyInterface(ABC):
     """
@@ -15,36 +13,40 @@ class BufferingStrategyInterface(ABC):
     buffering strategies that fit specific requirements of an audio processing
     pipeline.
 
+    The client splits the incoming audio into fixed size frames and runs VAD on
+    each of them. The buffering strategy then decides, frame by frame, which
+    audio to record and when to send it for transcription.
+
     Subclasses should implement the methods defined in this interface to ensure
     consistency and compatibility with the system's audio processing framework.
 
     Methods:
-        process_audio: Process audio data. This method should be implemented
+        process_audio: Process one audio frame. This method should be implemented
                        by subclasses.
     """
 
     @abstractmethod
-    async def process_audio(
-        self, 
-        websocket: WebSocket,
-        vad_pipeline: VADInterface,
-        asr_pipeline: ASRInterface
-    ) -> None:
+    async def process_audio(self, audio_frame: np.ndarray, voice_prob: float) -> None:
         """
-        Process audio data using the given WebSocket connection, VAD pipeline,
-        and ASR pipeline.
+        Process one frame of audio together with its voice activity probability.
 
         This method is intended to be overridden in subclasses to provide
         specific logic for handling and processing audio data in different
         buffering strategies.
 
         Args:
-            websocket (Websocket): The WebSocket connection for communication with clients.
-            vad_pipeline (VADInterface): The Voice Activity Detection (VAD) pipeline used for detecting speech in the audio.
-            asr_pipeline (ASRInterface): The Automatic Speech Recognition (ASR) pipeline used for transcribing speech in the audio.
+            audio_frame (np.ndarray): The int16 audio frame.
+            voice_prob (float): The probability of voice activity in the frame, as detected by the VAD pipeline.
 
         Raises:
             NotImplementedError: If the method is not implemented in the
                                  subclass.
         """
         pass
+
+    @property
+    def is_recording(self) -> bool:
+        """
+        Whether the strategy is currently recording an utterance.
+        """
+        return False
@@ -0,0 +1,146 @@
+# Path: ssi/utils/buffering_strategy/local_agreement.py
+# Description: This module contains the LocalAgreement buffering strategy class. In this strategy, the growing utterance is re-transcribed at a fixed interval and the words on which two consecutive transcriptions agree (LocalAgreement-2) are sent as partial transcriptions.
+
+import asyncio
+import re
+from typing import TYPE_CHECKING, List
+import numpy as np
+from ssi.utils.buffering_strategy.silence_at_end_of_chunk import SilenceAtEndOfChunk
+from ssi.config import get_settings
+from ssi.logger import get_logger
+
+if TYPE_CHECKING:
+    from ssi.utils.ws.stream_client import StreamClient
+
+settings = get_settings()
+logger = get_logger()
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def longest_common_prefix(previous: List[str], current: List[str]) -> int:
+    """
+    Get the number of leading words two transcriptions agree on, ignoring case and punctuation.
+    """
+    i = 0
+    while i < len(previous) and i < len(current) and _normalize(previous[i]) == _normalize(current[i]):
+        i += 1
+    return i
+
+class LocalAgreement(SilenceAtEndOfChunk):
+    """
+    A streaming buffering strategy using the LocalAgreement-2 policy.
+
+    Utterances are detected like in `SilenceAtEndOfChunk`, but while the user is
+    still speaking, the audio recorded so far is re-transcribed every
+    `LOCAL_AGREEMENT_INTERVAL_SECONDS`. The words on which the last two
+    transcriptions agree are considered stable and sent to the client as a
+    partial transcription (`is_final=False`) containing only the newly stable
+    words. When the utterance ends, the full transcription of the utterance is
+    sent with `is_final=True`.
+
+    To keep each re-decode short, the recorded audio is trimmed once it is fully
+    committed: when two transcriptions agree on every word and the decoded audio
+    ends in a pause, the decoded audio and its words are committed and only the
+    audio after it is decoded from then on. If no such pause comes before the
+    window reaches `LOCAL_AGREEMENT_MAX_WINDOW_SECONDS`, the window is committed
+    as it is.
+
+    Attributes:
+        client (StreamClient): The client instance associated with this buffering strategy.
+    """
+
+    def __init__(self, client: "StreamClient") -> None:
+        super().__init__(client)
+        self.interval_samples = int(settings.LOCAL_AGREEMENT_INTERVAL_SECONDS * settings.STREAM_SAMPLE_RATE)
+        self.max_window_samples = int(settings.LOCAL_AGREEMENT_MAX_WINDOW_SECONDS * settings.STREAM_SAMPLE_RATE)
+        self.generation = 0  # Incremented per utterance, so late results of a previous utterance are ignored
+        self._reset_utterance()
+
+    def _reset_utterance(self) -> None:
+        self.generation += 1
+        self.committed_words: List[str] = []  # Words of the audio already trimmed from the window
+        self.previous_hypothesis: List[str] = []  # The last transcription of the current window
+        self.emitted_words = 0  # Words of the current window already sent as partials
+        self.samples_since_decode = 0
+        self.decode_in_flight = False
+
+    def _on_recording_started(self) -> None:
+        self._reset_utterance()
+
+    def _on_recording_frame(self, audio_frame: np.ndarray, voice_prob: float) -> None:
+        self.samples_since_decode += len(audio_frame)
+        if self.decode_in_flight or self.samples_since_decode < self.interval_samples:
+            return
+        if self.conditioner.speech_samples < self.conditioner.min_speech_samples:
+            # It may still turn out to be a click, not worth a decode yet
+            return
+
+        force_commit = len(self.recording_buffer) >= self.max_window_samples
+        ends_in_pause = voice_prob < settings.VAD_THRESHOLD
+        self._submit_partial_decode(ends_in_pause, force_commit)
+
+    def _submit_partial_decode(self, ends_in_pause: bool, force_commit: bool) -> None:
+        audio = self.recording_buffer.view().copy()
+        generation = self.generation
+        self.decode_in_flight = True
+        self.samples_since_decode = 0
+
+        self.client.asr_scheduler.submit(audio, self.client.utterance_timings()).add_done_callback(
+            lambda future: self._on_partial_transcription(future, generation, len(audio), ends_in_pause, force_commit)
+        )
+
+    def _on_partial_transcription(
+        self,
+        future: asyncio.Future,
+        generation: int,
+        decoded_samples: int,
+        ends_in_pause: bool,
+        force_commit: bool,
+    ) -> None:
+        if generation != self.generation:
+            return
+        self.decode_in_flight = False
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Partial transcription failed for client {self.client.client_id}: {future.exception()}")
+            return
+
+        result = future.result()
+        hypothesis = result.transcription.split()
+        stable = longest_common_prefix(self.previous_hypothesis, hypothesis)
+        self.previous_hypothesis = hypothesis
+
+        fully_agreed = stable == len(hypothesis) and ends_in_pause
+        if force_commit or fully_agreed:
+            stable = len(hypothesis)
+
+        if stable > self.emitted_words:
+            self.client.send_transcription(" ".join(hypothesis[self.emitted_words:stable]), is_final=False, result=result)
+            self.emitted_words = stable
+
+        if force_commit or fully_agreed:
+            # Everything decoded so far is committed, so it doesn't need to be decoded again
+            self.committed_words.extend(hypothesis)
+            self.recording_buffer.discard_front(decoded_samples)
+            self.previous_hypothesis = []
+            self.emitted_words = 0
+
+    def _on_utterance_finished(self, audio: np.ndarray) -> None:
+        committed_words = self.committed_words
+        self._reset_utterance()
+
+        self.client.asr_scheduler.submit(audio, self.client.utterance_timings()).add_done_callback(
+            lambda future: self._on_final_transcription(future, committed_words)
+        )
+
+    def _on_final_transcription(self, future: asyncio.Future, committed_words: List[str]) -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Transcription failed for client {self.client.client_id}: {future.exception()}")
+            return
+
+        result = future.result()
+        self.client.send_transcription(" ".join(committed_words + result.transcription.split()), is_final=True, result=result)
@@ -1,16 +1,28 @@
 # Path: ssi/utils/buffering_strategy/silence_at_end_of_chunk.py
 # Description: This module contains the SilenceAtEndOfChunk buffering strategy class. In this strategy, the audio chunks are buffered until a period of silence is detected at the end of the chunk. This is done by using VAD to detect the presence of speech in the audio data.
 
-from fastapi import WebSocket
+import asyncio
+from typing import TYPE_CHECKING
+import numpy as np
 from ssi.utils.buffering_strategy.buffering_strategy_interface import BufferingStrategyInterface
-from ssi.utils.vad.vad_interface import VADInterface
-from ssi.utils.asr.asr_interface import ASRInterface
-from ssi.utils.ws.stream_client import StreamClient
+from ssi.utils.buffers.audio_ring_buffer import AudioRingBuffer
+from ssi.utils.buffers.utterance_buffer import UtteranceBuffer
+from ssi.utils.buffers.utterance_conditioner import UtteranceConditioner
+from ssi.utils.endpointing.endpointer_factory import EndpointerFactory
+from ssi.utils.endpointing.endpointer_interface import EndpointerInterface
+from ssi.utils.metrics.server_metrics import get_server_metrics
 from ssi.config import get_settings
 from ssi.logger import get_logger
 
+if TYPE_CHECKING:
+    from ssi.utils.ws.stream_client import StreamClient
+
 settings = get_settings()
 logger = get_logger()
+metrics = get_server_metrics()
+
+# Initial size of the recording buffer, it grows as needed for longer utterances
+INITIAL_RECORDING_SECONDS = 5
 
 class SilenceAtEndOfChunk(BufferingStrategyInterface):
     """
@@ -21,23 +33,109 @@ class SilenceAtEndOfChunk(BufferingStrategyInterface):
     the end of each chunk, and initiating the transcription process for the
     chunk.
 
+    Recording starts when a frame's voice probability reaches `VAD_THRESHOLD`,
+    including `BUFFER_SECONDS_BEFORE` of audio from before the speech. Once
+    the endpointer (see `ENDPOINTING`) decides that the silence after the
+    speech ends the utterance, it is sent to the ASR scheduler and the
+    transcription is delivered to the client.
+
+    The frames are recorded through an `UtteranceConditioner`, which squeezes
+    the silences to `CONDITIONING_MAX_SILENCE_SECONDS` and drops utterances
+    with less than `CONDITIONING_MIN_SPEECH_SECONDS` of speech.
+
     Attributes:
         client (StreamClient): The client instance associated with this buffering strategy.
     """
     
-    def __init__(self, client: StreamClient) -> None:
-        self.client: StreamClient = client
-        self.is_recording = False
-        self.pre_buffer = bytearray()
-        self.recording_buffer = bytearray()
-        self.post_buffer = bytearray()
-        self.silence_duration = 0
-        self.processing_flag = False
+    def __init__(self, client: "StreamClient") -> None:
+        self.client: "StreamClient" = client
+        self._is_recording = False
+        self.endpointer: EndpointerInterface = EndpointerFactory.create_endpointer(settings.ENDPOINTING)
+
+        # The pre- and post-buffers are preallocated ring buffers, so updating them costs O(chunk).
+        # The recording buffer grows geometrically and is reused across utterances.
+        logger.debug(f"Initializing pre-buffer with {settings.BUFFER_SECONDS_BEFORE} seconds of silence")
+        self.pre_buffer = AudioRingBuffer(int(settings.BUFFER_SECONDS_BEFORE * settings.STREAM_SAMPLE_RATE))
+
+        logger.debug(f"Initializing post-buffer with {settings.BUFFER_SECONDS_AFTER} seconds of silence")
+        self.post_buffer = AudioRingBuffer(int(settings.BUFFER_SECONDS_AFTER * settings.STREAM_SAMPLE_RATE))
+
+        self.recording_buffer = UtteranceBuffer(int(INITIAL_RECORDING_SECONDS * settings.STREAM_SAMPLE_RATE))
+        self.conditioner = UtteranceConditioner(
+            self.recording_buffer,
+            max_silence_samples=int(settings.CONDITIONING_MAX_SILENCE_SECONDS * settings.STREAM_SAMPLE_RATE),
+            min_speech_samples=int(settings.CONDITIONING_MIN_SPEECH_SECONDS * settings.STREAM_SAMPLE_RATE),
+        )
+
+    @property
+    def is_recording(self) -> bool:
+        return self._is_recording
         
-    async def process_audio(
-        self, 
-        websocket: WebSocket,
-        vad_pipeline: VADInterface,
-        asr_pipeline: ASRInterface
-    ) -> None:
-        raise NotImplementedError("process_audio method must be implemented in subclass")
+    async def process_audio(self, audio_frame: np.ndarray, voice_prob: float) -> None:
+        # Update pre-buffer, it then ends with the current frame
+        self.pre_buffer.write(audio_frame)
+
+        if voice_prob >= settings.VAD_THRESHOLD:
+            if not self._is_recording:
+                logger.info(f"Voice activity detected for client {self.client.client_id}. Starting recording.")
+                self._is_recording = True
+                # The pre-buffer ends with the current frame
+                self.recording_buffer.append_ring(self.pre_buffer)
+                self.conditioner.start(speech_samples=len(audio_frame))
+                self.endpointer.start_utterance()
+                self._on_recording_started()
+            else:
+                self.conditioner.add_frame(audio_frame, voiced=True)
+            self.endpointer.update(voice_prob, len(audio_frame) / settings.STREAM_SAMPLE_RATE)
+            self._on_recording_frame(audio_frame, voice_prob)
+        elif self._is_recording:
+            self.conditioner.add_frame(audio_frame, voiced=False)
+
+            if self.endpointer.update(voice_prob, len(audio_frame) / settings.STREAM_SAMPLE_RATE):
+                logger.info(f"Silence detected for client {self.client.client_id}. Stopping recording and transcribing.")
+                metrics.endpoint_hangover_seconds.observe(self.endpointer.silence_seconds)
+                self._is_recording = False
+
+                # Prepare the final audio for transcription
+                if self.conditioner.max_silence_samples == 0:
+                    self.recording_buffer.append_ring(self.post_buffer)
+                else:
+                    metrics.asr_audio_seconds_saved.labels("silence").inc(len(self.post_buffer) / settings.STREAM_SAMPLE_RATE)
+                audio = self.conditioner.finish()
+                if audio is None:
+                    logger.info(f"Dropped an utterance of client {self.client.client_id} with too little speech to transcribe.")
+                else:
+                    self._on_utterance_finished(audio)
+            else:
+                self._on_recording_frame(audio_frame, voice_prob)
+        else:
+            # Update post-buffer
+            self.post_buffer.write(audio_frame)
+
+    def _on_recording_started(self) -> None:
+        """
+        Called when a new utterance starts. Subclasses can override this to reset their state.
+        """
+        pass
+
+    def _on_recording_frame(self, audio_frame: np.ndarray, voice_prob: float) -> None:
+        """
+        Called after a frame was added to the recording. Subclasses can override this to act on partial audio.
+        """
+        pass
+
+    def _on_utterance_finished(self, audio: np.ndarray) -> None:
+        """
+        Queue the finished utterance for batched transcription.
+        """
+        self.client.asr_scheduler.submit(audio, self.client.utterance_timings()).add_done_callback(self._on_transcription)
+
+    def _on_transcription(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Transcription failed for client {self.client.client_id}: {future.exception()}")
+            return
+
+        result = future.result()
+        self.client.send_transcription(result.transcription, result=result)
@@ -0,0 +1,72 @@
+# Path: ssi/utils/buffers/audio_ring_buffer.py
+# Description: This module contains the AudioRingBuffer class, a fixed size, preallocated circular buffer which always holds the most recent audio samples.
+
+from typing import Tuple
+import numpy as np
+
+class AudioRingBuffer:
+    """
+    A preallocated circular buffer holding the last `capacity` audio samples.
+
+    Writing a chunk copies only the chunk into the buffer (O(chunk)), unlike
+    `np.roll` which copies the whole buffer on every write. The buffer starts
+    out filled with silence (zeros), so it always holds exactly `capacity`
+    samples.
+
+    Attributes:
+        capacity (int): The number of samples the buffer holds.
+    """
+
+    def __init__(self, capacity: int, dtype: np.dtype = np.int16) -> None:
+        self.capacity: int = capacity
+        self._buffer: np.ndarray = np.zeros(capacity, dtype=dtype)
+        self._write_pos: int = 0  # Index of the oldest sample, which is the next one to be overwritten
+
+    def __len__(self) -> int:
+        return self.capacity
+
+    def write(self, chunk: np.ndarray) -> None:
+        """
+        Append a chunk of samples, overwriting the oldest ones.
+        """
+        n = len(chunk)
+        if self.capacity == 0 or n == 0:
+            return
+
+        if n >= self.capacity:
+            self._buffer[:] = chunk[-self.capacity:]
+            self._write_pos = 0
+            return
+
+        end = self._write_pos + n
+        if end <= self.capacity:
+            self._buffer[self._write_pos:end] = chunk
+        else:
+            split = self.capacity - self._write_pos
+            self._buffer[self._write_pos:] = chunk[:split]
+            self._buffer[:n - split] = chunk[split:]
+        self._write_pos = end % self.capacity
+
+    def segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the buffered samples, oldest first, as two zero-copy views.
+
+        The views are only valid until the next `write` or `clear`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The older and the newer part of the buffer.
+        """
+        return self._buffer[self._write_pos:], self._buffer[:self._write_pos]
+
+    def to_array(self) -> np.ndarray:
+        """
+        Get a copy of the buffered samples, oldest first.
+        """
+        return np.concatenate(self.segments())
+
+    def clear(self) -> None:
+        """
+        Reset the buffer to silence.
+        """
+        self._buffer.fill(0)
+        self._write_pos = 0
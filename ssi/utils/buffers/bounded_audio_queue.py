@@ -0,0 +1,282 @@
+# Path: ssi/utils/buffers/bounded_audio_queue.py
+# Description: This module contains the BoundedAudioQueue class, which holds a client's received but unprocessed audio messages up to a cap in seconds and applies an overload policy when the cap is exceeded, and the AudioBufferBudget class, which caps the audio buffered by all clients together.
+
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+import numpy as np
+from ssi.utils.metrics.server_metrics import get_server_metrics
+
+OVERLOAD_POLICIES = ("block", "drop_oldest_silence", "summarize_silence", "disconnect")
+
+class AudioBufferBudget:
+    """
+    The audio buffered by all the queues sharing this budget, with an optional cap.
+
+    Queues blocked by the `block` policy wait in `wait_for`, which is woken up
+    whenever any queue sharing the budget releases audio.
+
+    Attributes:
+        max_samples (int): The cap on the samples buffered by all queues. 0 means no cap.
+        buffered_samples (int): The samples currently buffered by all queues.
+    """
+
+    def __init__(self, max_samples: int = 0) -> None:
+        self.max_samples: int = max_samples
+        self.buffered_samples: int = 0
+        self._released: Optional[asyncio.Event] = None
+
+    def exceeded_by(self, samples: int) -> bool:
+        return self.max_samples > 0 and self.buffered_samples + samples > self.max_samples
+
+    def acquire(self, samples: int) -> None:
+        self.buffered_samples += samples
+
+    def release(self, samples: int) -> None:
+        """
+        Return samples to the budget, waking up the queues waiting for room.
+        """
+        self.buffered_samples -= samples
+        if self._released is not None:
+            self._released.set()
+
+    async def wait_for(self, predicate: Callable[[], bool]) -> None:
+        """
+        Wait until `predicate` is true, checking it again each time audio is released.
+        """
+        # Created on first use, so the budget can be constructed outside of the event loop
+        if self._released is None:
+            self._released = asyncio.Event()
+        while not predicate():
+            # Clearing doesn't affect the waiters already woken up by the last release
+            self._released.clear()
+            await self._released.wait()
+
+class _QueuedMessage:
+    __slots__ = ("data", "samples", "is_silent")
+
+    def __init__(self, data: bytes, samples: int, is_silent: bool) -> None:
+        self.data: bytes = data
+        self.samples: int = samples
+        self.is_silent: bool = is_silent
+
+class BoundedAudioQueue:
+    """
+    A queue of raw audio messages, bounded by the seconds of audio it holds.
+
+    A message is always accepted into an empty queue. Otherwise, when adding it
+    would exceed `max_samples` or the shared budget's cap, the overload policy
+    decides what happens:
+
+    - "block": `put` waits until the processing task drained enough audio. While
+      it waits, the client's socket isn't read, so TCP backpressure slows the
+      client down.
+    - "drop_oldest_silence": the oldest silent messages are dropped until the
+      new message fits.
+    - "summarize_silence": runs of consecutive silent messages are shortened to
+      `keep_silence_samples`, which is just enough for the endpointer to still
+      see the end of the utterance.
+    - "disconnect": `put` returns False, and the caller closes the connection.
+
+    When there is no silence to drop or shorten, the silence policies fall back
+    to blocking. Each overload action is counted per policy in the server
+    metrics and in `stats`.
+
+    The messages taken by `get_all` still count towards the caps until the
+    caller is done processing them and calls `task_done` (or the next
+    `get_all`), so the audio held by a client never exceeds its cap by more
+    than one message.
+
+    Attributes:
+        policy (str): The overload policy.
+        max_samples (int): The cap on the samples in this queue. 0 means no cap.
+        budget (AudioBufferBudget): The budget shared with the other clients' queues.
+        stats (Dict[str, float]): Overload actions taken and seconds of audio dropped.
+    """
+
+    def __init__(
+        self,
+        policy: str,
+        max_samples: int,
+        budget: Optional[AudioBufferBudget] = None,
+        sample_rate: int = 16000,
+        sample_width: int = 2,
+        silence_threshold_db: float = -45.0,
+        keep_silence_samples: int = 16000,
+    ) -> None:
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown audio queue overload policy: {policy}")
+        self.policy: str = policy
+        self.max_samples: int = max_samples
+        self.budget: AudioBufferBudget = budget or AudioBufferBudget()
+        self.sample_rate: int = sample_rate
+        self.sample_width: int = sample_width
+        self.silence_threshold: float = 32768 * 10 ** (silence_threshold_db / 20)
+        self.keep_silence_samples: int = keep_silence_samples
+        self.metrics = get_server_metrics()
+
+        self._messages: Deque[_QueuedMessage] = deque()
+        self._buffered_samples: int = 0
+        self._in_flight_samples: int = 0  # Taken by `get_all`, not yet processed
+        self._not_empty: Optional[asyncio.Event] = None
+        self._closed: bool = False
+        self.stats: Dict[str, float] = {
+            "overloads": 0,
+            "blocked": 0,
+            "dropped_silence": 0,
+            "summarized_silence": 0,
+            "disconnected": 0,
+            "dropped_seconds": 0.0,
+        }
+
+    @property
+    def buffered_seconds(self) -> float:
+        return self._buffered_samples / self.sample_rate
+
+    def qsize(self) -> int:
+        return len(self._messages)
+
+    def empty(self) -> bool:
+        return not self._messages
+
+    async def put(self, data: bytes) -> bool:
+        """
+        Add a message, applying the overload policy if it doesn't fit.
+
+        Args:
+            data (bytes): The raw int16 audio message.
+
+        Returns:
+            bool: False if the message was refused and the client should be disconnected.
+        """
+        message = _QueuedMessage(data, len(data) // self.sample_width, self._is_silent(data))
+
+        if self._messages and self._exceeded_by(message.samples):
+            self._count("overloads")
+            if self.policy == "disconnect":
+                self._count("disconnected")
+                return False
+            if self.policy == "drop_oldest_silence":
+                self._drop_oldest_silence(message.samples)
+            elif self.policy == "summarize_silence":
+                self._summarize_silence(message.samples)
+
+            if self._messages and self._exceeded_by(message.samples):
+                self._count("blocked")
+                await self.budget.wait_for(lambda: not self._messages or not self._exceeded_by(message.samples))
+
+        self._append(message)
+        return True
+
+    async def get_all(self) -> List[bytes]:
+        """
+        Wait for at least one message, then take every queued message.
+
+        The messages taken before are considered processed. Once the queue is
+        closed and empty, returns an empty list instead of waiting.
+        """
+        self.task_done()
+        if self._not_empty is None:
+            self._not_empty = asyncio.Event()
+        while not self._messages:
+            if self._closed:
+                return []
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        messages = [message.data for message in self._messages]
+        self._in_flight_samples = sum(message.samples for message in self._messages)
+        self._messages.clear()
+        return messages
+
+    def task_done(self) -> None:
+        """
+        Mark the messages taken by the last `get_all` as processed, returning their samples to the caps.
+        """
+        self._release(self._in_flight_samples)
+        self._in_flight_samples = 0
+
+    def close(self) -> None:
+        """
+        Mark the end of the audio, e.g. when the client disconnected, waking up a waiting `get_all`.
+        """
+        self._closed = True
+        if self._not_empty is not None:
+            self._not_empty.set()
+
+    def clear(self) -> None:
+        """
+        Drop every queued message and return their samples, and those of the messages being processed, to the budget.
+        """
+        self._release(self._buffered_samples)
+        self._messages.clear()
+        self._in_flight_samples = 0
+
+    def _exceeded_by(self, samples: int) -> bool:
+        over_session_cap = self.max_samples > 0 and self._buffered_samples + samples > self.max_samples
+        return over_session_cap or self.budget.exceeded_by(samples)
+
+    def _is_silent(self, data: bytes) -> bool:
+        if self.policy not in ("drop_oldest_silence", "summarize_silence"):
+            return False
+        # An odd-length message can't be removed without shifting the sample alignment of what follows
+        if len(data) % self.sample_width or not data:
+            return False
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples ** 2))) < self.silence_threshold
+
+    def _append(self, message: _QueuedMessage) -> None:
+        self._messages.append(message)
+        self._buffered_samples += message.samples
+        self.budget.acquire(message.samples)
+        if self._not_empty is not None:
+            self._not_empty.set()
+
+    def _release(self, samples: int) -> None:
+        if samples:
+            self._buffered_samples -= samples
+            self.budget.release(samples)
+
+    def _drop_oldest_silence(self, incoming_samples: int) -> None:
+        kept: Deque[_QueuedMessage] = deque()
+        while self._messages:
+            message = self._messages.popleft()
+            if message.is_silent and self._exceeded_by(incoming_samples):
+                self._release(message.samples)
+                self._count("dropped_silence", message.samples)
+            else:
+                kept.append(message)
+        self._messages = kept
+
+    def _summarize_silence(self, incoming_samples: int) -> None:
+        summarized: Deque[_QueuedMessage] = deque()
+        run: List[_QueuedMessage] = []
+
+        def flush_run() -> None:
+            run_samples = sum(message.samples for message in run)
+            if run_samples > self.keep_silence_samples and self._exceeded_by(incoming_samples):
+                # Keep the end of the run, which is the silence right before the next speech
+                tail = b"".join(message.data for message in run)[-self.keep_silence_samples * self.sample_width:]
+                self._release(run_samples - self.keep_silence_samples)
+                self._count("summarized_silence", run_samples - self.keep_silence_samples)
+                summarized.append(_QueuedMessage(tail, self.keep_silence_samples, True))
+            else:
+                summarized.extend(run)
+            run.clear()
+
+        for message in self._messages:
+            if message.is_silent:
+                run.append(message)
+            else:
+                flush_run()
+                summarized.append(message)
+        flush_run()
+        self._messages = summarized
+
+    def _count(self, action: str, dropped_samples: int = 0) -> None:
+        self.stats[action] += 1
+        self.metrics.audio_queue_overloads.labels(self.policy, action).inc()
+        if dropped_samples:
+            dropped_seconds = dropped_samples / self.sample_rate
+            self.stats["dropped_seconds"] += dropped_seconds
+            self.metrics.audio_queue_dropped_seconds.labels(action).inc(dropped_seconds)
@@ -0,0 +1,81 @@
+# Path: ssi/utils/buffers/frame_chunker.py
+# Description: This module contains the FrameChunker class, which splits and joins incoming audio bytes of arbitrary size into fixed size frames for the VAD model.
+
+from typing import Iterable, List
+import numpy as np
+
+class FrameChunker:
+    """
+    Re-chunks a stream of int16 audio messages into fixed size frames.
+
+    Clients send audio in whatever chunk size their audio stack produces (e.g.
+    20 ms or 100 ms), while the VAD model expects frames of exactly
+    `frame_samples` samples. Whole frames inside a message are returned as
+    zero-copy views of the message; only the samples of a frame which spans two
+    messages are copied into a small carry-over buffer.
+
+    Attributes:
+        frame_samples (int): The number of samples in each frame.
+        frame_bytes (int): The number of bytes in each frame.
+    """
+
+    def __init__(self, frame_samples: int, sample_width: int = 2) -> None:
+        self.frame_samples: int = frame_samples
+        self.frame_bytes: int = frame_samples * sample_width
+        self._remainder: bytearray = bytearray()
+
+    @property
+    def pending_bytes(self) -> int:
+        """The number of buffered bytes which don't make up a whole frame yet."""
+        return len(self._remainder)
+
+    def push(self, data: bytes) -> List[np.ndarray]:
+        """
+        Add a message and get the frames completed by it.
+
+        Args:
+            data (bytes): The raw int16 audio message.
+
+        Returns:
+            List[np.ndarray]: The completed frames, oldest first.
+        """
+        frames: List[np.ndarray] = []
+        view = memoryview(data)
+        offset = 0
+
+        # Complete the frame left over from the previous messages
+        if self._remainder:
+            offset = min(self.frame_bytes - len(self._remainder), len(view))
+            self._remainder += view[:offset]
+            if len(self._remainder) < self.frame_bytes:
+                return frames
+            frames.append(np.frombuffer(bytes(self._remainder), dtype=np.int16))
+            self._remainder.clear()
+
+        # Whole frames are views into the message
+        n_frames = (len(view) - offset) // self.frame_bytes
+        if n_frames:
+            block = np.frombuffer(data, dtype=np.int16, count=n_frames * self.frame_samples, offset=offset)
+            frames.extend(block.reshape(n_frames, self.frame_samples))
+
+        # Keep the trailing partial frame for the next message
+        tail = offset + n_frames * self.frame_bytes
+        if tail < len(view):
+            self._remainder += view[tail:]
+
+        return frames
+
+    def push_many(self, messages: Iterable[bytes]) -> List[np.ndarray]:
+        """
+        Add several messages at once and get all the frames completed by them.
+        """
+        frames: List[np.ndarray] = []
+        for data in messages:
+            frames.extend(self.push(data))
+        return frames
+
+    def reset(self) -> None:
+        """
+        Drop the buffered partial frame.
+        """
+        self._remainder.clear()
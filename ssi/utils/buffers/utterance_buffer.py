@@ -0,0 +1,86 @@
+# Path: ssi/utils/buffers/utterance_buffer.py
+# Description: This module contains the UtteranceBuffer class, a growable audio buffer with amortized O(1) appends which is reused from one utterance to the next.
+
+import numpy as np
+from ssi.utils.buffers.audio_ring_buffer import AudioRingBuffer
+
+class UtteranceBuffer:
+    """
+    A growable audio buffer for recording an utterance.
+
+    The backing array doubles in size whenever it runs out of room, so appending
+    a chunk costs O(chunk) amortized instead of re-copying the whole recording
+    like `np.concatenate` does. Clearing the buffer keeps the backing array, so
+    the memory is reused by the next utterance.
+
+    Attributes:
+        dtype (np.dtype): The sample type of the buffer.
+    """
+
+    def __init__(self, initial_capacity: int, dtype: np.dtype = np.int16) -> None:
+        self.dtype: np.dtype = dtype
+        self._buffer: np.ndarray = np.empty(max(initial_capacity, 1), dtype=dtype)
+        self._length: int = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= len(self._buffer):
+            return
+        new_capacity = len(self._buffer)
+        while new_capacity < capacity:
+            new_capacity *= 2
+        new_buffer = np.empty(new_capacity, dtype=self.dtype)
+        new_buffer[:self._length] = self._buffer[:self._length]
+        self._buffer = new_buffer
+
+    def append(self, chunk: np.ndarray) -> None:
+        """
+        Append a chunk of samples to the end of the buffer.
+        """
+        end = self._length + len(chunk)
+        self._reserve(end)
+        self._buffer[self._length:end] = chunk
+        self._length = end
+
+    def append_ring(self, ring_buffer: AudioRingBuffer) -> None:
+        """
+        Append the contents of a ring buffer, oldest sample first, without an intermediate copy.
+        """
+        for segment in ring_buffer.segments():
+            self.append(segment)
+
+    def view(self) -> np.ndarray:
+        """
+        Get a zero-copy view of the recorded samples.
+
+        The view is only valid until the next `append`, `clear` or `take`.
+        """
+        return self._buffer[:self._length]
+
+    def take(self) -> np.ndarray:
+        """
+        Get a copy of the recorded samples and clear the buffer.
+
+        Use this to hand the utterance to code which keeps it around (e.g. the
+        ASR queue), since the backing array is reused by the next utterance.
+        """
+        audio = self._buffer[:self._length].copy()
+        self.clear()
+        return audio
+
+    def discard_front(self, n: int) -> None:
+        """
+        Drop the oldest `n` samples, keeping the rest at the start of the buffer.
+        """
+        n = min(n, self._length)
+        remaining = self._length - n
+        self._buffer[:remaining] = self._buffer[n:self._length]
+        self._length = remaining
+
+    def clear(self) -> None:
+        """
+        Empty the buffer, keeping the allocated memory for reuse.
+        """
+        self._length = 0
@@ -0,0 +1,109 @@
+# Path: ssi/utils/buffers/utterance_conditioner.py
+# Description: This module contains the UtteranceConditioner class, which prepares the audio of an utterance for the ASR while it is recorded: the silences within it are squeezed to a capped length, and utterances with too little speech are dropped.
+
+from typing import Optional
+import numpy as np
+from ssi.utils.buffers.audio_ring_buffer import AudioRingBuffer
+from ssi.utils.buffers.utterance_buffer import UtteranceBuffer
+from ssi.utils.metrics.server_metrics import get_server_metrics
+from ssi.config import get_settings
+
+settings = get_settings()
+metrics = get_server_metrics()
+
+class UtteranceConditioner:
+    """
+    Records the frames of an utterance into a buffer, conditioned for the ASR.
+
+    The frames are classified with the voice probabilities the VAD already
+    computed. Of each run of silence, only the first and the last
+    `max_silence_samples / 2` samples are recorded: the start keeps the end
+    of the word before, the end keeps the soft onset of the word after, which
+    stays below the threshold. Whisper's cost grows with the length of its
+    input, and long silences add nothing but a chance to hallucinate. The
+    silence after the last word, kept until the endpointer ends the
+    utterance, is squeezed the same way.
+
+    `finish` then drops the utterance if it contains less than
+    `min_speech_samples` of speech, such as a click or a cough which passed
+    the threshold for a frame or two, so it doesn't cost an ASR call.
+
+    Attributes:
+        buffer (UtteranceBuffer): The recording buffer the frames are appended to.
+        max_silence_samples (int): The longest silence kept, 0 keeps all of it.
+        min_speech_samples (int): The least speech an utterance is transcribed with, 0 transcribes all.
+        speech_samples (int): The voiced samples of the current utterance.
+    """
+
+    def __init__(self, buffer: UtteranceBuffer, max_silence_samples: int, min_speech_samples: int) -> None:
+        self.buffer: UtteranceBuffer = buffer
+        self.max_silence_samples: int = max_silence_samples
+        self.min_speech_samples: int = min_speech_samples
+        self._head_samples: int = max_silence_samples - max_silence_samples // 2
+        # The end of the current silence, appended only if the speech goes on
+        self._tail = AudioRingBuffer(max_silence_samples // 2)
+        self.start()
+
+    def start(self, speech_samples: int = 0) -> None:
+        """
+        Reset the counts for a new utterance, whose recording starts in `buffer`.
+
+        Args:
+            speech_samples (int): The voiced samples already in the buffer, e.g. the frame which started the utterance.
+        """
+        self.speech_samples: int = speech_samples
+        self.squeezed_samples: int = 0
+        self._silence_samples: int = 0
+
+    def add_frame(self, frame: np.ndarray, voiced: bool) -> None:
+        """
+        Record one frame of the utterance.
+        """
+        if voiced:
+            self._end_silence()
+            self.speech_samples += len(frame)
+            self.buffer.append(frame)
+            return
+
+        if self.max_silence_samples == 0:
+            self.buffer.append(frame)
+            return
+        kept = max(0, min(len(frame), self._head_samples - self._silence_samples))
+        if kept:
+            self.buffer.append(frame[:kept])
+        self._tail.write(frame[kept:])
+        self._silence_samples += len(frame)
+
+    def finish(self) -> Optional[np.ndarray]:
+        """
+        Take the recorded utterance out of the buffer.
+
+        Returns:
+            Optional[np.ndarray]: The conditioned audio, or None if it has too little speech to be transcribed.
+        """
+        self._squeeze(self._silence_samples - self._head_samples)
+        self._silence_samples = 0
+        self._tail.clear()
+
+        audio = self.buffer.take()
+        if self.speech_samples < self.min_speech_samples:
+            metrics.asr_calls_saved.labels("short_speech").inc()
+            metrics.asr_audio_seconds_saved.labels("short_speech").inc(len(audio) / settings.STREAM_SAMPLE_RATE)
+            return None
+        return audio
+
+    def _end_silence(self) -> None:
+        skipped = self._silence_samples - self._head_samples
+        if skipped > 0:
+            # The ring buffer is padded with zeros until it was filled once
+            kept = min(skipped, self._tail.capacity)
+            if kept:
+                self.buffer.append(self._tail.to_array()[-kept:])
+            self._squeeze(skipped - kept)
+            self._tail.clear()
+        self._silence_samples = 0
+
+    def _squeeze(self, samples: int) -> None:
+        if samples > 0:
+            self.squeezed_samples += samples
+            metrics.asr_audio_seconds_saved.labels("silence").inc(samples / settings.STREAM_SAMPLE_RATE)
@@ -0,0 +1,118 @@
+# Path: ssi/utils/endpointing/adaptive_endpointer.py
+# Description: This module contains the AdaptiveEndpointer class, which ends an utterance as soon as the silence after it is unlikely to be a pause within it, judging from the voice probabilities and the speaker's own pauses and speech rate.
+
+import math
+from typing import Optional
+from ssi.utils.endpointing.endpointer_interface import EndpointerInterface
+from ssi.config import get_settings
+
+settings = get_settings()
+
+# The pauses within an utterance are assumed to last this long on average, until the session's own pauses were seen
+PRIOR_PAUSE_SECONDS = 0.3
+# Shorter gaps in the speech are VAD flicker, not pauses between words or phrases
+MIN_PAUSE_SECONDS = 0.1
+PAUSE_SMOOTHING = 0.2  # Weight of each new pause in the session's average pause
+RATE_SMOOTHING = 0.2  # Weight of each new utterance in the session's average speech rate
+PROB_SMOOTHING = 0.3  # Weight of each new frame in the smoothed voice probability
+
+class AdaptiveEndpointer(EndpointerInterface):
+    """
+    Ends an utterance as soon as the silence after it is unlikely to be a pause within it.
+
+    Once `min_hangover` seconds of silence follow the speech, the risk that
+    the silence is only a pause within the utterance is estimated after every
+    frame, as the chance that a pause of this speaker lasts longer than the
+    silence so far: exp(-silence / expected pause). The expected pause is the
+    session's average pause within utterances, scaled up
+
+    - when the current utterance is slower than the session's average speech
+      rate (in bursts of speech per second), since hesitant speech pauses
+      longer,
+    - and when the silence isn't clear: a smoothed voice probability just
+      below the threshold is rather a breath or a trailing soft word than
+      the end of the speech.
+
+    The utterance ends once that risk is at most `cut_risk`, and at the latest after
+    `max_hangover` seconds of silence. `cut_risk` trades latency for false
+    cuts: 0 always waits for `max_hangover`, like `FixedEndpointer`, and 1
+    always ends after `min_hangover`.
+
+    Attributes:
+        threshold (float): The voice probability at or above which a frame is speech.
+        min_hangover (float): The seconds of silence always waited for.
+        max_hangover (float): The seconds of silence which always end an utterance.
+        cut_risk (float): The risk of cutting an utterance at a pause accepted to end it sooner, between 0 and 1.
+        pause_seconds (float): The session's average pause within utterances.
+        speech_rate (Optional[float]): The session's average bursts of speech per second, None before its first utterance.
+    """
+
+    def __init__(
+        self,
+        threshold: float = settings.VAD_THRESHOLD,
+        min_hangover: float = settings.ENDPOINTING_MIN_HANGOVER_SECONDS,
+        max_hangover: float = settings.ENDPOINTING_MAX_HANGOVER_SECONDS,
+        cut_risk: float = settings.ENDPOINTING_CUT_RISK,
+    ) -> None:
+        self.threshold: float = threshold
+        self.min_hangover: float = min_hangover
+        self.max_hangover: float = max_hangover
+        self.cut_risk: float = cut_risk
+        self.pause_seconds: float = PRIOR_PAUSE_SECONDS
+        self.speech_rate: Optional[float] = None
+        self.start_utterance()
+
+    @property
+    def silence_seconds(self) -> float:
+        return self._silence_seconds
+
+    def start_utterance(self) -> None:
+        self._silence_seconds: float = 0.0
+        self._utterance_seconds: float = 0.0
+        self._bursts: int = 0
+        self._smoothed_prob: Optional[float] = None
+
+    def update(self, voice_prob: float, duration: float) -> bool:
+        self._utterance_seconds += duration
+        self._smoothed_prob = (
+            voice_prob if self._smoothed_prob is None
+            else PROB_SMOOTHING * voice_prob + (1 - PROB_SMOOTHING) * self._smoothed_prob
+        )
+
+        if voice_prob >= self.threshold:
+            if self._bursts == 0 or self._silence_seconds >= MIN_PAUSE_SECONDS:
+                if self._bursts > 0:
+                    # The speech went on, so the silence was a pause within the utterance
+                    self.pause_seconds += PAUSE_SMOOTHING * (self._silence_seconds - self.pause_seconds)
+                self._bursts += 1
+            self._silence_seconds = 0.0
+            return False
+
+        self._silence_seconds += duration
+        if self._silence_seconds < self.min_hangover:
+            return False
+        if self._silence_seconds >= self.max_hangover or self.cut_risk_now() <= self.cut_risk:
+            self._end_utterance()
+            return True
+        return False
+
+    def utterance_speech_rate(self) -> float:
+        """
+        Get the bursts of speech per second of the current utterance, not counting the silence after it.
+        """
+        return self._bursts / max(self._utterance_seconds - self._silence_seconds, MIN_PAUSE_SECONDS)
+
+    def cut_risk_now(self) -> float:
+        """
+        Get the estimated risk, between 0 and 1, that the silence so far is only a pause within the utterance.
+        """
+        expected_pause = self.pause_seconds
+        if self.speech_rate is not None:
+            expected_pause *= min(max(self.speech_rate / self.utterance_speech_rate(), 0.5), 2.0)
+        clarity = min(max(1 - self._smoothed_prob / self.threshold, 0.0), 1.0)
+        expected_pause /= max(clarity, 0.25)
+        return math.exp(-self._silence_seconds / expected_pause)
+
+    def _end_utterance(self) -> None:
+        rate = self.utterance_speech_rate()
+        self.speech_rate = rate if self.speech_rate is None else self.speech_rate + RATE_SMOOTHING * (rate - self.speech_rate)
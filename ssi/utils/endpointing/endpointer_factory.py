@@ -0,0 +1,38 @@
+# Path: ssi/utils/endpointing/endpointer_factory.py
+# Description: This module contains a factory class for creating instances of different endpointing strategies.
+
+from .endpointer_interface import EndpointerInterface
+from .fixed_endpointer import FixedEndpointer
+from .adaptive_endpointer import AdaptiveEndpointer
+
+class EndpointerFactory:
+    """
+    A factory class for creating instances of different endpointing strategies.
+
+    Methods:
+        create_endpointer: Creates and returns an instance of a specified endpointing strategy.
+    """
+
+    @staticmethod
+    def create_endpointer(type: str) -> EndpointerInterface:
+        """
+        Creates an endpointer for one client session.
+
+        Args:
+            type (str): The type of endpointing strategy to create. Currently supports 'fixed' and 'adaptive'.
+
+        Returns:
+            An instance of the specified endpointing strategy.
+
+        Raises:
+            ValueError: If the specified type is not recognized or supported.
+
+        Example:
+            endpointer = EndpointerFactory.create_endpointer("adaptive")
+        """
+        if type == "fixed":
+            return FixedEndpointer()
+        elif type == "adaptive":
+            return AdaptiveEndpointer()
+        else:
+            raise ValueError(f"Unknown endpointing strategy type: {type}")
@@ -0,0 +1,47 @@
+# Path: ssi/utils/endpointing/endpointer_interface.py
+# Description: This module contains the interface for the endpointers, which decide when the silence after speech ends an utterance. We'll implement the interface for the different endpointing strategies in the respective files.
+
+from abc import ABC, abstractmethod
+
+class EndpointerInterface(ABC):
+    """
+    An interface class for endpointing strategies.
+
+    An endpointer belongs to one client session. While an utterance is being
+    recorded, the buffering strategy feeds it the voice probability of every
+    frame, and it decides after which frame of silence the utterance is over.
+    The time waited in silence before that decision, the hangover, is the
+    latency every utterance pays before it is even sent to the ASR.
+
+    Methods:
+        start_utterance: Called when the recording of an utterance starts.
+        update: Feed one recorded frame, returns whether the utterance ended with it.
+    """
+
+    def start_utterance(self) -> None:
+        """
+        Reset the per-utterance state. Called with the first recorded frame of an utterance, before its `update`.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, voice_prob: float, duration: float) -> bool:
+        """
+        Feed one frame of the utterance being recorded.
+
+        Args:
+            voice_prob (float): The probability of voice activity in the frame.
+            duration (float): The length of the frame in seconds.
+
+        Returns:
+            bool: True if the utterance ends with this frame.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def silence_seconds(self) -> float:
+        """
+        The length of the silence at the end of the recording so far.
+        """
+        pass
@@ -0,0 +1,35 @@
+# Path: ssi/utils/endpointing/fixed_endpointer.py
+# Description: This module contains the FixedEndpointer class, which ends an utterance after a fixed length of silence.
+
+from ssi.utils.endpointing.endpointer_interface import EndpointerInterface
+from ssi.config import get_settings
+
+settings = get_settings()
+
+class FixedEndpointer(EndpointerInterface):
+    """
+    Ends an utterance once `hangover` seconds of silence were recorded after it.
+
+    Attributes:
+        threshold (float): The voice probability at or above which a frame is speech.
+        hangover (float): The seconds of silence which end an utterance.
+    """
+
+    def __init__(self, threshold: float = settings.VAD_THRESHOLD, hangover: float = settings.BUFFER_SECONDS_AFTER) -> None:
+        self.threshold: float = threshold
+        self.hangover: float = hangover
+        self._silence_seconds: float = 0.0
+
+    @property
+    def silence_seconds(self) -> float:
+        return self._silence_seconds
+
+    def start_utterance(self) -> None:
+        self._silence_seconds = 0.0
+
+    def update(self, voice_prob: float, duration: float) -> bool:
+        if voice_prob >= self.threshold:
+            self._silence_seconds = 0.0
+            return False
+        self._silence_seconds += duration
+        return self._silence_seconds >= self.hangover
@@ -0,0 +1,96 @@
+# Path: ssi/utils/inference/inference_executor.py
+# Description: This module contains the InferenceExecutor class, which runs blocking VAD and ASR model calls on a thread pool or a process pool so they never block the asyncio event loop.
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from ssi.config import get_settings
+from ssi.logger import get_logger
+
+# Pipelines created inside a process pool worker, keyed by their class
+_worker_pipelines: Dict[type, Any] = {}
+
+def _call_in_worker(pipeline_cls: type, method_name: str, args: tuple) -> Any:
+    """
+    Run `method_name` on this worker process' own instance of `pipeline_cls`.
+
+    Model objects cannot be sent to another process, so each worker creates its
+    own pipeline the first time it receives a call for that pipeline class.
+    """
+    pipeline = _worker_pipelines.get(pipeline_cls)
+    if pipeline is None:
+        pipeline = _worker_pipelines[pipeline_cls] = pipeline_cls()
+    return getattr(pipeline, method_name)(*args)
+
+class InferenceExecutor:
+    """
+    Runs blocking model calls outside of the asyncio event loop.
+
+    In "thread" mode, the call runs on the given pipeline instance in a worker
+    thread (PyTorch releases the GIL during inference, so the event loop keeps
+    serving other clients). In "process" mode, the call is sent to a worker
+    process which holds its own copy of the pipeline.
+
+    Attributes:
+        kind (str): Either "thread" or "process".
+        max_workers (int): The number of worker threads or processes.
+    """
+
+    def __init__(self, kind: str, max_workers: int, name: str = "inference") -> None:
+        self.logger = get_logger()
+        self.kind: str = kind
+        self.max_workers: int = max_workers
+        self.name: str = name
+
+        if kind == "thread":
+            self._executor: Executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"ssi-{name}")
+        elif kind == "process":
+            # "spawn" avoids forking a process which already has torch threads running
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            raise ValueError(f"Unknown inference executor type: {kind}")
+
+        self.logger.info(f"InferenceExecutor '{name}' initialized with {max_workers} {kind} worker(s)")
+
+    async def run(self, pipeline: Any, method_name: str, *args: Any) -> Any:
+        """
+        Run `pipeline.<method_name>(*args)` on the executor and wait for the result.
+
+        Args:
+            pipeline (Any): The VAD or ASR pipeline instance.
+            method_name (str): The name of the blocking method to call.
+            *args (Any): The arguments for the method. They must be picklable in "process" mode.
+
+        Returns:
+            Any: The return value of the method.
+        """
+        loop = asyncio.get_running_loop()
+        if self.kind == "thread":
+            return await loop.run_in_executor(self._executor, getattr(pipeline, method_name), *args)
+        return await loop.run_in_executor(self._executor, _call_in_worker, type(pipeline), method_name, args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+        self.logger.info(f"InferenceExecutor '{self.name}' shut down")
+
+@lru_cache
+def get_inference_executor(name: str) -> InferenceExecutor:
+    """
+    Get the shared executor for a group of models.
+
+    VAD and ASR use separate executors, so a long Whisper decode never delays the
+    VAD of other clients.
+
+    Args:
+        name (str): Either "vad" or "asr".
+    """
+    settings = get_settings()
+    workers: Optional[int] = {
+        "vad": settings.VAD_INFERENCE_WORKERS,
+        "asr": settings.ASR_INFERENCE_WORKERS,
+    }.get(name)
+    if workers is None:
+        raise ValueError(f"Unknown inference executor name: {name}")
+    return InferenceExecutor(settings.INFERENCE_EXECUTOR, workers, name)
@@ -0,0 +1,42 @@
+# Path: ssi/utils/metrics/process_memory.py
+# Description: This module contains `memory_usage`, which reads how much memory a process uses and how much of it is shared with other processes, e.g. model weights shared copy-on-write by forked workers.
+
+from typing import Dict, Union
+
+# The fields of /proc/<pid>/smaps_rollup we report, and their names in the result
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+def memory_usage(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Get the memory a process uses, in bytes.
+
+    The resident set size ("rss") counts pages shared with other processes in
+    full for every process, so it overstates what forked workers use together.
+    The proportional set size ("pss") divides each shared page between the
+    processes sharing it, so the "pss" of all workers adds up to the memory
+    they really use. "private_*" is the memory only this process uses.
+
+    Args:
+        pid (Union[int, str]): The process ID, or "self" for this process.
+
+    Returns:
+        Dict[str, int]: The fields of `SMAPS_FIELDS`. Empty on systems without
+        /proc/<pid>/smaps_rollup (non-Linux, or kernels before 4.14).
+    """
+    usage: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                field, _, value = line.partition(":")
+                if field in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[field]] = int(value.split()[0]) * 1024
+    except (FileNotFoundError, PermissionError, ProcessLookupError):
+        return {}
+    return usage
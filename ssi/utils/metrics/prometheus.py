@@ -0,0 +1,180 @@
+# Path: ssi/utils/metrics/prometheus.py
+# Description: This module contains minimal Counter, Gauge and Histogram metrics and a MetricsRegistry which renders them in the Prometheus text exposition format, without depending on the prometheus_client package.
+
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class _Metric:
+    """
+    The common part of all metric types: a name, a help text and one child per combination of label values.
+
+    Metrics are updated and rendered from the event loop thread, so they don't use locks.
+    """
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str) -> "_Metric":
+        """
+        Get the child metric for the given label values, creating it on first use.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {values}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _samples(self, labelnames: Tuple[str, ...], label_values: Tuple[str, ...]) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        if self.labelnames:
+            for label_values, child in self._children.items():
+                lines.extend(child._samples(self.labelnames, label_values))
+        else:
+            lines.extend(self._samples((), ()))
+        return lines
+
+class Counter(_Metric):
+    """A value which only goes up, e.g. the number of transcriptions sent. By convention its name ends in `_total`."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.value: float = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        self.value += amount
+
+    def _samples(self, labelnames: Tuple[str, ...], label_values: Tuple[str, ...]) -> Iterable[str]:
+        yield f"{self.name}{_format_labels(labelnames, label_values)} {_format_value(self.value)}"
+
+class Gauge(_Metric):
+    """
+    A value which can go up and down, e.g. the number of active sessions.
+
+    Instead of being set, a gauge can be given a function which is called when
+    the metrics are rendered, for values which are cheaper to read than to track.
+    """
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.value: float = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def get(self) -> float:
+        return float(self._function()) if self._function is not None else self.value
+
+    def _samples(self, labelnames: Tuple[str, ...], label_values: Tuple[str, ...]) -> Iterable[str]:
+        yield f"{self.name}{_format_labels(labelnames, label_values)} {_format_value(self.get())}"
+
+class Histogram(_Metric):
+    """A distribution of observed values, e.g. durations, counted in cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        self.bucket_counts: List[int] = [0] * len(self.buckets)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets[:-1])
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def _samples(self, labelnames: Tuple[str, ...], label_values: Tuple[str, ...]) -> Iterable[str]:
+        cumulative = 0
+        for upper_bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            labels = _format_labels(labelnames, label_values, ("le", _format_value(upper_bound)))
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        yield f"{self.name}_sum{_format_labels(labelnames, label_values)} {_format_value(self.sum)}"
+        yield f"{self.name}_count{_format_labels(labelnames, label_values)} {self.count}"
+
+class MetricsRegistry:
+    """A collection of metrics which are rendered together."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
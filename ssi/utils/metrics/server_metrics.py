@@ -0,0 +1,152 @@
+# Path: ssi/utils/metrics/server_metrics.py
+# Description: This module contains the ServerMetrics class, which defines the per-stage latency, throughput and queue metrics of the streaming server, and `get_server_metrics` to access the shared instance.
+
+from functools import lru_cache
+from ssi.utils.metrics.prometheus import Counter, Gauge, Histogram, MetricsRegistry
+from ssi.utils.metrics.process_memory import memory_usage
+
+# VAD runs per 32 ms frame, so it needs finer buckets than the ASR stages
+VAD_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+class ServerMetrics:
+    """
+    The metrics of the streaming transcription server.
+
+    Durations are in seconds. The stages follow an utterance through the server:
+    VAD on each frame, the wait in the ASR scheduler queue, the ASR stages of the
+    batch it was transcribed in, and finally the ASR callback. Gauges for the
+    active sessions and the queue depths are read when the metrics are rendered.
+
+    Attributes:
+        registry (MetricsRegistry): Renders all metrics for the `/metrics` route.
+    """
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        register = self.registry.register
+
+        self.vad_frame_seconds: Histogram = register(Histogram(
+            "ssi_vad_frame_seconds", "Time to get the voice probability of one audio frame.", buckets=VAD_BUCKETS,
+        ))
+        self.vad_frames: Counter = register(Counter(
+            "ssi_vad_frames_total",
+            "Frames decided by the cascaded VAD, by its cheap gate alone or by the neural VAD behind it.",
+            ["decision"],
+        ))
+        self.asr_queue_wait_seconds: Histogram = register(Histogram(
+            "ssi_asr_queue_wait_seconds", "Time an utterance waited in the ASR scheduler queue.",
+        ))
+        self.asr_batch_seconds: Histogram = register(Histogram(
+            "ssi_asr_batch_seconds", "Time to transcribe one batch, per ASR stage.", ["stage"],
+        ))
+        self.asr_batch_size: Histogram = register(Histogram(
+            "ssi_asr_batch_size", "Number of utterances per ASR batch.", buckets=BATCH_SIZE_BUCKETS,
+        ))
+        self.asr_audio_seconds: Counter = register(Counter(
+            "ssi_asr_audio_seconds_total", "Seconds of audio transcribed.",
+        ))
+        self.callback_seconds: Histogram = register(Histogram(
+            "ssi_callback_seconds", "Time spent running the user callbacks.", ["callback"],
+        ))
+        self.callback_queue_wait_seconds: Histogram = register(Histogram(
+            "ssi_callback_queue_wait_seconds", "Time a callback call waited for a dispatcher worker.", ["callback"],
+        ))
+        self.callback_failures: Counter = register(Counter(
+            "ssi_callback_failures_total", "Callback calls which raised an exception.", ["callback"],
+        ))
+        self.callback_dropped: Counter = register(Counter(
+            "ssi_callback_dropped_total", "Callback calls dropped because the dispatch queue was full.", ["callback"],
+        ))
+        self.callback_queue_depth: Gauge = register(Gauge(
+            "ssi_callback_queue_depth", "Callback calls waiting for delivery.",
+        ))
+        self.asr_calls_saved: Counter = register(Counter(
+            "ssi_asr_calls_saved_total", "Utterances not transcribed by the pre-ASR conditioning.", ["reason"],
+        ))
+        self.asr_audio_seconds_saved: Counter = register(Counter(
+            "ssi_asr_audio_seconds_saved_total",
+            "Seconds of audio not sent to the ASR: squeezed silences, and utterances with too little speech.",
+            ["reason"],
+        ))
+        self.endpoint_hangover_seconds: Histogram = register(Histogram(
+            "ssi_endpoint_hangover_seconds", "Silence waited after the speech before ending an utterance.",
+        ))
+        self.server_process_seconds: Histogram = register(Histogram(
+            "ssi_server_process_seconds", "Time from the end of an utterance to its transcription being delivered.",
+        ))
+        self.transcriptions: Counter = register(Counter(
+            "ssi_transcriptions_total", "Transcriptions delivered to the ASR callback.", ["kind"],
+        ))
+        self.results_sent: Counter = register(Counter(
+            "ssi_results_sent_total", "Transcriptions sent back to the WebSocket clients, after joining partials.", ["kind"],
+        ))
+        self.results_coalesced: Counter = register(Counter(
+            "ssi_results_coalesced_total", "Partial transcriptions joined into the next message or replaced by the final one.",
+        ))
+        self.results_dropped: Counter = register(Counter(
+            "ssi_results_dropped_total", "Transcriptions not sent because the client's send queue was full.",
+        ))
+        self.active_sessions: Gauge = register(Gauge(
+            "ssi_active_sessions", "Connected streaming clients.",
+        ))
+        self.audio_queue_depth: Gauge = register(Gauge(
+            "ssi_audio_queue_depth", "Audio messages received but not processed yet, over all clients.",
+        ))
+        self.audio_buffered_seconds: Gauge = register(Gauge(
+            "ssi_audio_buffered_seconds", "Seconds of audio received but not processed yet, over all clients.",
+        ))
+        self.audio_queue_overloads: Counter = register(Counter(
+            "ssi_audio_queue_overloads_total",
+            "Audio messages which exceeded a buffered audio cap, and the actions the overload policy took.",
+            ["policy", "action"],
+        ))
+        self.audio_queue_dropped_seconds: Counter = register(Counter(
+            "ssi_audio_queue_dropped_seconds_total", "Seconds of silence dropped by the overload policies.", ["action"],
+        ))
+        self.speaking_sessions: Gauge = register(Gauge(
+            "ssi_speaking_sessions", "Connected clients which are currently speaking.",
+        ))
+        self.admission_capacity: Gauge = register(Gauge(
+            "ssi_admission_capacity", "Estimated number of sessions the server can serve, 0 while it is unknown.",
+        ))
+        self.admission_queue_depth: Gauge = register(Gauge(
+            "ssi_admission_queue_depth", "Connections waiting for admission.",
+        ))
+        self.admissions: Counter = register(Counter(
+            "ssi_admissions_total", "Admission decisions for new connections.", ["outcome"],
+        ))
+        self.idle_connections_reaped: Counter = register(Counter(
+            "ssi_idle_connections_reaped_total", "Connections closed because they sent no audio for too long.",
+        ))
+        self.multistream_connections: Gauge = register(Gauge(
+            "ssi_multistream_connections", "Connected multi-stream WebSockets, each carrying any number of sessions.",
+        ))
+        self.multistream_stream_events: Counter = register(Counter(
+            "ssi_multistream_stream_events_total",
+            "Sessions of multi-stream connections which were opened, resumed on a new connection, or expired before being resumed.",
+            ["event"],
+        ))
+        self.asr_queue_depth: Gauge = register(Gauge(
+            "ssi_asr_queue_depth", "Utterances waiting in the ASR scheduler queue.",
+        ))
+        self.process_resident_bytes: Gauge = register(Gauge(
+            "ssi_process_resident_bytes", "Resident memory of this server process, counting shared pages in full.",
+        ))
+        self.process_proportional_bytes: Gauge = register(Gauge(
+            "ssi_process_proportional_bytes",
+            "Proportional memory of this server process: pages shared with other processes, e.g. forked workers, are divided between them.",
+        ))
+
+        self.process_resident_bytes.set_function(lambda: memory_usage().get("rss", 0))
+        self.process_proportional_bytes.set_function(lambda: memory_usage().get("pss", 0))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+@lru_cache
+def get_server_metrics() -> ServerMetrics:
+    """
+    Get the metrics shared by all components of the server.
+    """
+    return ServerMetrics()
@@ -0,0 +1,214 @@
+# Path: ssi/utils/model_server/model_server.py
+# Description: This module contains the ModelServer class, a process which owns the ASR model and transcribes the utterances of every frontend worker in shared batches. Frontends hand it audio through shared memory and send only small control messages. Run it with `python -m ssi.utils.model_server.model_server`.
+
+import multiprocessing
+import os
+import queue
+import socket
+import stat
+import threading
+import time
+from multiprocessing.connection import Connection, Listener
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.asr.asr_factory import ASRFactory
+from ssi.utils.model_server.protocol import TRANSCRIBE, parse_address
+from ssi.utils.model_server.shared_audio import AudioRef, SharedAudioReader
+
+settings = get_settings()
+logger = get_logger()
+
+class _Request:
+    __slots__ = ("connection", "request_id", "audios")
+
+    def __init__(self, connection: Connection, request_id: int, audios: List[np.ndarray]) -> None:
+        self.connection: Connection = connection
+        self.request_id: int = request_id
+        self.audios: List[np.ndarray] = audios
+
+class ModelServer:
+    """
+    An inference server process which owns the ASR model.
+
+    Without it, every uvicorn worker loads its own copy of the model. With
+    `ASR_MODEL=remote`, the workers send their utterances here instead, so the
+    model is loaded once however many workers there are, and the utterances of
+    all workers are transcribed in the same batches.
+
+    Each frontend connects over `MODEL_SERVER_ADDRESS`, writes the int16 audio
+    of a request into shared memory and sends `("transcribe", request_id,
+    [(segment name, samples), ...])`. The server reads the audio in place and
+    replies `(request_id, transcriptions, stage timings, error)`. Requests from
+    all connections are collected for up to `ASR_BATCH_MAX_WAIT_MS`, or until
+    `ASR_BATCH_MAX_SIZE` utterances, and transcribed in one batch.
+
+    The VAD stays in the frontends: it runs on every 32 ms frame, which is too
+    chatty for a round trip, and the Silero model is small.
+
+    The messages are pickled, so whoever can connect can run code in the
+    server. The Unix socket is only accessible to the user running the server,
+    and a TCP listener requires `MODEL_SERVER_AUTHKEY`.
+
+    Attributes:
+        address (Union[str, Tuple[str, int]]): The Unix socket path or TCP address to listen on.
+        asr_model (str): The ASR model to load.
+    """
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        authkey: Optional[str] = None,
+        asr_model: Optional[str] = None,
+    ) -> None:
+        self.address: Union[str, Tuple[str, int]] = parse_address(address or settings.MODEL_SERVER_ADDRESS)
+        self.authkey: Optional[bytes] = (authkey or settings.MODEL_SERVER_AUTHKEY).encode() or None
+        if not isinstance(self.address, str) and self.authkey is None:
+            raise ValueError(
+                f"The model server doesn't listen on TCP ({self.address[0]}:{self.address[1]}) without MODEL_SERVER_AUTHKEY: "
+                "it unpickles what it receives, so anyone who can connect could run code in it"
+            )
+        self.asr_model: str = asr_model or settings.MODEL_SERVER_ASR_MODEL
+        self.max_batch_size: int = settings.ASR_BATCH_MAX_SIZE
+        self.max_wait_seconds: float = settings.ASR_BATCH_MAX_WAIT_MS / 1000
+        self.asr_pipeline = None
+        self._requests: "queue.Queue[_Request]" = queue.Queue()
+        # Replies are sent from the batch loop and the connection threads
+        self._send_lock = threading.Lock()
+
+    def serve_forever(self) -> None:
+        """
+        Load the model, then serve frontend connections until the process is stopped.
+        """
+        started_at = time.perf_counter()
+        self.asr_pipeline = ASRFactory.create_asr_pipeline(self.asr_model)
+        if settings.MODELS_WARMUP:
+            self.asr_pipeline.warmup()
+        logger.info(f"ModelServer loaded '{self.asr_model}' in {time.perf_counter() - started_at:.2f}s")
+
+        threading.Thread(target=self._batch_loop, name="ssi-model-server-batch", daemon=True).start()
+
+        self._remove_stale_socket()
+        # The socket file is created accessible to this user only
+        umask = os.umask(0o177) if isinstance(self.address, str) else None
+        try:
+            listener = Listener(self.address, authkey=self.authkey)
+        finally:
+            if umask is not None:
+                os.umask(umask)
+        with listener:
+            logger.info(f"ModelServer listening on {self.address}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                    logger.warning(f"ModelServer refused a connection: {e}")
+                    continue
+                threading.Thread(
+                    target=self._serve_connection, args=(connection,), name="ssi-model-server-conn", daemon=True
+                ).start()
+
+    def _remove_stale_socket(self) -> None:
+        # A socket file left behind by a previous server would make the listener fail
+        if isinstance(self.address, str) and os.path.exists(self.address) and stat.S_ISSOCK(os.stat(self.address).st_mode):
+            probe = socket.socket(socket.AF_UNIX)
+            try:
+                probe.connect(self.address)
+            except OSError:
+                os.unlink(self.address)
+            else:
+                raise RuntimeError(f"Another model server is already listening on {self.address}")
+            finally:
+                probe.close()
+
+    def _serve_connection(self, connection: Connection) -> None:
+        """
+        Read the requests of one frontend and queue them for the batch loop.
+        """
+        reader = SharedAudioReader()
+        logger.info("ModelServer accepted a frontend connection")
+        try:
+            while True:
+                op, request_id, refs = connection.recv()
+                if op != TRANSCRIBE:
+                    self._send(connection, (request_id, None, None, f"Unknown operation: {op}"))
+                    continue
+                refs: List[AudioRef]
+                self._requests.put(_Request(connection, request_id, [reader.read(ref) for ref in refs]))
+        except (EOFError, OSError):
+            logger.info("ModelServer frontend connection closed")
+        finally:
+            reader.close()
+            connection.close()
+
+    def _batch_loop(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0].audios)
+            deadline = time.perf_counter() + self.max_wait_seconds
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.audios)
+            self._transcribe(batch)
+
+    def _transcribe(self, batch: List[_Request]) -> None:
+        audios = [audio for request in batch for audio in request.audios]
+        try:
+            transcriptions, stage_timings = self.asr_pipeline.transcribe_batch_timed(audios)
+        except Exception as e:
+            logger.error(f"ModelServer failed to transcribe a batch of {len(audios)}: {e}")
+            for request in batch:
+                self._reply(request, None, None, str(e))
+            return
+
+        logger.debug(f"ModelServer transcribed {len(audios)} utterance(s) from {len(batch)} request(s)")
+        offset = 0
+        for request in batch:
+            count = len(request.audios)
+            self._reply(request, transcriptions[offset:offset + count], stage_timings, None)
+            offset += count
+
+    def _reply(self, request: _Request, transcriptions, stage_timings, error: Optional[str]) -> None:
+        # The views of the frontend's segments must be gone before it reuses them
+        request.audios = []
+        self._send(request.connection, (request.request_id, transcriptions, stage_timings, error))
+
+    def _send(self, connection: Connection, reply: tuple) -> None:
+        try:
+            with self._send_lock:
+                connection.send(reply)
+        except (OSError, ValueError):
+            # The frontend disconnected while its request was transcribed
+            pass
+
+def _run_model_server(address: Optional[str], authkey: Optional[str], asr_model: Optional[str]) -> None:
+    ModelServer(address, authkey, asr_model).serve_forever()
+
+def start_model_server(
+    address: Optional[str] = None,
+    authkey: Optional[str] = None,
+    asr_model: Optional[str] = None,
+) -> multiprocessing.Process:
+    """
+    Start a model server in a new process, e.g. before starting the uvicorn workers.
+
+    Returns:
+        multiprocessing.Process: The model server process. It is a daemon, so it stops with its parent.
+    """
+    # "spawn" avoids forking a process which may already have torch threads running
+    process = multiprocessing.get_context("spawn").Process(
+        target=_run_model_server, args=(address, authkey, asr_model), name="ssi-model-server", daemon=True
+    )
+    process.start()
+    return process
+
+if __name__ == "__main__":
+    ModelServer().serve_forever()
@@ -0,0 +1,18 @@
+# Path: ssi/utils/model_server/protocol.py
+# Description: This module contains the parts of the model server protocol shared by the model server and its frontends.
+
+from typing import Union, Tuple
+
+# The messages on the control connection, pickled by `multiprocessing.connection`:
+#   frontend -> server: ("transcribe", request_id, [(segment name, samples), ...])
+#   server -> frontend: (request_id, transcriptions, stage timings, error)
+TRANSCRIBE = "transcribe"
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    Parse `MODEL_SERVER_ADDRESS`: "host:port" is a TCP address, anything else a Unix socket path.
+    """
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return address
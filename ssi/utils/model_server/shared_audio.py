@@ -0,0 +1,106 @@
+# Path: ssi/utils/model_server/shared_audio.py
+# Description: This module contains the SharedAudioPool class, which hands int16 audio to the model server through reusable shared memory segments, and the SharedAudioReader class, which reads those segments in the model server without copying them.
+
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+import numpy as np
+
+MIN_SEGMENT_SAMPLES = 16000  # The smallest segment holds a second of 16 kHz audio
+
+# A reference to audio in shared memory, as sent over the control channel: (segment name, number of samples)
+AudioRef = Tuple[str, int]
+
+class SharedAudioPool:
+    """
+    Shared memory segments for the audio a frontend sends to the model server.
+
+    Creating a segment costs a few system calls, so segments are reused: their
+    sizes are powers of two samples, and a released segment goes back to a free
+    list for its size. A segment is owned by one request until it is released,
+    which happens once the model server replied, so the server can read the
+    audio in place while the frontend keeps writing new requests.
+
+    Only the pool which created the segments unlinks them, in `close`.
+    """
+
+    def __init__(self) -> None:
+        self._free: Dict[int, List[SharedMemory]] = {}
+        self._segments: List[SharedMemory] = []
+        self._lock = threading.Lock()
+
+    def write(self, audio: np.ndarray) -> Tuple[SharedMemory, AudioRef]:
+        """
+        Copy int16 audio into a free segment.
+
+        Returns:
+            Tuple[SharedMemory, AudioRef]: The segment, to `release` after the
+            reply, and the reference to send to the model server.
+        """
+        audio = np.asarray(audio, dtype=np.int16).reshape(-1)
+        capacity = max(MIN_SEGMENT_SAMPLES, 1 << max(0, len(audio) - 1).bit_length())
+        with self._lock:
+            free = self._free.setdefault(capacity, [])
+            if free:
+                segment = free.pop()
+            else:
+                segment = SharedMemory(create=True, size=capacity * 2)
+                self._segments.append(segment)
+        np.ndarray((len(audio),), dtype=np.int16, buffer=segment.buf)[:] = audio
+        return segment, (segment.name, len(audio))
+
+    def release(self, segment: SharedMemory) -> None:
+        with self._lock:
+            # Segments released after `close` are already unlinked
+            if segment in self._segments:
+                self._free.setdefault(segment.size // 2, []).append(segment)
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+                try:
+                    segment.unlink()
+                except FileNotFoundError:
+                    pass
+            self._segments.clear()
+            self._free.clear()
+
+class SharedAudioReader:
+    """
+    Opens the segments of one frontend connection in the model server.
+
+    Segments stay open until the connection closes, since the frontend reuses
+    them for later requests.
+    """
+
+    def __init__(self) -> None:
+        self._segments: Dict[str, SharedMemory] = {}
+
+    def read(self, ref: AudioRef) -> np.ndarray:
+        """
+        Get a view of the audio in a segment, without copying it.
+
+        The view is only valid until the frontend got the reply for the request.
+        """
+        name, samples = ref
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = self._segments[name] = SharedMemory(name=name)
+            # Attaching registers the segment with this process' resource tracker, which
+            # would unlink it when the model server exits; the frontend owns the segment.
+            try:
+                resource_tracker.unregister(segment._name, "shared_memory")
+            except Exception:
+                pass
+        return np.ndarray((samples,), dtype=np.int16, buffer=segment.buf)
+
+    def close(self) -> None:
+        for segment in self._segments.values():
+            try:
+                segment.close()
+            except BufferError:
+                # A view of the segment is still referenced; it is closed when it is collected
+                pass
+        self._segments.clear()
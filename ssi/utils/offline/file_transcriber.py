@@ -0,0 +1,175 @@
+# Path: ssi/utils/offline/file_transcriber.py
+# Description: This module contains the FileTranscriber class, which transcribes whole recordings offline: VAD over the whole recording in large blocks, utterance segments cut from the voice probabilities, and the segments transcribed in length-bucketed batches on the ASR inference workers.
+
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+import numpy as np
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.inference.inference_executor import get_inference_executor
+from ssi.utils.vad.vad_interface import VADInterface
+from ssi.utils.whisper_language_codes import WHISPER_LANGUAGE_CODES
+from ssi.types.transcribed_segment import TranscribedSegment
+
+settings = get_settings()
+logger = get_logger()
+
+def find_speech_segments(
+    probs: np.ndarray,
+    frame_samples: int,
+    total_samples: int,
+    threshold: float,
+    min_silence_seconds: float,
+    min_speech_seconds: float,
+    pad_seconds: float,
+    max_segment_seconds: float,
+) -> List[Tuple[int, int]]:
+    """
+    Cut a recording into utterances from the voice probabilities of its frames.
+
+    Runs of voiced frames less than `min_silence_seconds` apart are joined,
+    utterances shorter than `min_speech_seconds` are dropped, and the rest are
+    padded by `pad_seconds` on both sides. Utterances longer than
+    `max_segment_seconds` are split into equal parts.
+
+    Returns:
+        List[Tuple[int, int]]: The start and end sample of each segment, in order.
+    """
+    rate = settings.STREAM_SAMPLE_RATE
+    voiced = np.concatenate([[0], (probs >= threshold).astype(np.int8), [0]])
+    edges = np.diff(voiced)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)  # Frame indices, ends exclusive
+    if len(starts) == 0:
+        return []
+
+    # Join the runs separated by short pauses
+    min_silence_frames = min_silence_seconds * rate / frame_samples
+    splits = np.flatnonzero(starts[1:] - ends[:-1] >= min_silence_frames)
+    starts = np.concatenate([starts[:1], starts[splits + 1]])
+    ends = np.concatenate([ends[splits], ends[-1:]])
+
+    keep = (ends - starts) * frame_samples >= min_speech_seconds * rate
+    pad = int(pad_seconds * rate)
+    starts = np.maximum(starts[keep] * frame_samples - pad, 0)
+    ends = np.minimum(ends[keep] * frame_samples + pad, total_samples)
+
+    max_samples = int(max_segment_seconds * rate)
+    segments: List[Tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        parts = -(-(end - start) // max_samples)
+        bounds = np.linspace(start, end, parts + 1).astype(int)
+        segments.extend(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    return segments
+
+class FileTranscriber:
+    """
+    Transcribes whole recordings offline, much faster than real-time.
+
+    The voice probabilities of the whole recording are computed in one call
+    (see `VADInterface.speech_probabilities`, which the Silero strategies run
+    on `block_seconds` long blocks side by side), and the utterances are cut
+    from them. The segments are sorted by length and transcribed in batches of
+    similar length, so little of each batch is padding, with up to `workers`
+    batches running at once on the ASR inference executor. The segments are
+    yielded as soon as their batch is done.
+
+    Attributes:
+        vad_pipeline (VADInterface): The loaded VAD pipeline.
+        asr_pipeline (ASRInterface): The loaded ASR pipeline.
+        batch_size (int): The most segments per ASR call.
+        workers (int): The most ASR calls running at once.
+    """
+
+    def __init__(
+        self,
+        vad_pipeline: VADInterface,
+        asr_pipeline: ASRInterface,
+        batch_size: int = settings.ASR_BATCH_MAX_SIZE,
+        workers: int = settings.ASR_INFERENCE_WORKERS,
+        block_seconds: float = 30.0,
+        min_silence_seconds: float = 0.5,
+        min_speech_seconds: float = 0.25,
+        pad_seconds: float = 0.2,
+        max_segment_seconds: float = 30.0,
+    ) -> None:
+        self.vad_pipeline: VADInterface = vad_pipeline
+        self.asr_pipeline: ASRInterface = asr_pipeline
+        self.batch_size: int = batch_size
+        self.workers: int = workers
+        self.block_seconds: float = block_seconds
+        self.min_silence_seconds: float = min_silence_seconds
+        self.min_speech_seconds: float = min_speech_seconds
+        self.pad_seconds: float = pad_seconds
+        self.max_segment_seconds: float = max_segment_seconds
+
+    async def segment(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Cut a recording into utterance segments, given as start and end samples.
+        """
+        probs = await get_inference_executor("vad").run(
+            self.vad_pipeline, "speech_probabilities", audio, self.block_seconds
+        )
+        return find_speech_segments(
+            probs,
+            self.vad_pipeline.FRAME_SAMPLES,
+            len(audio),
+            settings.VAD_THRESHOLD,
+            self.min_silence_seconds,
+            self.min_speech_seconds,
+            self.pad_seconds,
+            self.max_segment_seconds,
+        )
+
+    async def transcribe(self, audio: np.ndarray, source: Optional[str] = None) -> AsyncIterator[TranscribedSegment]:
+        """
+        Transcribe a recording, yielding its segments in the order they finish.
+
+        Args:
+            audio (np.ndarray): The int16 mono recording at `STREAM_SAMPLE_RATE`, e.g. from `load_wav`.
+            source (Optional[str]): The name of the recording, copied to the segments.
+        """
+        rate = settings.STREAM_SAMPLE_RATE
+        language = WHISPER_LANGUAGE_CODES[settings.ASR_TARGET_LANG]
+        started_at = time.perf_counter()
+        segments = await self.segment(audio)
+        logger.info(
+            f"Found {len(segments)} segments in {len(audio) / rate:.1f}s of {source or 'audio'} "
+            f"in {time.perf_counter() - started_at:.2f}s"
+        )
+
+        # Buckets of similar length: the model pads every segment of a batch to the longest one
+        order = sorted(range(len(segments)), key=lambda index: segments[index][1] - segments[index][0])
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def transcribe_batch(batch: List[int]) -> Tuple[List[int], List[str]]:
+            async with semaphore:
+                # Only now read from the (memory-mapped) recording, so the waiting batches hold no audio
+                audios = [np.array(audio[segments[index][0]:segments[index][1]]) for index in batch]
+                return batch, await self.asr_pipeline.transcribe_batch_async(audios)
+
+        tasks = [asyncio.create_task(transcribe_batch(batch)) for batch in batches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                batch, transcriptions = await next_done
+                for index, transcription in zip(batch, transcriptions):
+                    start, end = segments[index]
+                    yield TranscribedSegment(
+                        source=source,
+                        segment=index,
+                        start=round(start / rate, 3),
+                        end=round(end / rate, 3),
+                        language=language,
+                        transcription=transcription.strip(),
+                    )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.perf_counter() - started_at
+        logger.info(
+            f"Transcribed {len(audio) / rate:.1f}s of {source or 'audio'} in {elapsed:.2f}s "
+            f"({len(audio) / rate / max(elapsed, 1e-9):.1f}x real-time)"
+        )
@@ -0,0 +1,85 @@
+# Path: ssi/utils/offline/wav_reader.py
+# Description: This module reads WAV recordings for the offline transcription. 16-bit PCM data is memory-mapped instead of read, so a recording of any length costs no memory until its pages are touched.
+
+import struct
+from typing import Tuple
+import numpy as np
+import torch
+from ssi.config import get_settings
+
+settings = get_settings()
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def map_wav(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Memory-map the samples of a 16-bit PCM WAV file.
+
+    Args:
+        path (str): The WAV file.
+
+    Returns:
+        Tuple[np.ndarray, int]: The read-only int16 samples, shaped (frames, channels), and the sample rate.
+
+    Raises:
+        ValueError: If the file isn't a 16-bit PCM WAV file.
+    """
+    with open(path, "rb") as file:
+        header = file.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+
+        file_size = file.seek(0, 2)
+        file.seek(12)
+        fmt = None
+        while True:
+            header = file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                data = file.read(16)
+                if chunk_size < 16 or len(data) < 16:
+                    raise ValueError(f"{path} has a truncated fmt chunk")
+                fmt = struct.unpack("<HHIIHH", data)
+                file.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b"data":
+                data_offset = file.tell()
+                # Streaming writers leave the size at 0 or 0xFFFFFFFF, the data then runs to the end of the file
+                data_size = file_size - data_offset if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, file_size - data_offset)
+                break
+            else:
+                file.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None:
+        raise ValueError(f"{path} has no fmt chunk before its data")
+    format_tag, channels, sample_rate, _, _, bits_per_sample = fmt
+    if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE) or bits_per_sample != 16:
+        raise ValueError(f"{path} must be 16-bit PCM, not format {format_tag:#x} with {bits_per_sample} bits")
+    if channels == 0 or sample_rate == 0:
+        raise ValueError(f"{path} has {channels} channels at {sample_rate} Hz")
+
+    frames = data_size // (2 * channels)
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.int16), sample_rate
+    samples = np.memmap(path, dtype="<i2", mode="r", offset=data_offset, shape=(frames, channels))
+    return samples, sample_rate
+
+def load_wav(path: str) -> np.ndarray:
+    """
+    Get a WAV recording as int16 mono audio at `STREAM_SAMPLE_RATE`.
+
+    Mono recordings at that rate are returned memory-mapped. Other recordings
+    are mixed down and resampled, which loads them into memory.
+    """
+    samples, sample_rate = map_wav(path)
+    if samples.shape[1] == 1 and sample_rate == settings.STREAM_SAMPLE_RATE:
+        return samples[:, 0]
+
+    audio = torch.from_numpy(np.asarray(samples, dtype=np.float32).mean(axis=1))
+    if sample_rate != settings.STREAM_SAMPLE_RATE:
+        # Imported here, only recordings at another rate need it
+        import torchaudio
+        audio = torchaudio.functional.resample(audio, sample_rate, settings.STREAM_SAMPLE_RATE)
+    return audio.round().clamp(-32768, 32767).numpy().astype(np.int16)
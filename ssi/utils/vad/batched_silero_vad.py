@@ -0,0 +1,152 @@
+# Path: ssi/utils/vad/batched_silero_vad.py
+# Description: This module contains the BatchedSileroVAD class, which keeps a separate Silero recurrent state per client session and runs the frames pending across all sessions through one batched forward pass.
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
+import numpy as np
+import torch
+from .silero_vad import SileroVAD
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.inference.inference_executor import get_inference_executor
+
+settings = get_settings()
+logger = get_logger()
+
+class _VADSession:
+    """The recurrent state, audio context and pending frames of one client session."""
+
+    __slots__ = ("state", "context", "pending")
+
+    def __init__(self) -> None:
+        self.state: torch.Tensor = torch.zeros(2, 1, BatchedSileroVAD.STATE_SIZE)
+        self.context: torch.Tensor = torch.zeros(1, BatchedSileroVAD.CONTEXT_SAMPLES)
+        self.pending: Deque[Tuple[np.ndarray, asyncio.Future]] = deque()
+
+class BatchedSileroVAD(SileroVAD):
+    """
+    A Silero VAD engine shared by all sessions, with per-session state.
+
+    The Silero model is recurrent: each frame's prediction depends on the state
+    left behind by the previous frame of the same stream. `SileroVAD` keeps that
+    state inside the model, so all clients sharing it mix their states. This
+    class keeps the state and the audio context of every session separately.
+
+    Frames submitted with `detect_voice_activity_async` are queued per session,
+    which must have been opened with `open_session` and not closed yet.
+    On each tick, the oldest pending frame of every session is stacked into one
+    batch, together with the sessions' states, and run through a single forward
+    pass of the model. The updated states are then split back to the sessions.
+
+    Attributes:
+        max_batch_size (int): The maximum number of sessions in one forward pass.
+        tick_seconds (float): How long to wait for more frames before running a batch.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.max_batch_size: int = settings.VAD_BATCH_MAX_SIZE
+        self.tick_seconds: float = settings.VAD_BATCH_TICK_MS / 1000
+        self._sessions: Dict[str, _VADSession] = {}
+        self._ready: Dict[str, None] = {}  # Insertion ordered set of sessions with pending frames
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tick_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.batches_processed: int = 0
+        self.frames_processed: int = 0
+
+    def open_session(self, session_id: str) -> None:
+        self._sessions[session_id] = _VADSession()
+
+    def close_session(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        self._ready.pop(session_id, None)
+        if session is not None:
+            for _, future in session.pending:
+                future.cancel()
+
+    async def detect_voice_activity_async(
+        self,
+        audio_data: Union[bytes, np.int16],
+        session_id: Optional[str] = None,
+    ) -> int:
+        if session_id is None:
+            return await super().detect_voice_activity_async(audio_data)
+
+        if isinstance(audio_data, bytes):
+            audio_data = np.frombuffer(audio_data, dtype=np.int16)
+        if len(audio_data) != self.FRAME_SAMPLES:
+            raise ValueError(
+                f"Provided number of samples is {len(audio_data)} (BatchedSileroVAD expects {self.FRAME_SAMPLES})"
+            )
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            # Re-creating it would restart the recurrent state mid-stream, and keep it after its client is gone
+            raise ValueError(f"VAD session {session_id} is not open, or was closed")
+
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        session.pending.append((audio_data, future))
+        self._ready[session_id] = None
+        self._wakeup.set()
+        return await future
+
+    def warmup(self) -> None:
+        super().warmup()
+        batch_size = min(self.max_batch_size, 8)
+        self.forward_batch(
+            np.zeros((batch_size, self.FRAME_SAMPLES), dtype=np.int16),
+            torch.zeros(2, batch_size, self.STATE_SIZE),
+            torch.zeros(batch_size, self.CONTEXT_SAMPLES),
+        )
+
+    def _start(self) -> None:
+        if self._tick_task is not None and not self._tick_task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._tick_task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        executor = get_inference_executor("vad")
+
+        while True:
+            await self._wakeup.wait()
+            if self.tick_seconds > 0:
+                # Give the other sessions a moment to submit their frames
+                await asyncio.sleep(self.tick_seconds)
+            self._wakeup.clear()
+
+            while self._ready:
+                session_ids: List[str] = list(self._ready)[:self.max_batch_size]
+                sessions = [self._sessions[session_id] for session_id in session_ids]
+                batch = [session.pending.popleft() for session in sessions]
+                for session_id, session in zip(session_ids, sessions):
+                    if not session.pending:
+                        del self._ready[session_id]
+
+                try:
+                    probs, new_states, new_contexts = await executor.run(
+                        self,
+                        "forward_batch",
+                        np.stack([frame for frame, _ in batch]),
+                        torch.cat([session.state for session in sessions], dim=1),
+                        torch.cat([session.context for session in sessions], dim=0),
+                    )
+                except Exception as e:
+                    logger.error(f"Batched VAD forward pass of {len(batch)} frames failed: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for i, (session, (_, future)) in enumerate(zip(sessions, batch)):
+                    session.state = new_states[:, i:i + 1].clone()
+                    session.context = new_contexts[i:i + 1].clone()
+                    if not future.done():
+                        future.set_result(float(probs[i]))
+
+                self.batches_processed += 1
+                self.frames_processed += len(batch)
@@ -0,0 +1,203 @@
+# Path: ssi/utils/vad/cascaded_vad.py
+# Description: This module contains the CascadedVAD class, which decides the frames of clear silence with a cheap energy and zero-crossing gate against an adaptive noise floor, and only runs the neural VAD on the other frames.
+
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+from .vad_interface import VADInterface
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.metrics.server_metrics import get_server_metrics
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_server_metrics()
+
+# Frames below this level are digital silence, whatever the noise floor
+DIGITAL_SILENCE_DB = -75.0
+# The noise floor of a new session, until its own silence was measured
+INITIAL_NOISE_FLOOR_DB = -60.0
+# Above this noise floor, e.g. in a loud room, every frame goes to the neural VAD
+MAX_NOISE_FLOOR_DB = -30.0
+# The noise floor follows quieter non-speech frames quickly and louder ones slowly, so speech can't drag it up
+FLOOR_FALL_SMOOTHING = 0.3
+FLOOR_RISE_SMOOTHING = 0.02
+# Broadband noise crosses zero on about every other sample, voiced speech much less often
+NOISE_ZCR = 0.4
+# Frames after a speech frame which always go to the neural VAD, so the soft ends of words are judged by the model
+SPEECH_HANGOVER_FRAMES = 8
+
+class _GateState:
+    """The noise floor and the recent decisions of one session."""
+
+    __slots__ = ("noise_floor_db", "frames_since_speech")
+
+    def __init__(self) -> None:
+        self.noise_floor_db: float = INITIAL_NOISE_FLOOR_DB
+        self.frames_since_speech: int = SPEECH_HANGOVER_FRAMES
+
+def frame_features(frames: np.ndarray) -> np.ndarray:
+    """
+    Get the level in dBFS and the zero-crossing rate of int16 frames.
+
+    Args:
+        frames (np.ndarray): The frames, shaped (frame_samples,) or (frames, frame_samples).
+
+    Returns:
+        np.ndarray: The level and the zero-crossing rate, shaped (2,) or (frames, 2).
+    """
+    samples = frames.astype(np.float32) / 32768
+    energy_db = 10 * np.log10(np.mean(samples * samples, axis=-1) + 1e-12)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[..., 1:] != signs[..., :-1], axis=-1)
+    return np.stack([energy_db, zcr], axis=-1)
+
+class CascadedVAD(VADInterface):
+    """
+    A cheap energy and zero-crossing gate in front of a neural VAD.
+
+    Most frames of a call are silence between turns, which the gate decides
+    alone, with probability 0, from the frame's level relative to the
+    session's noise floor:
+
+    - Below `DIGITAL_SILENCE_DB`, or less than `margin_db` above the noise
+      floor, a frame is clear silence.
+    - Less than twice `margin_db` above the floor, a frame which crosses zero
+      as often as broadband noise is clear silence too.
+    - Every other frame is ambiguous and goes to the neural VAD, and so do the
+      `SPEECH_HANGOVER_FRAMES` frames after one the model judged speech.
+
+    The noise floor follows the level of the frames judged silence, by the
+    gate or the model, so it adapts to line noise. It falls quickly and rises
+    slowly, and above `MAX_NOISE_FLOOR_DB` the gate leaves every frame to the
+    model.
+
+    Attributes:
+        neural (VADInterface): The VAD which decides the ambiguous frames.
+        margin_db (float): How far above the noise floor a frame may be and still be clear silence.
+        frames_total (int): The frames seen.
+        frames_gated (int): The frames decided by the gate, without the neural VAD.
+    """
+
+    def __init__(self, neural: Optional[VADInterface] = None, margin_db: float = settings.VAD_CASCADE_MARGIN_DB) -> None:
+        if neural is None:
+            # Imported here, the factory imports this module
+            from .vad_factory import VADFactory
+            neural = VADFactory.create_vad_pipeline(settings.VAD_CASCADE_NEURAL_MODEL)
+        self.neural: VADInterface = neural
+        self.margin_db: float = margin_db
+        self._sessions: Dict[Optional[str], _GateState] = {}
+        self.frames_total: int = 0
+        self.frames_gated: int = 0
+
+    @property
+    def FRAME_SAMPLES(self) -> int:
+        """
+        The frame size of the neural VAD, which the gate doesn't constrain.
+        """
+        return self.neural.FRAME_SAMPLES
+
+    @property
+    def skipped_fraction(self) -> float:
+        """
+        The fraction of the frames which didn't need the neural VAD.
+        """
+        return self.frames_gated / self.frames_total if self.frames_total else 0.0
+
+    def _gate(self, audio_data: np.ndarray, session_id: Optional[str]) -> Tuple[Optional[float], float]:
+        """
+        Decide a frame without the neural VAD if it is clear silence.
+
+        Frames without a session share one state, which is created on first use.
+
+        Returns:
+            Tuple[Optional[float], float]: 0.0 for clear silence or None if the neural VAD has to decide, and the level of the frame.
+
+        Raises:
+            ValueError: If the session isn't open.
+        """
+        state = self._sessions.get(session_id)
+        if state is None:
+            if session_id is not None:
+                # Re-creating it would reset the noise floor mid-stream, and keep it after its client is gone
+                raise ValueError(f"VAD session {session_id} is not open, or was closed")
+            state = self._sessions[session_id] = _GateState()
+        energy_db, zcr = frame_features(audio_data).tolist()
+        self.frames_total += 1
+
+        above_floor = energy_db - state.noise_floor_db
+        silent = energy_db < DIGITAL_SILENCE_DB or (
+            state.frames_since_speech >= SPEECH_HANGOVER_FRAMES
+            and state.noise_floor_db < MAX_NOISE_FLOOR_DB
+            and (above_floor < self.margin_db or (above_floor < 2 * self.margin_db and zcr >= NOISE_ZCR))
+        )
+        if not silent:
+            return None, energy_db
+
+        self.frames_gated += 1
+        metrics.vad_frames.labels("gate").inc()
+        self._update_floor(state, energy_db)
+        state.frames_since_speech += 1
+        return 0.0, energy_db
+
+    def _record(self, session_id: Optional[str], energy_db: float, voice_prob: float) -> None:
+        """
+        Update the session's state with the decision of the neural VAD.
+        """
+        metrics.vad_frames.labels("neural").inc()
+        state = self._sessions.get(session_id)
+        if state is None:  # The session was closed while the neural VAD ran
+            return
+        if voice_prob >= settings.VAD_THRESHOLD:
+            state.frames_since_speech = 0
+        else:
+            state.frames_since_speech += 1
+            self._update_floor(state, energy_db)
+
+    def _update_floor(self, state: _GateState, energy_db: float) -> None:
+        energy_db = max(energy_db, DIGITAL_SILENCE_DB)
+        smoothing = FLOOR_FALL_SMOOTHING if energy_db < state.noise_floor_db else FLOOR_RISE_SMOOTHING
+        state.noise_floor_db += smoothing * (energy_db - state.noise_floor_db)
+
+    def detect_voice_activity(self, audio_data: Union[bytes, np.int16]) -> float:
+        if isinstance(audio_data, bytes):
+            audio_data = np.frombuffer(audio_data, dtype=np.int16)
+        voice_prob, energy_db = self._gate(audio_data, None)
+        if voice_prob is None:
+            voice_prob = self.neural.detect_voice_activity(audio_data)
+            self._record(None, energy_db, voice_prob)
+        return voice_prob
+
+    async def detect_voice_activity_async(
+        self,
+        audio_data: Union[bytes, np.int16],
+        session_id: Optional[str] = None,
+    ) -> float:
+        # The gate costs microseconds, so it runs right here instead of on the inference executor
+        if isinstance(audio_data, bytes):
+            audio_data = np.frombuffer(audio_data, dtype=np.int16)
+        voice_prob, energy_db = self._gate(audio_data, session_id)
+        if voice_prob is None:
+            voice_prob = await self.neural.detect_voice_activity_async(audio_data, session_id=session_id)
+            self._record(session_id, energy_db, voice_prob)
+        return voice_prob
+
+    def speech_probabilities(self, audio: np.ndarray, block_seconds: float = 30.0) -> np.ndarray:
+        """
+        Get the probabilities of a whole recording from the neural VAD, which runs its blocks side by side.
+
+        Offline, the model runs over many frames per forward pass anyway, so the
+        gate wouldn't save much.
+        """
+        return self.neural.speech_probabilities(audio, block_seconds)
+
+    def open_session(self, session_id: str) -> None:
+        self._sessions[session_id] = _GateState()
+        self.neural.open_session(session_id)
+
+    def close_session(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self.neural.close_session(session_id)
+        logger.debug(f"CascadedVAD decided {self.skipped_fraction:.1%} of all frames without the neural VAD so far")
+
+    def warmup(self) -> None:
+        self.neural.warmup()
@@ -1,7 +1,8 @@
 # Path: ssi/utils/vad/silero_vad.py
 # Description: This module contains the implementation of the Silero VAD strategy for detecting voice activity in audio data.
 
-from typing import Union
+import os
+from typing import Tuple, Union
 import torch
 import numpy as np
 from .vad_interface import VADInterface
@@ -9,16 +10,38 @@ from ssi.config import get_settings
 
 settings = get_settings()
 
+SILERO_REPO = "snakers4/silero-vad"
+
 class SileroVAD(VADInterface):
+    FRAME_SAMPLES = 512  # Silero only accepts 512 sample frames at 16 kHz
+    CONTEXT_SAMPLES = 64  # Samples of the previous frame prepended to each frame
+    STATE_SIZE = 128
+    # Frames each block of a recording starts early with, to settle the recurrent state. Their probabilities are discarded.
+    BLOCK_WARMUP_FRAMES = 16
+
     def __init__(self):
         if settings.VAD_MODEL_DOWNLOAD_DIR:
             torch.hub.set_dir(settings.VAD_MODEL_DOWNLOAD_DIR)
 
-        self.model, _ = torch.hub.load(
-            repo_or_dir='snakers4/silero-vad',
-            model='silero_vad',
-            force_reload=True
-        )
+        # Use the cached copy of the repo when there is one, so starting up needs no network access
+        local_repo_dir = os.path.join(torch.hub.get_dir(), SILERO_REPO.replace("/", "_") + "_master")
+        if os.path.isdir(local_repo_dir):
+            self.model, _ = torch.hub.load(
+                repo_or_dir=local_repo_dir,
+                model='silero_vad',
+                source='local',
+            )
+        elif settings.MODELS_OFFLINE:
+            raise RuntimeError(
+                f"MODELS_OFFLINE is set but the Silero VAD model is not cached in {local_repo_dir}"
+            )
+        else:
+            self.model, _ = torch.hub.load(
+                repo_or_dir=SILERO_REPO,
+                model='silero_vad',
+                force_reload=False,
+                trust_repo=True,
+            )
     
     def _get_probs(self, model, inputs: torch.Tensor, sample_rate: int):
         with torch.no_grad():
@@ -39,3 +62,76 @@ class SileroVAD(VADInterface):
         audio_data = self._int2float(audio_data)
         audio_tensor = torch.tensor(audio_data)
         return self._get_probs(self.model, audio_tensor, 16_000)
+
+    def forward_batch(
+        self,
+        frames: np.ndarray,
+        states: torch.Tensor,
+        contexts: torch.Tensor,
+    ) -> Tuple[np.ndarray, torch.Tensor, torch.Tensor]:
+        """
+        Run one batched forward pass with explicit states.
+
+        This method doesn't touch any state stored on the instance, so it can
+        run on a thread or a process inference executor.
+
+        Args:
+            frames (np.ndarray): The int16 frames, shaped (batch, FRAME_SAMPLES).
+            states (torch.Tensor): The recurrent states, shaped (2, batch, STATE_SIZE).
+            contexts (torch.Tensor): The audio contexts, shaped (batch, CONTEXT_SAMPLES).
+
+        Returns:
+            Tuple[np.ndarray, torch.Tensor, torch.Tensor]: The speech probability of
+            each frame, and the new states and contexts.
+        """
+        inputs = torch.cat([contexts, torch.from_numpy(frames.astype(np.float32) / 32768)], dim=1)
+        with torch.no_grad():
+            probs, new_states = self.model._model(inputs, states)
+        return probs.squeeze(1).numpy(), new_states, inputs[:, -self.CONTEXT_SAMPLES:]
+
+    def speech_probabilities(self, audio: np.ndarray, block_seconds: float = 30.0) -> np.ndarray:
+        """
+        Get the probability of voice activity of every frame of a whole recording, processing its blocks side by side.
+
+        The recording is cut into `block_seconds` long blocks, which are run as
+        the streams of one batch, each with its own recurrent state: one forward
+        pass covers one frame of every block. A recording of any length thus
+        takes as many forward passes as one block has frames. Every block starts
+        `BLOCK_WARMUP_FRAMES` early, so its state has settled when its own
+        frames begin. The frames of each pass are gathered from the recording
+        as they are needed, so a memory-mapped recording is never copied whole.
+        """
+        frame_count = -(-len(audio) // self.FRAME_SAMPLES)
+        if frame_count == 0:
+            return np.zeros(0, dtype=np.float32)
+        block_frames = max(1, int(block_seconds * settings.STREAM_SAMPLE_RATE) // self.FRAME_SAMPLES)
+        block_count = -(-frame_count // block_frames)
+        steps = block_frames + self.BLOCK_WARMUP_FRAMES
+
+        # A view of the whole frames, and the last partial frame padded with silence
+        whole_count = len(audio) // self.FRAME_SAMPLES
+        whole_frames = np.asarray(audio[:whole_count * self.FRAME_SAMPLES]).reshape(whole_count, self.FRAME_SAMPLES)
+        last_frame = np.zeros(self.FRAME_SAMPLES, dtype=np.int16)
+        last_frame[:len(audio) - whole_count * self.FRAME_SAMPLES] = audio[whole_count * self.FRAME_SAMPLES:]
+
+        indices = (
+            np.arange(block_count)[:, None] * block_frames - self.BLOCK_WARMUP_FRAMES + np.arange(steps)[None, :]
+        )
+        states = torch.zeros(2, block_count, self.STATE_SIZE)
+        contexts = torch.zeros(block_count, self.CONTEXT_SAMPLES)
+        probs = np.empty((block_count, steps), dtype=np.float32)
+        frames = np.empty((block_count, self.FRAME_SAMPLES), dtype=np.int16)
+        for step in range(steps):
+            step_indices = indices[:, step]
+            is_whole = (step_indices >= 0) & (step_indices < whole_count)
+            # The frames before the start and after the end of the recording are silence
+            frames[:] = 0
+            frames[is_whole] = whole_frames[step_indices[is_whole]]
+            frames[step_indices == whole_count] = last_frame if whole_count < frame_count else 0
+            probs[:, step], states, contexts = self.forward_batch(frames, states, contexts)
+        return probs[:, self.BLOCK_WARMUP_FRAMES:].reshape(-1)[:frame_count]
+
+    def warmup(self) -> None:
+        super().warmup()
+        # Don't let the synthetic audio leak into the state of the first real stream
+        self.model.reset_states()
@@ -2,6 +2,8 @@
 # Description: This module contains a factory class for creating instances of different VAD strategies.
 
 from .silero_vad import SileroVAD
+from .batched_silero_vad import BatchedSileroVAD
+from .cascaded_vad import CascadedVAD
 
 class VADFactory:
     """
@@ -25,7 +27,7 @@ class VADFactory:
         If the type is not recognized, it raises a ValueError.
 
         Args:
-            type (str): The type of VAD strategy to create. Currently supports 'silero'.
+            type (str): The type of VAD strategy to create. Currently supports 'silero', 'silero_batched' and 'cascaded'.
 
         Returns:
             An instance of the specified VAD strategy.
@@ -38,6 +40,10 @@ class VADFactory:
         """
         if type == "silero":
             return SileroVAD()
+        elif type == "silero_batched":
+            return BatchedSileroVAD()
+        elif type == "cascaded":
+            return CascadedVAD()
         elif type == "pyannote":
             raise NotImplementedError("Pyannote VAD not implemented yet")
         else:
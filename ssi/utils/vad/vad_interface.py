@@ -3,7 +3,9 @@
 
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Optional, Union
+from ssi.utils.inference.inference_executor import get_inference_executor
+from ssi.config import get_settings
 
 class VADInterface(ABC):
     """
@@ -13,9 +15,17 @@ class VADInterface(ABC):
     It provides a common interface for different VAD strategies to ensure that they
     can be used interchangeably in the real-time audio transcription system.
     
+    Attributes:
+        FRAME_SAMPLES (int): The number of samples in each frame the strategy takes.
+
     Methods:
         detect_voice_activity: Detects voice activity in the given audio data.
+        detect_voice_activity_async: Runs `detect_voice_activity` on the VAD inference executor.
+        open_session / close_session: Allocate and release per-client state for stateful VAD strategies.
+        warmup: Runs a detection on synthetic audio so the first real frame doesn't pay for initialization.
     """
+
+    FRAME_SAMPLES: int = get_settings().VAD_FRAME_SAMPLES
     
     @abstractmethod
     def detect_voice_activity(self, audio_data: Union[bytes, np.int16]) -> int:
@@ -29,3 +39,65 @@ class VADInterface(ABC):
             int: Probability of voice activity in the audio data.
         """
         pass
+
+    async def detect_voice_activity_async(
+        self,
+        audio_data: Union[bytes, np.int16],
+        session_id: Optional[str] = None,
+    ) -> int:
+        """
+        Detects voice activity on the VAD inference executor without blocking the event loop.
+        
+        Args:
+            audio_data (bytes): The audio data to analyze.
+            session_id (Optional[str]): The client session the audio belongs to. Stateful VAD
+                strategies use it to keep the state of each client apart.
+            
+        Returns:
+            int: Probability of voice activity in the audio data.
+        """
+        return await get_inference_executor("vad").run(self, "detect_voice_activity", audio_data)
+
+    def speech_probabilities(self, audio: np.ndarray, block_seconds: float = 30.0) -> np.ndarray:
+        """
+        Get the probability of voice activity of every `FRAME_SAMPLES` frame of a whole recording.
+
+        This implementation runs the frames one by one. Strategies which can run
+        many frames at once override it, processing `block_seconds` long blocks
+        of the recording side by side.
+
+        Args:
+            audio (np.ndarray): The int16 recording. A memory-mapped array is only read, never copied whole.
+            block_seconds (float): The length of the blocks processed side by side.
+
+        Returns:
+            np.ndarray: One float32 probability per frame. The last frame is padded with silence.
+        """
+        frame_samples = self.FRAME_SAMPLES
+        probs = np.empty(-(-len(audio) // frame_samples), dtype=np.float32)
+        for index in range(len(probs)):
+            frame = np.asarray(audio[index * frame_samples:(index + 1) * frame_samples])
+            if len(frame) < frame_samples:
+                frame = np.pad(frame, (0, frame_samples - len(frame)))
+            probs[index] = self.detect_voice_activity(frame)
+        return probs
+
+    def open_session(self, session_id: str) -> None:
+        """
+        Allocate the state for a new client session. Stateless VAD strategies don't need to override this.
+        """
+        pass
+
+    def close_session(self, session_id: str) -> None:
+        """
+        Release the state of a client session. Stateless VAD strategies don't need to override this.
+        """
+        pass
+
+    def warmup(self) -> None:
+        """
+        Run the model on a frame of synthetic low-level noise, so that kernel and
+        graph initialization happens at startup rather than on the first real frame.
+        """
+        noise = np.random.default_rng(0).normal(0, 100, self.FRAME_SAMPLES).astype(np.int16)
+        self.detect_voice_activity(noise)
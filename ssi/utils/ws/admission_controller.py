@@ -0,0 +1,169 @@
+# Path: ssi/utils/ws/admission_controller.py
+# Description: This module contains the AdmissionController class, which estimates how many sessions the server can serve from the measured ASR real-time factor, decides whether new connections are admitted, rejected or queued, and closes idle connections.
+
+import asyncio
+import math
+import time
+from typing import TYPE_CHECKING, Optional
+from fastapi import status
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.metrics.server_metrics import get_server_metrics
+
+if TYPE_CHECKING:
+    from ssi.utils.ws.connection_manager import ConnectionManager
+
+settings = get_settings()
+logger = get_logger()
+
+MONITOR_INTERVAL_SECONDS = 1.0
+SPEAKING_FRACTION_SMOOTHING = 0.1  # Weight of the latest sample in the speaking fraction estimate
+
+class AdmissionController:
+    """
+    Admission control based on the measured capacity of the ASR model.
+
+    A speaking session needs `real_time_factor` seconds of ASR compute per second
+    of speech, so the ASR workers can keep up with
+    `workers * ADMISSION_TARGET_UTILIZATION / real_time_factor` speaking sessions.
+    Not every connected session speaks at once, so the capacity in connected
+    sessions is that number divided by the fraction of sessions which are
+    speaking (a moving average, at least `ADMISSION_MIN_SPEAKING_FRACTION`).
+
+    Until the first batch has been transcribed, the real-time factor is unknown
+    and only `ADMISSION_MAX_SESSIONS` applies. A background task refreshes the
+    speaking fraction, wakes up queued connections when capacity frees up, and
+    closes connections which sent no audio for `IDLE_TIMEOUT_SECONDS`.
+
+    Attributes:
+        connection_manager (ConnectionManager): The connections to control.
+        policy (str): "reject", "queue" or "disabled".
+        speaking_fraction (float): The estimated fraction of connected sessions speaking at once.
+    """
+
+    def __init__(self, connection_manager: "ConnectionManager") -> None:
+        self.connection_manager: "ConnectionManager" = connection_manager
+        self.policy: str = settings.ADMISSION_POLICY
+        self.speaking_fraction: float = settings.ADMISSION_MIN_SPEAKING_FRACTION
+        self.metrics = get_server_metrics()
+        self._waiting: int = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+
+        self.metrics.admission_capacity.set_function(lambda: self.capacity() or 0)
+        self.metrics.speaking_sessions.set_function(self.speaking_sessions)
+        self.metrics.admission_queue_depth.set_function(lambda: self._waiting)
+
+    def start(self) -> None:
+        """
+        Start the monitor task. Must be called from within a running event loop.
+        """
+        if self._monitor_task is not None and not self._monitor_task.done():
+            return
+        self._condition = asyncio.Condition()
+        self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+
+    def speaking_sessions(self) -> int:
+        return sum(client.is_recording for client in self.connection_manager.active_connections.values())
+
+    def capacity(self) -> Optional[int]:
+        """
+        Get the number of sessions the server can serve, or None if it isn't limited.
+        """
+        limits = []
+        if settings.ADMISSION_MAX_SESSIONS > 0:
+            limits.append(settings.ADMISSION_MAX_SESSIONS)
+
+        scheduler = self.connection_manager.asr_scheduler
+        real_time_factor = scheduler.get_stats().real_time_factor if scheduler is not None else None
+        if real_time_factor:
+            # The scheduler transcribes up to ASR_INFERENCE_WORKERS batches at once
+            max_speaking = settings.ASR_INFERENCE_WORKERS * settings.ADMISSION_TARGET_UTILIZATION / real_time_factor
+            limits.append(max(1, math.floor(max_speaking / self.speaking_fraction)))
+
+        return min(limits) if limits else None
+
+    def has_capacity(self) -> bool:
+        capacity = self.capacity()
+        return capacity is None or len(self.connection_manager.active_connections) < capacity
+
+    async def admit(self) -> bool:
+        """
+        Decide whether a new connection is admitted, waiting for capacity with the "queue" policy.
+
+        Returns:
+            bool: False if the connection should be closed with code 1013 (Try Again Later).
+        """
+        if self.policy == "disabled" or self.has_capacity():
+            self.metrics.admissions.labels("admitted").inc()
+            return True
+
+        if self.policy == "reject" or self._waiting >= settings.ADMISSION_QUEUE_MAX_SIZE:
+            self.metrics.admissions.labels("rejected").inc()
+            return False
+
+        self.start()
+        self._waiting += 1
+        try:
+            async with self._condition:
+                await asyncio.wait_for(
+                    self._condition.wait_for(self.has_capacity), settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+                )
+        except asyncio.TimeoutError:
+            self.metrics.admissions.labels("queue_timeout").inc()
+            return False
+        finally:
+            self._waiting -= 1
+
+        self.metrics.admissions.labels("admitted_after_queue").inc()
+        return True
+
+    async def release(self) -> None:
+        """
+        Wake up the queued connections after a session ended.
+        """
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(MONITOR_INTERVAL_SECONDS)
+            try:
+                self._update_speaking_fraction()
+                await self._reap_idle_connections()
+                # The capacity may have grown with a better real-time factor
+                await self.release()
+            except Exception as e:
+                logger.error(f"Admission monitor failed: {e}")
+
+    def _update_speaking_fraction(self) -> None:
+        connected = len(self.connection_manager.active_connections)
+        if connected == 0:
+            return
+        fraction = self.speaking_sessions() / connected
+        smoothed = SPEAKING_FRACTION_SMOOTHING * fraction + (1 - SPEAKING_FRACTION_SMOOTHING) * self.speaking_fraction
+        self.speaking_fraction = max(settings.ADMISSION_MIN_SPEAKING_FRACTION, smoothed)
+
+    async def _reap_idle_connections(self) -> None:
+        if settings.IDLE_TIMEOUT_SECONDS <= 0:
+            return
+        now = time.monotonic()
+        for client in list(self.connection_manager.active_connections.values()):
+            if now - client.last_audio_at < settings.IDLE_TIMEOUT_SECONDS:
+                continue
+            logger.info(f"Closing client {client.client_id}, no audio for {now - client.last_audio_at:.0f}s")
+            self.metrics.idle_connections_reaped.inc()
+            try:
+                await client.close(status.WS_1000_NORMAL_CLOSURE, "Idle timeout")
+            except Exception as e:
+                logger.warning(f"Failed to close idle client {client.client_id}: {e}")
@@ -0,0 +1,135 @@
+# Path: ssi/utils/ws/callback_dispatcher.py
+# Description: This module contains the CallbackDispatcher class, which runs the user's asr_callback and new_client_callback on bounded queues with their own workers, so slow callbacks never stall audio processing.
+
+import asyncio
+import inspect
+import time
+import zlib
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.metrics.server_metrics import get_server_metrics
+
+settings = get_settings()
+logger = get_logger()
+
+Callback = Callable[[Any], Union[None, Awaitable[None]]]
+
+class CallbackDispatcher:
+    """
+    Delivers callback calls off the audio hot path.
+
+    `dispatch` only puts the call on a queue and returns immediately. Calls are
+    sharded over `workers` worker tasks by key (the client ID), so the calls for
+    one client are delivered in order, e.g. its partial transcriptions before
+    the final one, while a slow callback for one client doesn't hold up the
+    others.
+
+    Coroutine callbacks are awaited on the event loop. Plain functions run in a
+    thread when `CALLBACK_RUN_SYNC_IN_THREAD` is set, so a blocking database
+    write or HTTP request doesn't block the event loop either.
+
+    Each worker queue holds at most `max_queue_size / workers` calls; calls
+    which don't fit are dropped and counted. The queue wait, run time, failures
+    and drops are reported per callback in the server metrics.
+
+    Attributes:
+        workers (int): The number of worker tasks.
+        max_queue_size (int): The most calls queued over all workers.
+        run_sync_in_thread (bool): Whether plain function callbacks run in a thread.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        run_sync_in_thread: Optional[bool] = None,
+    ) -> None:
+        self.workers: int = workers or settings.CALLBACK_WORKERS
+        self.max_queue_size: int = max_queue_size or settings.CALLBACK_QUEUE_MAX_SIZE
+        self.run_sync_in_thread: bool = (
+            run_sync_in_thread if run_sync_in_thread is not None else settings.CALLBACK_RUN_SYNC_IN_THREAD
+        )
+        self.metrics = get_server_metrics()
+        self._queues: List[asyncio.Queue] = []
+        self._worker_tasks: List[asyncio.Task] = []
+
+        self.metrics.callback_queue_depth.set_function(lambda: sum(queue.qsize() for queue in self._queues))
+
+    def start(self) -> None:
+        """
+        Start the workers. Must be called from within a running event loop.
+        Calling it again while the workers are running is a no-op.
+        """
+        if self._worker_tasks and not any(task.done() for task in self._worker_tasks):
+            return
+        per_worker = max(1, self.max_queue_size // self.workers)
+        self._queues = [asyncio.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._worker_tasks = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Deliver the calls still queued (waiting at most `timeout` seconds), then stop the workers.
+        """
+        if not self._worker_tasks:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"CallbackDispatcher stopped with {sum(q.qsize() for q in self._queues)} calls undelivered")
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def dispatch(self, name: str, callback: Optional[Callback], payload: Any, key: str = "") -> bool:
+        """
+        Queue a callback call without waiting for it.
+
+        Args:
+            name (str): The callback's name in the metrics, e.g. "asr".
+            callback (Optional[Callback]): The function or coroutine function to call. None is ignored.
+            payload (Any): The single argument of the call.
+            key (str): Calls with the same key are delivered in order.
+
+        Returns:
+            bool: False if the queue was full and the call was dropped.
+        """
+        if callback is None:
+            return True
+        self.start()
+        queue = self._queues[zlib.crc32(key.encode()) % self.workers]
+        try:
+            queue.put_nowait((name, callback, payload, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.metrics.callback_dropped.labels(name).inc()
+            logger.error(f"Callback queue full, dropped a '{name}' callback call for {key or 'unknown client'}")
+            return False
+        return True
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            item: Tuple[str, Callback, Any, float] = await queue.get()
+            name, callback, payload, enqueued_at = item
+            started_at = time.perf_counter()
+            self.metrics.callback_queue_wait_seconds.labels(name).observe(started_at - enqueued_at)
+            try:
+                await self._call(callback, payload)
+            except Exception as e:
+                self.metrics.callback_failures.labels(name).inc()
+                logger.error(f"The '{name}' callback failed: {e}")
+            finally:
+                self.metrics.callback_seconds.labels(name).observe(time.perf_counter() - started_at)
+                queue.task_done()
+
+    async def _call(self, callback: Callback, payload: Any) -> None:
+        if inspect.iscoroutinefunction(callback):
+            await callback(payload)
+            return
+        if self.run_sync_in_thread:
+            result = await asyncio.to_thread(callback, payload)
+        else:
+            result = callback(payload)
+        # Callables which return an awaitable, e.g. a functools.partial of a coroutine function
+        if inspect.isawaitable(result):
+            await result
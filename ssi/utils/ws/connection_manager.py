@@ -1,49 +1,216 @@
 # Path: ssi/utils/ws/connection_manager.py
 # Description: This module contains the WebSocket connection manager for handling WebSocket connections for real-time audio transcription.
 
-from typing import Callable, Dict
+import asyncio
+import time
+from typing import Callable, Dict, Optional
 import uuid
 from fastapi import WebSocket, status
 from ssi.utils.ws.stream_client import StreamClient
+from ssi.utils.ws.multistream_connection import MultiplexedStream, MultiStreamConnection
+from ssi.utils.ws.admission_controller import AdmissionController
+from ssi.utils.ws.callback_dispatcher import Callback, CallbackDispatcher
 from ssi.logger import get_logger
 from ssi.config import get_settings
 from ssi.utils.asr.asr_interface import ASRInterface
 from ssi.utils.vad.vad_factory import VADFactory
 from ssi.utils.asr.asr_factory import ASRFactory
+from ssi.utils.asr.asr_batch_scheduler import ASRBatchScheduler
 from ssi.utils.vad.vad_interface import VADInterface
+from ssi.utils.metrics.server_metrics import get_server_metrics
+from ssi.utils.buffers.bounded_audio_queue import AudioBufferBudget
 from ssi.types.streaming_data_chunk import StreamingDataChunk
 
 class ConnectionManager:
-    def __init__(self, asr_callback: Callable[[StreamingDataChunk], None] = None) -> None:
+    def __init__(
+        self,
+        asr_callback: Optional[Callback] = None,
+        *,
+        vad_pipeline: Optional[VADInterface] = None,
+        asr_pipeline: Optional[ASRInterface] = None,
+    ) -> None:
         self.active_connections: Dict[str, StreamClient] = {}
+        self.multistream_connections: int = 0
         self.logger = get_logger()
         self.logger.info("ConnectionManager initialized")
         self.asr_callback = asr_callback
         self.settings = get_settings()
         
-        # Initialize VAD and ASR pipelines
-        self.vad_pipeline: VADInterface = VADFactory.create_vad_pipeline(self.settings.VAD_MODEL)
-        self.asr_pipeline: ASRInterface = ASRFactory.create_asr_pipeline(self.settings.ASR_MODEL)
+        # The VAD and ASR pipelines are loaded by `startup`, unless already loaded ones are given
+        self.vad_pipeline: Optional[VADInterface] = vad_pipeline
+        self.asr_pipeline: Optional[ASRInterface] = asr_pipeline
+        self.asr_scheduler: Optional[ASRBatchScheduler] = None
+        self.startup_timings: Dict[str, float] = {}
+        self._startup_lock = asyncio.Lock()
 
-    async def connect(self, websocket: WebSocket) -> StreamClient:
+        # Caps the audio waiting for processing over all clients
+        self.audio_budget = AudioBufferBudget(
+            int(self.settings.AUDIO_BUFFER_GLOBAL_MAX_SECONDS * self.settings.STREAM_SAMPLE_RATE)
+        )
+
+        # Delivers the callbacks on its own workers, so they never block audio processing
+        self.callback_dispatcher = CallbackDispatcher()
+
+        # Decides whether new connections fit into the measured capacity, and closes idle ones
+        self.admission = AdmissionController(self)
+
+        # These gauges are read from the current state whenever the metrics are rendered
+        metrics = get_server_metrics()
+        metrics.active_sessions.set_function(lambda: len(self.active_connections))
+        metrics.audio_queue_depth.set_function(
+            lambda: sum(client.audio_queue.qsize() for client in self.active_connections.values())
+        )
+        metrics.audio_buffered_seconds.set_function(
+            lambda: self.audio_budget.buffered_samples / self.settings.STREAM_SAMPLE_RATE
+        )
+        metrics.multistream_connections.set_function(lambda: self.multistream_connections)
+        metrics.asr_queue_depth.set_function(
+            lambda: self.asr_scheduler.get_stats().queue_depth if self.asr_scheduler is not None else 0
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        return self.asr_scheduler is not None
+
+    async def startup(self) -> None:
+        """
+        Load the VAD and ASR models in parallel and warm them up on synthetic audio.
+
+        This is registered as a startup handler of the router, so it completes before
+        the server accepts connections. It is also awaited by `connect`, in case the
+        application doesn't run the router's startup handlers. Calling it again once
+        the models are loaded is a no-op.
+        """
+        async with self._startup_lock:
+            if self.is_ready:
+                return
+
+            started_at = time.perf_counter()
+            self.vad_pipeline, self.asr_pipeline = await asyncio.gather(
+                self._load("vad_load", self.vad_pipeline, VADFactory.create_vad_pipeline, self.settings.VAD_MODEL),
+                self._load("asr_load", self.asr_pipeline, ASRFactory.create_asr_pipeline, self.settings.ASR_MODEL),
+            )
+
+            if self.settings.MODELS_WARMUP:
+                await asyncio.gather(
+                    self._timed("vad_warmup", self.vad_pipeline.warmup),
+                    self._timed("asr_warmup", self.asr_pipeline.warmup),
+                )
+
+            # All clients share one scheduler so their utterances can be transcribed in batches
+            self.asr_scheduler = ASRBatchScheduler(self.asr_pipeline)
+            self.asr_scheduler.start()
+            self.admission.start()
+            self.callback_dispatcher.start()
+
+            self.startup_timings["total"] = time.perf_counter() - started_at
+            self.logger.info(
+                "ConnectionManager ready: "
+                + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_timings.items())
+            )
+
+    async def shutdown(self) -> None:
+        """
+        Stop the ASR scheduler, the admission monitor and the callback workers. Registered as a shutdown handler of the router.
+        """
+        await self.admission.stop()
+        if self.asr_scheduler is not None:
+            await self.asr_scheduler.stop()
+        await self.callback_dispatcher.stop()
+
+    async def _load(self, phase: str, pipeline, factory: Callable, model_type: str):
+        if pipeline is not None:
+            return pipeline
+        return await self._timed(phase, factory, model_type)
+
+    async def _timed(self, phase: str, func: Callable, *args):
+        """
+        Run a blocking startup step in a thread and record how long it took.
+        """
+        started_at = time.perf_counter()
+        result = await asyncio.to_thread(func, *args)
+        self.startup_timings[phase] = time.perf_counter() - started_at
+        self.logger.info(f"Startup phase '{phase}' took {self.startup_timings[phase]:.2f}s")
+        return result
+
+    async def connect(self, websocket: WebSocket) -> Optional[StreamClient]:
         """
         Establish a new WebSocket connection and initialize client information.
+
+        Returns:
+            Optional[StreamClient]: The new client, or None if the server is at capacity
+            and the connection was closed with code 1013 (Try Again Later).
         """
+        await self.startup()
+        if not await self.admission.admit():
+            await websocket.accept()
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Server at capacity")
+            self.logger.warning(
+                f"WebSocket connection rejected, server at capacity ({len(self.active_connections)} sessions)"
+            )
+            return None
+
         client_id = str(uuid.uuid4())  # Generate a unique client_id
-        client = StreamClient(client_id, websocket, self.asr_callback, self.vad_pipeline, self.asr_pipeline)
-        await websocket.accept()
+        client = StreamClient(
+            client_id, websocket, self.dispatch_asr_callback, self.vad_pipeline, self.asr_scheduler, self.audio_budget
+        )
+        # Registered before the handshake completes, so concurrent admissions count this session
         self.active_connections[client_id] = client
+        await websocket.accept()
         self.logger.info(f"WebSocket client {client_id} connected")
 
         return client
 
+    async def connect_multistream(self, websocket: WebSocket, new_client_callback: Callback) -> MultiStreamConnection:
+        """
+        Accept a multi-stream WebSocket. Its streams are admitted one by one, as they are opened.
+        """
+        await self.startup()
+        await websocket.accept()
+        self.multistream_connections += 1
+        self.logger.info("Multi-stream WebSocket connected")
+        return MultiStreamConnection(websocket, self, new_client_callback)
+
+    def disconnect_multistream(self) -> None:
+        """
+        Forget a multi-stream WebSocket which disconnected. Its streams were detached by the connection, to be resumed.
+        """
+        self.multistream_connections -= 1
+        self.logger.info("Multi-stream WebSocket disconnected")
+
+    async def open_stream(self, key: str) -> Optional[MultiplexedStream]:
+        """
+        Admit and register a logical stream of a multi-stream connection.
+
+        Returns:
+            Optional[MultiplexedStream]: The new stream, or None if the server is at capacity.
+        """
+        if not await self.admission.admit():
+            self.logger.warning(f"Stream rejected, server at capacity ({len(self.active_connections)} sessions)")
+            return None
+        if key in self.active_connections:
+            return None  # Opened by a concurrent OPEN with the same key meanwhile
+        stream = MultiplexedStream(key, self, self.vad_pipeline, self.asr_scheduler, self.audio_budget)
+        self.active_connections[key] = stream
+        self.logger.info(f"Stream {key} opened")
+        return stream
+
+    def dispatch_asr_callback(self, chunk: StreamingDataChunk) -> None:
+        """
+        Queue a transcription for the ASR callback without waiting for it.
+        """
+        self.callback_dispatcher.dispatch("asr", self.asr_callback, chunk, key=chunk.client_id or "")
+
     async def disconnect(self, client_id: str):
         """
         Disconnect a WebSocket client and clean up resources.
         """
         client: StreamClient = self.active_connections.pop(client_id, None)
         if client:
-            await client.websocket.close(code=status.WS_1001_GOING_AWAY)
+            self.vad_pipeline.close_session(client_id)
+            client.audio_queue.clear()
+            await client.close(status.WS_1001_GOING_AWAY)
             self.logger.info(f"WebSocket client {client_id} disconnected")
+            await self.admission.release()
         else:
             self.logger.warning(f"Attempted to disconnect non-existent client {client_id}")
\ No newline at end of file
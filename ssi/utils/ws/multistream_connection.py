@@ -0,0 +1,384 @@
+# Path: ssi/utils/ws/multistream_connection.py
+# Description: This module contains the MultiStreamConnection class, which serves many logical audio streams over one WebSocket with the framed multi-stream protocol, and the MultiplexedStream class for each of these streams.
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+import numpy as np
+from fastapi import WebSocket, status
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.asr.asr_batch_scheduler import ASRBatchScheduler
+from ssi.utils.buffers.bounded_audio_queue import AudioBufferBudget
+from ssi.utils.metrics.server_metrics import get_server_metrics
+from ssi.utils.vad.vad_interface import VADInterface
+from ssi.utils.ws.callback_dispatcher import Callback
+from ssi.utils.ws.multistream_protocol import (
+    FrameType,
+    ProtocolError,
+    decode_control,
+    decode_frame,
+    encode_control,
+    encode_frame,
+    encode_offset,
+)
+from ssi.utils.ws.stream_client import StreamClient
+from ssi.types.new_client_connected import NewClientConnected
+from ssi.types.processing_timings import ProcessingTimings
+from ssi.types.streaming_data_chunk import StreamingDataChunk
+
+if TYPE_CHECKING:
+    from ssi.utils.ws.connection_manager import ConnectionManager
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_server_metrics()
+
+# How long a closed stream waits for the transcriptions of its last utterances
+CLOSE_DRAIN_TIMEOUT_SECONDS = 30.0
+
+class _StreamScheduler:
+    """
+    Submits a stream's utterances to the shared ASR scheduler and keeps the unfinished ones,
+    so closing the stream can wait for its last transcriptions.
+    """
+
+    def __init__(self, scheduler: ASRBatchScheduler) -> None:
+        self.scheduler: ASRBatchScheduler = scheduler
+        self.pending: Set[asyncio.Future] = set()
+
+    def submit(self, audio: np.ndarray, timings: Optional[ProcessingTimings] = None) -> asyncio.Future:
+        future = self.scheduler.submit(audio, timings)
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        return future
+
+    async def drain(self, timeout: float) -> None:
+        if self.pending:
+            await asyncio.wait(set(self.pending), timeout=timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.scheduler, name)
+
+class MultiplexedStream(StreamClient):
+    """
+    One logical audio stream of a multi-stream connection.
+
+    It has its own VAD session, audio queue and buffering strategy, like a
+    `StreamClient`, but no WebSocket or tasks of its own: the connection it
+    is attached to receives its audio and processes it. When the connection
+    drops, the stream is kept for `MULTISTREAM_RESUME_GRACE_SECONDS`, so the
+    client can resume it on a new connection with the same key.
+
+    Attributes:
+        connection (Optional[MultiStreamConnection]): The connection carrying the stream, None while detached.
+        stream_id (Optional[int]): The ID of the stream on its connection.
+        received_bytes (int): Bytes of audio received on the stream, the offset a resume continues from.
+        is_closing (bool): The client closed the stream, it ends once its audio is processed.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        connection_manager: "ConnectionManager",
+        vad_pipeline: VADInterface,
+        asr_scheduler: ASRBatchScheduler,
+        audio_budget: Optional[AudioBufferBudget] = None,
+    ) -> None:
+        super().__init__(key, None, self._deliver, vad_pipeline, _StreamScheduler(asr_scheduler), audio_budget)
+        self.connection_manager: "ConnectionManager" = connection_manager
+        self.connection: Optional["MultiStreamConnection"] = None
+        self.stream_id: Optional[int] = None
+        self.received_bytes: int = 0
+        self.acked_bytes: int = 0
+        self.is_closing: bool = False
+        self.is_scheduled: bool = False  # Waiting in its connection's processing queue
+        self.is_processing: bool = False  # Its audio is being processed, possibly by a connection it was moved from
+        self._is_closed: bool = False
+        self._undelivered: list = []  # Transcriptions finished while detached, sent on resume
+        self._expiry: Optional[asyncio.TimerHandle] = None
+
+    def attach(self, connection: "MultiStreamConnection", stream_id: int) -> None:
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+        self.connection = connection
+        self.stream_id = stream_id
+        connection.streams[stream_id] = self
+        for chunk in self._undelivered:
+            connection.send_result(self, chunk)
+        self._undelivered = []
+        # It may still be marked as waiting in the processing queue of its previous connection
+        self.is_scheduled = False
+        if not self.audio_queue.empty():
+            connection.schedule(self)
+
+    def detach(self) -> None:
+        """
+        Keep the stream without a connection, until it is resumed or the grace period expires.
+        """
+        self.connection = None
+        self.stream_id = None
+        if self.is_closing:
+            return  # Ends once its last transcriptions are finished
+        if settings.MULTISTREAM_RESUME_GRACE_SECONDS <= 0:
+            _spawn(self.close(status.WS_1001_GOING_AWAY, "Connection closed"))
+            return
+        self._expiry = asyncio.get_running_loop().call_later(settings.MULTISTREAM_RESUME_GRACE_SECONDS, self._expire)
+
+    def _expire(self) -> None:
+        logger.info(f"Stream {self.client_id} wasn't resumed within {settings.MULTISTREAM_RESUME_GRACE_SECONDS}s, closing it")
+        metrics.multistream_stream_events.labels("expired").inc()
+        _spawn(self.close(status.WS_1001_GOING_AWAY, "Not resumed"))
+
+    def _deliver(self, chunk: StreamingDataChunk) -> None:
+        self.connection_manager.dispatch_asr_callback(chunk)
+        if self.connection is not None:
+            self.connection.send_result(self, chunk)
+        else:
+            self._undelivered.append(chunk)
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE, reason: str = "") -> None:
+        """
+        End the stream: tell the client, if it is connected, and disconnect it from the connection manager.
+        """
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self.is_running = False
+        self.audio_queue.close()
+        if self._expiry is not None:
+            self._expiry.cancel()
+        if self.connection is not None:
+            self.connection.end_stream(self, code, reason)
+        await self.connection_manager.disconnect(self.client_id)
+
+class MultiStreamConnection:
+    """
+    A WebSocket carrying many logical audio streams with the framed multi-stream
+    protocol (see `ssi.utils.ws.multistream_protocol`).
+
+    The streams share the socket and two tasks: one receives the frames and
+    queues each stream's audio, and one sends the replies. Each stream with
+    queued audio gets a task which runs VAD and the buffering strategy on it,
+    so the streams are processed side by side. Each stream is
+    admitted and counted like a single-stream connection, and its transcriptions
+    are delivered to the ASR callback and sent back as RESULT frames.
+
+    Attributes:
+        websocket (WebSocket): The WebSocket connection.
+        streams (Dict[int, MultiplexedStream]): The attached streams, by stream ID.
+    """
+
+    def __init__(self, websocket: WebSocket, connection_manager: "ConnectionManager", new_client_callback: Callback) -> None:
+        self.websocket: WebSocket = websocket
+        self.connection_manager: "ConnectionManager" = connection_manager
+        self.new_client_callback: Callback = new_client_callback
+        self.streams: Dict[int, MultiplexedStream] = {}
+        self.is_running: bool = True
+        self._ack_interval_bytes: int = int(
+            settings.MULTISTREAM_ACK_INTERVAL_SECONDS * settings.STREAM_SAMPLE_RATE * settings.STREAM_SAMPLE_WIDTH_BYTES
+        )
+        self._ready: asyncio.Queue = asyncio.Queue()  # Streams with audio to process
+        self._stream_tasks: Set[asyncio.Task] = set()  # One per stream whose audio is being processed
+        self._outgoing: asyncio.Queue = asyncio.Queue()  # Frames to send
+
+    async def run(self) -> None:
+        """
+        Serve the connection until the client disconnects, then detach its streams.
+
+        The audio a stream's processing already took is processed before the
+        stream is detached: it was acknowledged, so a resuming client doesn't
+        send it again. The audio still queued stays with the stream.
+        """
+        process_task = asyncio.create_task(self._process())
+        send_task = asyncio.create_task(self._send())
+        try:
+            await self._receive()
+        finally:
+            self.is_running = False
+            send_task.cancel()
+            self._ready.put_nowait(None)  # Wakes up the processing task if it is waiting, so it ends
+            await asyncio.wait([process_task, *self._stream_tasks], timeout=CLOSE_DRAIN_TIMEOUT_SECONDS)
+            process_task.cancel()
+            for task in self._stream_tasks:
+                task.cancel()
+            for stream in list(self.streams.values()):
+                stream.detach()
+            self.streams.clear()
+
+    def schedule(self, stream: MultiplexedStream) -> None:
+        """
+        Queue a stream for processing, once however much audio it received meanwhile.
+        """
+        if not stream.is_scheduled:
+            stream.is_scheduled = True
+            self._ready.put_nowait(stream)
+
+    def send_result(self, stream: MultiplexedStream, chunk: StreamingDataChunk) -> None:
+        self._outgoing.put_nowait(encode_frame(FrameType.RESULT, stream.stream_id, chunk.model_dump_json().encode()))
+
+    def end_stream(self, stream: MultiplexedStream, code: int, reason: str) -> None:
+        self.streams.pop(stream.stream_id, None)
+        self._send_closed(stream.stream_id, code, reason)
+
+    def _send_closed(self, stream_id: int, code: int, reason: str) -> None:
+        self._outgoing.put_nowait(encode_control(FrameType.CLOSED, stream_id, {"code": code, "reason": reason}))
+
+    async def _receive(self) -> None:
+        while True:
+            message = await self.websocket.receive_bytes()
+            try:
+                frame_type, stream_id, payload = decode_frame(message)
+                if frame_type == FrameType.AUDIO:
+                    stream = self.streams.get(stream_id)
+                    if stream is not None:
+                        await self._receive_audio(stream, payload)
+                elif frame_type == FrameType.OPEN:
+                    # Admission may wait for capacity, which mustn't hold up the other streams
+                    _spawn(self._open(stream_id, decode_control(payload)))
+                elif frame_type == FrameType.CLOSE:
+                    stream = self.streams.get(stream_id)
+                    if stream is not None and not stream.is_closing:
+                        stream.is_closing = True
+                        stream.audio_queue.close()
+                        self.schedule(stream)
+                else:
+                    raise ProtocolError(f"Unexpected {frame_type.name} frame from a client")
+            except ProtocolError as e:
+                logger.warning(f"Ignoring an invalid frame on a multi-stream connection: {e}")
+
+    async def _receive_audio(self, stream: MultiplexedStream, payload: memoryview) -> None:
+        stream.last_audio_at = time.monotonic()
+        stream.received_bytes += len(payload)
+        if not await stream.append_audio_data(bytes(payload)):
+            logger.warning(
+                f"Audio queue of stream {stream.client_id} overloaded "
+                f"({stream.audio_queue.buffered_seconds:.1f}s buffered), closing it"
+            )
+            await stream.close(status.WS_1013_TRY_AGAIN_LATER, "Audio queue overloaded")
+            return
+        self.schedule(stream)
+        if stream.received_bytes - stream.acked_bytes >= self._ack_interval_bytes:
+            stream.acked_bytes = stream.received_bytes
+            self._outgoing.put_nowait(encode_offset(FrameType.ACK, stream.stream_id, stream.received_bytes))
+
+    async def _open(self, stream_id: int, message: Dict[str, Any]) -> None:
+        key = message.get("key")
+        if not isinstance(key, str) or not key:
+            self._send_closed(stream_id, status.WS_1008_POLICY_VIOLATION, "Missing stream key")
+            return
+        offset = message.get("offset", 0)
+        if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+            self._send_closed(stream_id, status.WS_1008_POLICY_VIOLATION, "Invalid offset")
+            return
+        if stream_id in self.streams:
+            self._send_closed(stream_id, status.WS_1008_POLICY_VIOLATION, "Stream ID in use")
+            return
+
+        existing = self.connection_manager.active_connections.get(key)
+        if existing is not None:
+            if not message.get("resume") or not isinstance(existing, MultiplexedStream) or existing.is_closing:
+                self._send_closed(stream_id, status.WS_1008_POLICY_VIOLATION, "Stream key in use")
+                return
+            if existing.connection is not None:
+                # The client reconnected before the server noticed the old connection dropped
+                existing.connection.streams.pop(existing.stream_id, None)
+            existing.attach(self, stream_id)
+            existing.acked_bytes = existing.received_bytes
+            self._outgoing.put_nowait(encode_offset(FrameType.OPENED, stream_id, existing.received_bytes))
+            metrics.multistream_stream_events.labels("resumed").inc()
+            logger.info(f"Stream {key} resumed at offset {existing.received_bytes}")
+            return
+
+        if len(self.streams) >= settings.MULTISTREAM_MAX_STREAMS_PER_CONNECTION:
+            self._send_closed(stream_id, status.WS_1013_TRY_AGAIN_LATER, "Too many streams on this connection")
+            return
+        stream = await self.connection_manager.open_stream(key)
+        if stream is None:
+            self._send_closed(stream_id, status.WS_1013_TRY_AGAIN_LATER, "Server at capacity")
+            return
+        if not self.is_running or stream_id in self.streams:
+            await stream.close(status.WS_1008_POLICY_VIOLATION, "Stream ID in use")
+            return
+
+        # A stream the server doesn't know starts where the client's audio starts, so the offsets of both sides agree
+        stream.received_bytes = stream.acked_bytes = offset
+        stream.attach(self, stream_id)
+        self._outgoing.put_nowait(encode_offset(FrameType.OPENED, stream_id, stream.received_bytes))
+        metrics.multistream_stream_events.labels("opened").inc()
+        self.connection_manager.callback_dispatcher.dispatch(
+            "new_client", self.new_client_callback, NewClientConnected(client_id=key), key=key
+        )
+
+    async def _process(self) -> None:
+        """
+        Start processing each scheduled stream in its own task, so the streams run side by side and
+        their VAD frames share the same batches.
+        """
+        while self.is_running:
+            stream: Optional[MultiplexedStream] = await self._ready.get()
+            if stream is None or not self.is_running:
+                return
+            stream.is_scheduled = False
+            if stream.connection is not self or stream.is_processing:
+                # Moved to another connection, which processes its audio now, or already being processed,
+                # by this connection, which goes on with the new audio, or by its previous one, which
+                # schedules it again here when done
+                continue
+            stream.is_processing = True
+            task = asyncio.create_task(self._process_stream(stream))
+            self._stream_tasks.add(task)
+            task.add_done_callback(self._stream_tasks.discard)
+
+    async def _process_stream(self, stream: MultiplexedStream) -> None:
+        try:
+            # Once the connection stops, only the audio already taken is finished, the rest stays queued
+            while self.is_running and stream.connection is self and not stream.audio_queue.empty():
+                for frame in stream.frame_chunker.push_many(await stream.audio_queue.get_all()):
+                    await stream._process_chunk(frame)
+                stream.audio_queue.task_done()
+        except asyncio.CancelledError:
+            # Closing a stream, e.g. on overload, cancels its pending VAD frames
+            if stream.is_running:
+                raise
+            return
+        except Exception as e:
+            logger.error(f"Error processing stream {stream.client_id}: {e}")
+            await stream.close(status.WS_1011_INTERNAL_ERROR, "Processing failed")
+            return
+        finally:
+            stream.is_processing = False
+        if stream.connection is not self:
+            # Resumed on another connection while its audio was processed here
+            if stream.connection is not None and not stream.audio_queue.empty():
+                stream.connection.schedule(stream)
+            return
+        if stream.is_closing and stream.audio_queue.empty() and stream.is_running:
+            stream.is_running = False
+            _spawn(self._finish(stream))
+
+    async def _finish(self, stream: MultiplexedStream) -> None:
+        """
+        Close a stream the client closed, after the transcriptions of its last utterances were sent.
+        """
+        await stream.asr_scheduler.drain(CLOSE_DRAIN_TIMEOUT_SECONDS)
+        await stream.close(status.WS_1000_NORMAL_CLOSURE, "Closed")
+
+    async def _send(self) -> None:
+        while True:
+            frame = await self._outgoing.get()
+            try:
+                await self.websocket.send_bytes(frame)
+            except Exception as e:
+                logger.warning(f"Failed to send on a multi-stream connection: {e}")
+                return
+
+# Tasks which nothing awaits are only weakly referenced by the event loop
+_background_tasks: Set[asyncio.Task] = set()
+
+def _spawn(coroutine) -> asyncio.Task:
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
@@ -0,0 +1,82 @@
+# Path: ssi/utils/ws/multistream_protocol.py
+# Description: This module contains the framing of the multi-stream WebSocket protocol, which carries many logical audio streams over one WebSocket connection. It is shared by the server endpoint and `ssi.clients.StreamingClient`, and only depends on the standard library.
+
+import json
+import struct
+from enum import IntEnum
+from typing import Any, Dict, Tuple
+
+# Every frame starts with the frame type and the ID of the logical stream it belongs to (5 bytes)
+HEADER = struct.Struct("!BI")
+# The payload of ACK and OPENED frames: the number of audio bytes of the stream the server has received
+OFFSET = struct.Struct("!Q")
+
+MAX_STREAM_ID = 2 ** 32 - 1
+
+class FrameType(IntEnum):
+    """
+    The frame types. Stream IDs are chosen by the client and are only unique within a connection.
+
+    Client to server:
+        OPEN: Opens a stream. The payload is a JSON object with the stream's "key",
+            which identifies it across connections, "resume": true to continue
+            a stream opened on an earlier connection, and the "offset" of the
+            oldest audio the client can still send, where a stream the server
+            doesn't know (any more) starts.
+        AUDIO: Raw int16 audio of the stream.
+        CLOSE: Ends the stream.
+
+    Server to client:
+        OPENED: Confirms an OPEN. The payload is the offset (bytes of audio) the
+            server already has for the stream: 0 for a new stream, and for a
+            resumed one, where the client has to continue sending from.
+        RESULT: A transcription of the stream. The payload is the encoded `StreamingDataChunk`.
+        ACK: The offset the server has received up to, so the client can drop older audio from its replay buffer.
+        CLOSED: The server closed the stream. The payload is a JSON object with the "code" and "reason".
+    """
+    OPEN = 1
+    AUDIO = 2
+    CLOSE = 3
+    OPENED = 4
+    RESULT = 5
+    ACK = 6
+    CLOSED = 7
+
+class ProtocolError(ValueError):
+    """Raised for frames which don't follow the protocol."""
+
+def encode_frame(frame_type: FrameType, stream_id: int, payload: bytes = b"") -> bytes:
+    return HEADER.pack(frame_type, stream_id) + payload
+
+def decode_frame(data: bytes) -> Tuple[FrameType, int, memoryview]:
+    """
+    Split a frame into its type, stream ID and payload. The payload is a view of `data`, not a copy.
+    """
+    if len(data) < HEADER.size:
+        raise ProtocolError(f"Frame of {len(data)} bytes is shorter than its header")
+    frame_type, stream_id = HEADER.unpack_from(data)
+    try:
+        frame_type = FrameType(frame_type)
+    except ValueError:
+        raise ProtocolError(f"Unknown frame type: {frame_type}") from None
+    return frame_type, stream_id, memoryview(data)[HEADER.size:]
+
+def encode_control(frame_type: FrameType, stream_id: int, message: Dict[str, Any]) -> bytes:
+    return encode_frame(frame_type, stream_id, json.dumps(message, separators=(",", ":")).encode())
+
+def decode_control(payload: memoryview) -> Dict[str, Any]:
+    try:
+        message = json.loads(bytes(payload)) if len(payload) else {}
+    except ValueError as e:
+        raise ProtocolError(f"Invalid control message: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Control messages must be JSON objects")
+    return message
+
+def encode_offset(frame_type: FrameType, stream_id: int, offset: int) -> bytes:
+    return encode_frame(frame_type, stream_id, OFFSET.pack(offset))
+
+def decode_offset(payload: memoryview) -> int:
+    if len(payload) != OFFSET.size:
+        raise ProtocolError(f"Offset payload must be {OFFSET.size} bytes, got {len(payload)}")
+    return OFFSET.unpack(payload)[0]
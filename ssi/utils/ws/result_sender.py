@@ -0,0 +1,109 @@
+# Path: ssi/utils/ws/result_sender.py
+# Description: This module contains the ResultSender class, which sends a client's transcriptions back over its WebSocket from a task of its own, joining partial transcriptions and bounding the results waiting for a slow client.
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+import msgpack
+from fastapi import WebSocket
+from ssi.config import get_settings
+from ssi.logger import get_logger
+from ssi.utils.metrics.server_metrics import get_server_metrics
+from ssi.types.streaming_data_chunk import StreamingDataChunk
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_server_metrics()
+
+class ResultSender:
+    """
+    Sends the transcriptions of one client back over its WebSocket.
+
+    `send` only queues the result, so processing never waits for the socket;
+    the `run` task sends the queue. With local agreement, a partial only
+    contains the words which became stable since the previous one, so the
+    partials arriving within `partial_flush_interval` are joined into one
+    message. A final contains the whole utterance and replaces the partials
+    still waiting. When a client reads so slowly that `max_queue_size`
+    results are waiting, the oldest one is dropped.
+
+    Attributes:
+        websocket (WebSocket): The client's WebSocket.
+        encoding (str): "json" for text messages, "msgpack" for binary messages.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        encoding: str = settings.RESULT_ENCODING,
+        partial_flush_interval: float = settings.RESULT_PARTIAL_FLUSH_INTERVAL_MS / 1000,
+        max_queue_size: int = settings.RESULT_SEND_QUEUE_MAX_SIZE,
+    ) -> None:
+        self.websocket: WebSocket = websocket
+        self.encoding: str = encoding
+        self.partial_flush_interval: float = partial_flush_interval
+        self._queue: Deque[StreamingDataChunk] = deque()
+        self._max_queue_size: int = max_queue_size
+        self._partial: Optional[StreamingDataChunk] = None  # The joined partials waiting for the flush interval
+        self._partial_due: float = 0.0
+        self._wakeup = asyncio.Event()
+        self._closed: bool = False
+
+    def send(self, chunk: StreamingDataChunk) -> None:
+        """
+        Queue a transcription for the client, without waiting.
+        """
+        if self._closed:
+            return
+        if chunk.is_final:
+            if self._partial is not None:
+                metrics.results_coalesced.inc()
+                self._partial = None
+            self._enqueue(chunk)
+        elif self._partial is None:
+            self._partial = chunk
+            self._partial_due = time.monotonic() + self.partial_flush_interval
+        else:
+            metrics.results_coalesced.inc()
+            self._partial = chunk.model_copy(
+                update={"transcription": f"{self._partial.transcription} {chunk.transcription}".strip()}
+            )
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """
+        Send the queued results until the client disconnects.
+        """
+        while True:
+            if not self._queue:
+                timeout = None if self._partial is None else max(0.0, self._partial_due - time.monotonic())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            if self._partial is not None and time.monotonic() >= self._partial_due:
+                self._enqueue(self._partial)
+                self._partial = None
+            while self._queue:
+                chunk = self._queue.popleft()
+                try:
+                    await self._send(chunk)
+                except Exception as e:
+                    logger.warning(f"Stopped sending results to client {chunk.client_id}: {e}")
+                    self._closed = True
+                    return
+                metrics.results_sent.labels("final" if chunk.is_final else "partial").inc()
+
+    def _enqueue(self, chunk: StreamingDataChunk) -> None:
+        if len(self._queue) >= self._max_queue_size:
+            self._queue.popleft()
+            metrics.results_dropped.inc()
+        self._queue.append(chunk)
+
+    async def _send(self, chunk: StreamingDataChunk) -> None:
+        if self.encoding == "msgpack":
+            await self.websocket.send_bytes(msgpack.packb(chunk.model_dump(mode="json")))
+        else:
+            await self.websocket.send_text(chunk.model_dump_json())
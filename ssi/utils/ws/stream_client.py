@@ -2,17 +2,28 @@
 # Description: This module contains the StreamClient class for representing a connected WebSocket client for real-time audio transcription.
 
 import asyncio
-from typing import Callable
+import time
+from typing import Callable, Optional
 import numpy as np
-from fastapi import WebSocket
+from fastapi import WebSocket, status
+from fastapi.websockets import WebSocketState
 from ssi.config import get_settings
 from ssi.logger import get_logger
-from ssi.utils.asr.asr_interface import ASRInterface
+from ssi.utils.asr.asr_batch_scheduler import ASRBatchScheduler, TranscriptionResult
 from ssi.utils.vad.vad_interface import VADInterface
+from ssi.utils.buffers.frame_chunker import FrameChunker
+from ssi.utils.buffers.bounded_audio_queue import AudioBufferBudget, BoundedAudioQueue
+from ssi.utils.buffering_strategy.buffering_strategy_interface import BufferingStrategyInterface
+from ssi.utils.buffering_strategy.buffering_strategy_factory import BufferingStrategyFactory
+from ssi.utils.metrics.server_metrics import get_server_metrics
+from ssi.utils.ws.result_sender import ResultSender
+from ssi.utils.whisper_language_codes import WHISPER_LANGUAGE_CODES
 from ssi.types.streaming_data_chunk import StreamingDataChunk
+from ssi.types.processing_timings import ProcessingTimings
 
 settings = get_settings()
 logger = get_logger()
+metrics = get_server_metrics()
 
 class StreamClient:
     """Represents a connected WebSocket client for real-time audio transcription.
@@ -28,97 +39,159 @@ class StreamClient:
         websocket: WebSocket, 
         asr_callback: Callable, 
         vad_pipeline: VADInterface, 
-        asr_pipeline: ASRInterface
+        asr_scheduler: ASRBatchScheduler,
+        audio_budget: Optional[AudioBufferBudget] = None,
     ) -> None:
         self.client_id: str = client_id
         self.websocket: WebSocket = websocket
         self.asr_callback: Callable = asr_callback
-        self.audio_queue: asyncio.Queue = asyncio.Queue()
+        self.last_audio_at: float = time.monotonic()  # For the idle reaper
+
+        # Received audio waiting for processing, bounded per client and by the budget shared by all clients
+        self.audio_queue: BoundedAudioQueue = BoundedAudioQueue(
+            policy=settings.AUDIO_QUEUE_POLICY,
+            max_samples=int(settings.AUDIO_QUEUE_MAX_SECONDS * settings.STREAM_SAMPLE_RATE),
+            budget=audio_budget,
+            sample_rate=settings.STREAM_SAMPLE_RATE,
+            sample_width=settings.STREAM_SAMPLE_WIDTH_BYTES,
+            silence_threshold_db=settings.AUDIO_QUEUE_SILENCE_THRESHOLD_DB,
+            keep_silence_samples=int(settings.BUFFER_SECONDS_AFTER * settings.STREAM_SAMPLE_RATE),
+        )
         self.is_running: bool = True
         self.vad_pipeline: VADInterface = vad_pipeline
-        self.asr_pipeline: ASRInterface = asr_pipeline
+        self.vad_pipeline.open_session(client_id)
+        self.asr_scheduler: ASRBatchScheduler = asr_scheduler
         
-        # Initialize buffers
-        # NOTE: check if we should use np.int16 or bytearray
-        logger.debug(f"Initializing pre-buffer with {settings.BUFFER_SECONDS_BEFORE} seconds of silence")
-        self.pre_buffer: np.ndarray = np.zeros(int(settings.BUFFER_SECONDS_BEFORE * settings.STREAM_SAMPLE_RATE), dtype=np.int16)
-        
-        logger.debug(f"Initializing post-buffer with {settings.BUFFER_SECONDS_AFTER} seconds of silence")
-        self.post_buffer: np.ndarray = np.zeros(int(settings.BUFFER_SECONDS_AFTER * settings.STREAM_SAMPLE_RATE), dtype=np.int16)
-
-    async def append_audio_data(self, audio_data: bytes) -> None:
-        # Convert bytes to numpy array and put it in the queue
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
-        await self.audio_queue.put(audio_array)
+        # Decides which audio to record and when to transcribe it
+        self.buffering_strategy: BufferingStrategyInterface = BufferingStrategyFactory.create_buffering_strategy(
+            settings.BUFFERING_STRATEGY, self
+        )
+
+        # Splits and joins the incoming messages into fixed size VAD frames
+        self.frame_chunker: FrameChunker = FrameChunker(self.vad_pipeline.FRAME_SAMPLES, settings.STREAM_SAMPLE_WIDTH_BYTES)
+
+        # Sends the transcriptions back to the client, unless they only go to the ASR callback
+        self.result_sender: Optional[ResultSender] = (
+            ResultSender(websocket) if websocket is not None and settings.RESULT_ENCODING != "none" else None
+        )
+
+        # VAD time spent on the current utterance, reported with its transcription
+        self.utterance_vad_seconds: float = 0.0
+        self.utterance_vad_frames: int = 0
+
+    async def append_audio_data(self, audio_data: bytes) -> bool:
+        """
+        Queue a raw message, it is split into VAD frames by the processing task.
+
+        Returns:
+            bool: False if the audio queue is overloaded and the client should be disconnected.
+        """
+        return await self.audio_queue.put(audio_data)
     
     async def process_audio(self) -> None:
-        recording_buffer = np.array([], dtype=np.int16)
-        is_recording = False
-        silence_duration = 0
-
+        """
+        Process the queued audio until the queue is closed and drained, or the client is stopped by `close`.
+        """
         while self.is_running:
-            audio_chunk = await self.audio_queue.get()
-
-            # Update pre-buffer
-            self.pre_buffer = np.roll(self.pre_buffer, -len(audio_chunk))
-            self.pre_buffer[-len(audio_chunk):] = audio_chunk
-
-            # Detect voice activity
-            voice_prob = self.vad_pipeline.detect_voice_activity(audio_chunk)
-
-            if voice_prob >= settings.VAD_THRESHOLD:
-                if not is_recording:
-                    logger.info(f"Voice activity detected for client {self.client_id}. Starting recording.")
-                    is_recording = True
-                    recording_buffer = np.concatenate((self.pre_buffer, audio_chunk))
-                else:
-                    recording_buffer = np.concatenate((recording_buffer, audio_chunk))
-                silence_duration = 0
-            elif is_recording:
-                recording_buffer = np.concatenate((recording_buffer, audio_chunk))
-                silence_duration += len(audio_chunk) / settings.STREAM_SAMPLE_RATE
-
-                if silence_duration >= settings.BUFFER_SECONDS_AFTER:
-                    logger.info(f"Silence detected for client {self.client_id}. Stopping recording and transcribing.")
-                    is_recording = False
-
-                    # Prepare the final audio for transcription
-                    final_audio = np.concatenate((recording_buffer, self.post_buffer))
-
-                    # Transcribe the audio
-                    transcription = self.asr_pipeline.transcribe(final_audio)
-
-                    # Send the transcription to the client
-                    self.asr_callback(StreamingDataChunk(
-                        language="en",  # Assuming English, you might want to make this configurable
-                        transcription=transcription,
-                        server_process_time=0.0  # You might want to add timing logic here
-                    ))
-                    logger.info(f"Transcription sent for client {self.client_id}: {transcription}")
-
-                    # Clear the recording buffer
-                    recording_buffer = np.array([], dtype=np.int16)
-                    silence_duration = 0
-            else:
-                # Update post-buffer
-                self.post_buffer = np.roll(self.post_buffer, -len(audio_chunk))
-                self.post_buffer[-len(audio_chunk):] = audio_chunk
+            # Take everything queued, so a burst of messages costs one loop iteration
+            messages = await self.audio_queue.get_all()
+            if not messages:  # Closed and drained
+                break
+
+            for frame in self.frame_chunker.push_many(messages):
+                await self._process_chunk(frame)
+            self.audio_queue.task_done()
+
+    async def _process_chunk(self, audio_chunk: np.ndarray) -> None:
+        # Detect voice activity
+        started_at = time.perf_counter()
+        voice_prob = await self.vad_pipeline.detect_voice_activity_async(audio_chunk, session_id=self.client_id)
+        vad_seconds = time.perf_counter() - started_at
+        metrics.vad_frame_seconds.observe(vad_seconds)
+
+        if not self.is_recording:
+            # Only the frames from the start of an utterance count towards its VAD time
+            self.utterance_vad_seconds = 0.0
+            self.utterance_vad_frames = 0
+        self.utterance_vad_seconds += vad_seconds
+        self.utterance_vad_frames += 1
+
+        await self.buffering_strategy.process_audio(audio_chunk, voice_prob)
+
+    @property
+    def is_recording(self) -> bool:
+        return self.buffering_strategy.is_recording
+
+    def utterance_timings(self) -> ProcessingTimings:
+        """
+        Get the time spent on the current utterance so far, to submit with its audio to the ASR scheduler.
+        """
+        return ProcessingTimings(vad_seconds=self.utterance_vad_seconds, vad_frames=self.utterance_vad_frames)
+
+    def send_transcription(
+        self,
+        transcription: str,
+        is_final: bool = True,
+        result: Optional[TranscriptionResult] = None,
+    ) -> None:
+        """
+        Deliver a transcription of this client's audio to the ASR callback.
+
+        Args:
+            transcription (str): The text to deliver.
+            is_final (bool): False for a partial transcription.
+            result (Optional[TranscriptionResult]): The scheduler result the text comes from, for its timings.
+        """
+        server_process_time = time.perf_counter() - result.submitted_at if result is not None else 0.0
+        chunk = StreamingDataChunk(
+            client_id=self.client_id,
+            language=WHISPER_LANGUAGE_CODES[settings.ASR_TARGET_LANG],
+            transcription=transcription,
+            server_process_time=server_process_time,
+            timings=result.timings if result is not None else None,
+            is_final=is_final,
+        )
+        metrics.server_process_seconds.observe(server_process_time)
+        metrics.transcriptions.labels("final" if is_final else "partial").inc()
+        self.asr_callback(chunk)
+        if self.result_sender is not None:
+            self.result_sender.send(chunk)
+        logger.info(f"{'Transcription' if is_final else 'Partial transcription'} sent for client {self.client_id}: {transcription}")
 
     async def receive_audio(self) -> None:
         try:
             while self.is_running:
                 data = await self.websocket.receive_bytes()
-                await self.append_audio_data(data)
+                self.last_audio_at = time.monotonic()
+                if not await self.append_audio_data(data):
+                    logger.warning(
+                        f"Audio queue of client {self.client_id} overloaded "
+                        f"({self.audio_queue.buffered_seconds:.1f}s buffered), disconnecting"
+                    )
+                    await self.close(status.WS_1013_TRY_AGAIN_LATER, "Audio queue overloaded")
         except asyncio.CancelledError:
             self.is_running = False
         except Exception as e:
+            # The client is gone, but the audio it sent before is still processed
             logger.error(f"Error receiving audio for client {self.client_id}: {e}")
-            self.is_running = False
+        finally:
+            # Lets the processing task finish the audio received so far and end, instead of waiting for more
+            self.audio_queue.close()
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE, reason: str = "") -> None:
+        """
+        Stop the client and close its WebSocket, unless the client or the server closed it already.
+        """
+        self.is_running = False
+        if self.websocket.client_state == WebSocketState.CONNECTED and self.websocket.application_state == WebSocketState.CONNECTED:
+            await self.websocket.close(code=code, reason=reason)
 
     async def run(self) -> None:
         logger.info(f"Creating tasks for client {self.client_id}")
         receive_task = asyncio.create_task(self.receive_audio())
         process_task = asyncio.create_task(self.process_audio())
+        # Not gathered: the client may stop reading results, which mustn't end the session
+        send_task = asyncio.create_task(self.result_sender.run()) if self.result_sender is not None else None
         
         try:
             await asyncio.gather(receive_task, process_task)
@@ -130,4 +203,6 @@ class StreamClient:
             self.is_running = False
             receive_task.cancel()
             process_task.cancel()
+            if send_task is not None:
+                send_task.cancel()
             logger.info(f"Tasks cancelled for client {self.client_id}")
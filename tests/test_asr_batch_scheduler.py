@@ -0,0 +1,48 @@
+# Path: tests/test_asr_batch_scheduler.py
+# Description: Tests that the ASR batch scheduler keeps several batches in flight.
+
+import asyncio
+from typing import Dict, List, Tuple
+import numpy as np
+from ssi.utils.asr.asr_batch_scheduler import ASRBatchScheduler
+from ssi.utils.asr.asr_interface import ASRInterface
+
+class _SlowASR(ASRInterface):
+    """Takes 0.1 seconds per batch and records how many batches run at once."""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.most_running = 0
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return str(len(audio))
+
+    async def transcribe_batch_timed_async(self, audios: List[np.ndarray]) -> Tuple[List[str], Dict[str, float]]:
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        await asyncio.sleep(0.1)
+        self.running -= 1
+        return [self.transcribe(audio) for audio in audios], {}
+
+def _transcribe_all(max_concurrent_batches: int) -> Tuple[List[str], int]:
+    asr = _SlowASR()
+
+    async def run() -> List[str]:
+        scheduler = ASRBatchScheduler(asr, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=max_concurrent_batches)
+        results = await asyncio.gather(*(scheduler.submit(np.zeros(length, dtype=np.int16)) for length in range(1, 7)))
+        await scheduler.stop()
+        return [result.transcription for result in results]
+
+    return asyncio.run(run()), asr.most_running
+
+def test_batches_run_one_at_a_time_with_one_slot():
+    transcriptions, most_running = _transcribe_all(1)
+
+    assert transcriptions == ["1", "2", "3", "4", "5", "6"]
+    assert most_running == 1
+
+def test_up_to_max_concurrent_batches_run_at_once():
+    transcriptions, most_running = _transcribe_all(3)
+
+    assert transcriptions == ["1", "2", "3", "4", "5", "6"]
+    assert most_running == 3
@@ -0,0 +1,31 @@
+# Path: tests/test_batched_silero_vad.py
+# Description: Tests that the batched Silero VAD only accepts frames of open sessions.
+
+import asyncio
+import numpy as np
+import pytest
+from ssi.utils.vad.batched_silero_vad import BatchedSileroVAD
+
+def _vad() -> BatchedSileroVAD:
+    # The sessions are checked before the model is used, so it isn't loaded
+    vad = BatchedSileroVAD.__new__(BatchedSileroVAD)
+    vad._sessions = {}
+    vad._ready = {}
+    return vad
+
+def test_frames_of_unknown_sessions_are_refused():
+    vad = _vad()
+    frame = np.zeros(BatchedSileroVAD.FRAME_SAMPLES, dtype=np.int16)
+
+    with pytest.raises(ValueError):
+        asyncio.run(vad.detect_voice_activity_async(frame, session_id="unknown"))
+
+def test_frames_of_closed_sessions_are_refused():
+    vad = _vad()
+    frame = np.zeros(BatchedSileroVAD.FRAME_SAMPLES, dtype=np.int16)
+    vad.open_session("client")
+    vad.close_session("client")
+
+    with pytest.raises(ValueError):
+        asyncio.run(vad.detect_voice_activity_async(frame, session_id="client"))
+    assert "client" not in vad._sessions
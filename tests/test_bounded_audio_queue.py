@@ -0,0 +1,63 @@
+# Path: tests/test_bounded_audio_queue.py
+# Description: Tests that the bounded audio queue counts the audio being processed and wakes up blocked producers.
+
+import asyncio
+import numpy as np
+from ssi.utils.buffers.bounded_audio_queue import AudioBufferBudget, BoundedAudioQueue
+
+def _message(samples: int = 1600) -> bytes:
+    return np.full(samples, 1000, dtype=np.int16).tobytes()
+
+def test_taken_messages_count_until_processed():
+    async def run() -> None:
+        budget = AudioBufferBudget()
+        queue = BoundedAudioQueue("block", max_samples=3200, budget=budget)
+        await queue.put(_message())
+        await queue.put(_message())
+
+        assert len(await queue.get_all()) == 2
+        assert queue.buffered_seconds == 0.2
+        assert budget.buffered_samples == 3200
+
+        queue.task_done()
+        assert queue.buffered_seconds == 0.0
+        assert budget.buffered_samples == 0
+
+    asyncio.run(run())
+
+def test_blocked_put_waits_for_processing_not_just_dequeuing():
+    async def run() -> None:
+        queue = BoundedAudioQueue("block", max_samples=3200)
+        await queue.put(_message())
+        await queue.put(_message())
+        put = asyncio.create_task(queue.put(_message()))
+        await asyncio.sleep(0.01)
+        assert not put.done()
+
+        await queue.get_all()
+        await asyncio.sleep(0.01)
+        assert not put.done()
+
+        queue.task_done()
+        await asyncio.wait_for(put, 1)
+        assert queue.qsize() == 1
+
+    asyncio.run(run())
+
+def test_clear_wakes_up_queues_blocked_on_the_shared_budget():
+    async def run() -> None:
+        budget = AudioBufferBudget(max_samples=3200)
+        first = BoundedAudioQueue("block", max_samples=0, budget=budget)
+        second = BoundedAudioQueue("block", max_samples=0, budget=budget)
+        await first.put(_message())
+        await first.put(_message())
+        await second.put(_message())
+        put = asyncio.create_task(second.put(_message()))
+        await asyncio.sleep(0.01)
+        assert not put.done()
+
+        first.clear()
+        await asyncio.wait_for(put, 1)
+        assert budget.buffered_samples == 3200
+
+    asyncio.run(run())
@@ -0,0 +1,39 @@
+# Path: tests/test_cascaded_vad.py
+# Description: Tests that the cascaded VAD only accepts frames of open sessions.
+
+import asyncio
+import numpy as np
+import pytest
+from ssi.utils.vad.cascaded_vad import CascadedVAD
+from ssi.utils.vad.vad_interface import VADInterface
+
+class _LoudVAD(VADInterface):
+    """A neural VAD stand-in which judges every frame speech."""
+
+    def detect_voice_activity(self, audio_data):
+        return 1.0
+
+def _frame() -> np.ndarray:
+    return np.zeros(512, dtype=np.int16)
+
+def test_frames_of_unknown_sessions_are_refused():
+    vad = CascadedVAD(neural=_LoudVAD())
+
+    with pytest.raises(ValueError):
+        asyncio.run(vad.detect_voice_activity_async(_frame(), session_id="unknown"))
+    assert "unknown" not in vad._sessions
+
+def test_frames_of_closed_sessions_are_refused():
+    vad = CascadedVAD(neural=_LoudVAD())
+    vad.open_session("client")
+    assert asyncio.run(vad.detect_voice_activity_async(_frame(), session_id="client")) == 0.0
+    vad.close_session("client")
+
+    with pytest.raises(ValueError):
+        asyncio.run(vad.detect_voice_activity_async(_frame(), session_id="client"))
+    assert "client" not in vad._sessions
+
+def test_frames_without_a_session_are_decided():
+    vad = CascadedVAD(neural=_LoudVAD())
+
+    assert vad.detect_voice_activity(_frame()) == 0.0
@@ -0,0 +1,39 @@
+# Path: tests/test_endpointing_replay.py
+# Description: Replays recorded VAD probability traces through the fixed and the adaptive endpointers.
+
+# The traces in data/endpointing are conversations of 12 utterances each, generated with
+# `synthetic_trace` of experiments/endpointing/endpointing_replay.py (seed 2026) and saved as float32.
+
+import glob
+import os
+from typing import Dict
+import numpy as np
+import pytest
+from experiments.endpointing.endpointing_replay import evaluate, replay
+from ssi.config import get_settings
+from ssi.utils.endpointing.adaptive_endpointer import AdaptiveEndpointer
+from ssi.utils.endpointing.fixed_endpointer import FixedEndpointer
+
+settings = get_settings()
+TRACES_DIR = os.path.join(os.path.dirname(__file__), "data", "endpointing")
+
+@pytest.fixture(scope="module")
+def traces() -> Dict[str, np.ndarray]:
+    paths = sorted(glob.glob(os.path.join(TRACES_DIR, "*.npy")))
+    assert paths, f"No traces in {TRACES_DIR}"
+    return {os.path.basename(path): np.load(path) for path in paths}
+
+@pytest.mark.parametrize("cut_risk, min_saved_ms, max_false_cut_rate", [(0.05, 50, 0.1), (0.1, 100, 0.2)])
+def test_adaptive_endpointer_saves_latency_within_false_cut_bound(traces, cut_risk, min_saved_ms, max_false_cut_rate):
+    result = evaluate(traces, cut_risk)
+
+    assert result["mean_saved_ms"] >= min_saved_ms
+    assert result["false_cut_rate"] <= max_false_cut_rate
+
+def test_zero_cut_risk_matches_fixed_hangover(traces):
+    for name, trace in traces.items():
+        adaptive = replay(trace, AdaptiveEndpointer(cut_risk=0.0, max_hangover=settings.BUFFER_SECONDS_AFTER))
+        fixed = replay(trace, FixedEndpointer(hangover=settings.BUFFER_SECONDS_AFTER))
+
+        assert adaptive, name
+        assert adaptive == fixed, name
@@ -0,0 +1,87 @@
+# Path: tests/test_longform_windows.py
+# Description: Tests the split of long utterances into overlapping windows and the merge of their transcriptions.
+
+import numpy as np
+import pytest
+from ssi.config import get_settings
+from ssi.utils.asr.whisper_transformers_asr import (
+    CHUNK_LENGTH,
+    WhisperTransformersASR,
+    merge_overlapping_transcriptions,
+)
+
+WORD_SECONDS = 1 / 3  # Three words per second
+
+def _splitter(overlap_seconds: float) -> WhisperTransformersASR:
+    # Only the settings are needed to split, not the model
+    asr = WhisperTransformersASR.__new__(WhisperTransformersASR)
+    asr.settings = get_settings()
+    asr.longform_overlap_seconds = overlap_seconds
+    return asr
+
+def _transcribe(window: np.ndarray, sample_rate: int) -> str:
+    # The samples hold their own index, so a window tells which words it heard. The
+    # words cut by the window edges come out garbled, as they do from the model.
+    start, end = window[0] / sample_rate, (window[-1] + 1) / sample_rate
+    words = []
+    for index in range(int(start / WORD_SECONDS), int(np.ceil(end / WORD_SECONDS))):
+        word_start, word_end = index * WORD_SECONDS, (index + 1) * WORD_SECONDS
+        inside = start - 1e-6 <= word_start and word_end <= end + 1e-6
+        words.append(f"word{index}" if inside else "uh")
+    return " ".join(words)
+
+@pytest.mark.parametrize("seconds", [31, 45, 61])
+def test_split_then_merge_keeps_every_word_once(seconds):
+    sample_rate = get_settings().STREAM_SAMPLE_RATE
+    audio = np.arange(seconds * sample_rate)
+
+    windows, owners, overlaps = _splitter(5.0)._split_windows([audio])
+
+    assert all(len(window) == CHUNK_LENGTH * sample_rate for window in windows)
+    assert windows[0][0] == 0 and windows[-1][-1] == len(audio) - 1
+    assert owners == [0] * len(windows)
+    assert len(overlaps[0]) == len(windows) - 1
+    assert all(overlap >= 5.0 for overlap in overlaps[0])
+
+    merged = merge_overlapping_transcriptions([_transcribe(window, sample_rate) for window in windows], overlaps[0])
+
+    assert merged == " ".join(f"word{index}" for index in range(int(seconds / WORD_SECONDS)))
+
+def test_short_clips_are_not_split():
+    sample_rate = get_settings().STREAM_SAMPLE_RATE
+    audios = [np.zeros(2 * sample_rate), np.zeros(CHUNK_LENGTH * sample_rate)]
+
+    windows, owners, overlaps = _splitter(5.0)._split_windows(audios)
+
+    assert [len(window) for window in windows] == [len(audio) for audio in audios]
+    assert owners == [0, 1]
+    assert overlaps == [[], []]
+
+def test_windows_overlap_by_the_setting_except_the_last_two():
+    sample_rate = get_settings().STREAM_SAMPLE_RATE
+
+    _, _, overlaps = _splitter(5.0)._split_windows([np.zeros(61 * sample_rate)])
+
+    assert overlaps == [[5.0, 24.0]]
+
+def test_windows_go_through_the_model_in_chunks_of_the_batch_size():
+    sample_rate = get_settings().STREAM_SAMPLE_RATE
+    asr = _splitter(5.0)
+    asr.settings = get_settings().model_copy(update={"ASR_BATCH_MAX_SIZE": 2})
+    chunk_sizes = []
+
+    def transcribe_windows(windows, timings):
+        chunk_sizes.append(len(windows))
+        timings["decode"] = timings.get("decode", 0.0) + 1.0
+        return [_transcribe(window, sample_rate) for window in windows]
+
+    asr._transcribe_windows = transcribe_windows
+    audios = [np.arange(2 * sample_rate), np.arange(61 * sample_rate), np.arange(sample_rate)]
+
+    transcriptions, timings = asr.transcribe_batch_timed(audios)
+
+    assert chunk_sizes == [2, 2, 1]  # The 61 second clip splits into three windows
+    assert transcriptions == [
+        " ".join(f"word{index}" for index in range(int(seconds / WORD_SECONDS))) for seconds in (2, 61, 1)
+    ]
+    assert timings == {"decode": 3.0}
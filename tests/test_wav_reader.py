@@ -0,0 +1,38 @@
+# Path: tests/test_wav_reader.py
+# Description: Tests that the WAV reader maps valid recordings and rejects malformed headers with ValueError.
+
+import struct
+import numpy as np
+import pytest
+from ssi.utils.offline.wav_reader import map_wav
+
+def _wav(channels: int = 1, sample_rate: int = 16000, samples: np.ndarray = np.arange(1000, dtype=np.int16)) -> bytes:
+    block_align = 2 * max(channels, 1)
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * block_align, block_align, 16)
+    data = samples.tobytes()
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+def test_maps_the_samples(tmp_path):
+    path = tmp_path / "mono.wav"
+    path.write_bytes(_wav())
+
+    samples, sample_rate = map_wav(str(path))
+
+    assert sample_rate == 16000
+    assert isinstance(samples, np.memmap)
+    np.testing.assert_array_equal(samples[:, 0], np.arange(1000, dtype=np.int16))
+
+@pytest.mark.parametrize("data", [
+    b"not a wav file",
+    _wav(channels=0),
+    _wav(sample_rate=0),
+    _wav()[:30],  # Truncated in the fmt chunk
+    _wav()[:36],  # No data chunk
+])
+def test_rejects_malformed_files_with_value_error(tmp_path, data):
+    path = tmp_path / "bad.wav"
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        map_wav(str(path))